@@ -0,0 +1,139 @@
+"""
+Сравнение результатов бенчмарка с базовой линией.
+
+    python -m benchmarks.compare benchmarks/results/current.json baseline.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# (путь к метрике, чем больше — тем лучше)
+METRICS: list[tuple[str, bool]] = [
+    ("summary.rps", True),
+    ("summary.latency_ms.p50", False),
+    ("summary.latency_ms.p95", False),
+    ("summary.latency_ms.p99", False),
+    ("summary.error_rate", False),
+    ("gateway.cpu_percent", False),
+    ("gateway.cpu_ms_per_request", False),
+    ("gateway.rss_mb_max", False),
+    ("event_loop.max_ms", False),
+    ("startup.import_ms", False),
+    ("startup.own_modules_ms", False),
+    ("startup.ready_ms", False),
+    ("startup.first_request_ms", False),
+    ("startup.first_auth_request_ms", False),
+]
+
+
+def _metrics(result: dict[str, Any]) -> list[tuple[str, bool]]:
+    """Метрики результата: общие и по стадиям микробенчмарков."""
+    stages = [(f"stages.{name}.median_us", False) for name in result.get("stages", {})]
+    return METRICS + stages
+
+
+@dataclass
+class MetricDelta:
+    name: str
+    current: float
+    baseline: float
+    delta_percent: float
+    regression: bool
+
+
+def _get(data: dict[str, Any], path: str) -> float | None:
+    value: Any = data
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold_percent: float = 5.0
+) -> list[MetricDelta]:
+    """
+    Сравнение метрик с базовой линией.
+
+    Регрессия — ухудшение метрики больше чем на threshold_percent.
+    """
+    deltas = []
+    for name, higher_is_better in _metrics(current):
+        cur, base = _get(current, name), _get(baseline, name)
+        if cur is None or base is None:
+            continue
+        if base == 0:
+            delta = 0.0 if cur == 0 else 100.0
+        else:
+            delta = (cur - base) / base * 100
+        worse = -delta if higher_is_better else delta
+        deltas.append(
+            MetricDelta(
+                name=name,
+                current=cur,
+                baseline=base,
+                delta_percent=round(delta, 2),
+                regression=worse > threshold_percent,
+            )
+        )
+    return deltas
+
+
+def print_comparison(deltas: list[MetricDelta]) -> None:
+    print(f"{'metric':<44}{'baseline':>12}{'current':>12}{'delta':>10}")
+    for d in deltas:
+        mark = "  REGRESSION" if d.regression else ""
+        print(
+            f"{d.name:<44}{d.baseline:>12.2f}{d.current:>12.2f}"
+            f"{d.delta_percent:>9.1f}%{mark}"
+        )
+
+
+def save_result(result: dict[str, Any], path: Path | None = None) -> Path:
+    """Сохранение результата в JSON (по умолчанию — в benchmarks/results/)."""
+    if path is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = result["timestamp"].replace(":", "").replace("-", "")
+        path = RESULTS_DIR / f"{result['benchmark']}-{timestamp}.json"
+    path.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+    return path
+
+
+def environment_info() -> dict[str, str]:
+    """Окружение прогона: сравнивать имеет смысл только результаты с одинаковым."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load_result(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение с базовой линией")
+    parser.add_argument("current", type=Path)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=5.0)
+    args = parser.parse_args()
+
+    deltas = compare(
+        load_result(args.current), load_result(args.baseline), args.threshold
+    )
+    print_comparison(deltas)
+    sys.exit(1 if any(d.regression for d in deltas) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Локальные заглушки внутренних сервисов (auth, product, cart, order) и
+OTLP-коллектора трасс для бенчмарков.
+
+Каждый сервис — минимальное ASGI-приложение без фреймворка, чтобы накладные
+расходы заглушек не искажали измерения gateway. Задержка, доля ошибок
+и размер ответов настраиваются профилем.
+
+Запуск:
+    python -m benchmarks.fake_services --port-base 9001 --latency-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+from dataclasses import dataclass
+
+import uvicorn
+
+SERVICES = ("auth", "product", "cart", "order", "collector")
+
+PAYLOAD_SIZES = {"small": 5, "medium": 20, "large": 100}
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Профиль поведения заглушки."""
+
+    latency_ms: float = 5.0
+    jitter_ms: float = 2.0
+    error_rate: float = 0.0
+    payload: str = "medium"
+
+    @property
+    def items_count(self) -> int:
+        return PAYLOAD_SIZES[self.payload]
+
+
+def service_ports(port_base: int) -> dict[str, int]:
+    """Порты заглушек: port_base, port_base + 1, ... в порядке SERVICES."""
+    return {name: port_base + i for i, name in enumerate(SERVICES)}
+
+
+def _product(product_id: int) -> dict:
+    return {
+        "id": product_id,
+        "title": f"Товар {product_id}",
+        "price": 99990 + product_id,
+        "category_id": product_id % 10 + 1,
+        "description": "Описание товара " * 10,
+        "images": [
+            f"https://cdn.example.com/products/{product_id}/{i}.jpg" for i in range(3)
+        ],
+        "stock": product_id % 50,
+        "status": "active",
+        "attributes": {"color": "Титановый", "memory": "256GB"},
+        "created_at": "2025-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+    }
+
+
+def _cart_item(i: int) -> dict:
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "product_id": i + 1,
+        "quantity": 1,
+        "product_name": f"Товар {i + 1}",
+        "product_price": "999.90",
+        "product_image": None,
+        "price_changed": False,
+        "current_price": None,
+        "out_of_stock": False,
+        "product_deleted": False,
+        "is_selected": True,
+        "created_at": "2025-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+    }
+
+
+def build_routes(profile: Profile) -> dict[str, list[tuple[str, re.Pattern, bytes]]]:
+    """Заранее сериализованные ответы: {service: [(method, path_regex, body)]}."""
+    n = profile.items_count
+
+    def dump(payload) -> bytes:
+        return json.dumps(payload, ensure_ascii=False).encode()
+
+    products_page = {
+        "items": [_product(i) for i in range(1, n + 1)],
+        "total": 1000,
+        "page": 1,
+        "page_size": n,
+        "total_pages": 1000 // n,
+    }
+    product_detail = {**_product(1), "category": {"id": 2, "title": "Смартфоны"}}
+    categories = [{"id": i, "title": f"Категория {i}"} for i in range(1, n + 1)]
+    attributes = [
+        {
+            "id": i,
+            "category_id": 1,
+            "title": f"Атрибут {i}",
+            "type": "string",
+            "required": False,
+        }
+        for i in range(1, n + 1)
+    ]
+    cart = {
+        "items": [_cart_item(i) for i in range(min(n, 10))],
+        "total_price": "9999.00",
+        "total_items": min(n, 10),
+    }
+    order = {
+        "order_id": "00000000-0000-0000-0000-000000000001",
+        "status": "awaiting_payment",
+        "total_price": 250000,
+        "items": [],
+    }
+    orders = {"total_orders": 0, "page": 1, "page_size": 20, "pages": 0, "items": []}
+    user = {
+        "id": "00000000-0000-0000-0000-000000000001",
+        "email": "user@example.com",
+        "name": "Пользователь",
+        "picture_url": None,
+        "role": "user",
+        "is_active": True,
+        "created_at": "2025-01-01T00:00:00Z",
+    }
+    health = dump({"status": "ok"})
+
+    def route(method: str, pattern: str, payload) -> tuple[str, re.Pattern, bytes]:
+        body = payload if isinstance(payload, bytes) else dump(payload)
+        return method, re.compile(f"^{pattern}$"), body
+
+    return {
+        "auth": [
+            route("GET", "/health", health),
+            route("GET", "/api/v1/users/me", user),
+            route("PATCH", "/api/v1/users/me", user),
+        ],
+        "product": [
+            route("GET", "/health", health),
+            route("GET", "/api/v1/products", products_page),
+            route("GET", r"/api/v1/products/\d+", product_detail),
+            route("GET", "/api/v1/categories", categories),
+            route("GET", r"/api/v1/categories/\d+", categories[0]),
+            route("GET", r"/api/v1/categories/\d+/attributes", attributes),
+            route("GET", "/api/v1/attributes", attributes),
+            route("GET", r"/api/v1/attributes/\d+", attributes[0]),
+        ],
+        "cart": [
+            route("GET", "/health", health),
+            route("GET", "/api/v1/cart", cart),
+            route(
+                "POST", "/api/v1/cart/items", cart["items"][0] if cart["items"] else {}
+            ),
+        ],
+        "order": [
+            route("GET", "/health", health),
+            route("GET", "/api/v1/orders", orders),
+            route("POST", "/api/v1/orders/checkout", order),
+            route("POST", r"/api/v1/orders/[0-9a-f-]+/pay", {"status": "completed"}),
+            route("GET", r"/api/v1/orders/[0-9a-f-]+", order),
+        ],
+        # Принимает OTLP/JSON и ничего не хранит
+        "collector": [
+            route("GET", "/health", health),
+            route("POST", "/v1/traces", {}),
+        ],
+    }
+
+
+def make_app(service: str, profile: Profile):
+    """ASGI-приложение заглушки сервиса."""
+    routes = build_routes(profile)[service]
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        # Тело запроса вычитывается полностью, как у настоящего сервиса
+        more_body = True
+        while more_body:
+            message = await receive()
+            more_body = message.get("more_body", False)
+
+        delay = profile.latency_ms + random.uniform(
+            -profile.jitter_ms, profile.jitter_ms
+        )
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        status, body = 404, b'{"detail":"Not Found"}'
+        for method, pattern, payload in routes:
+            if scope["method"] == method and pattern.match(scope["path"]):
+                status, body = 200, payload
+                break
+        if status == 200 and random.random() < profile.error_rate:
+            status, body = 500, b'{"detail":"Internal error"}'
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+async def serve(port_base: int, profile: Profile, host: str = "127.0.0.1") -> None:
+    """Запуск всех заглушек в одном event loop."""
+    servers = [
+        uvicorn.Server(
+            uvicorn.Config(
+                make_app(service, profile),
+                host=host,
+                port=port,
+                log_level="warning",
+                access_log=False,
+            )
+        )
+        for service, port in service_ports(port_base).items()
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Заглушки внутренних сервисов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port-base", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload", choices=sorted(PAYLOAD_SIZES), default="medium")
+    args = parser.parse_args()
+
+    profile = Profile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        payload=args.payload,
+    )
+    asyncio.run(serve(args.port_base, profile, args.host))
+
+
+if __name__ == "__main__":
+    main()
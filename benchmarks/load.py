@@ -0,0 +1,271 @@
+"""
+Нагрузочный бенчмарк gateway с локальными заглушками сервисов.
+
+Запускает заглушки auth/product/cart/order и gateway (uvicorn) в отдельных
+процессах, нагружает gateway встроенным async-генератором по одной из смесей
+маршрутов (benchmarks/scenarios.py) и сохраняет результат в JSON.
+
+    python -m benchmarks.load --scenario mixed --duration 30 --concurrency 64
+    python -m benchmarks.load --scenario catalog --baseline baseline.json
+
+Результат: RPS, p50/p95/p99 латентности (в целом и по маршрутам), CPU и RSS
+процесса gateway.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.compare import compare, load_result, print_comparison, save_result
+from benchmarks.fake_services import PAYLOAD_SIZES, service_ports
+from benchmarks.processes import (
+    ProcessMonitor,
+    fake_services_command,
+    gateway_command,
+    gateway_env,
+    mint_token,
+    running_process,
+    wait_until_ready,
+)
+from benchmarks.scenarios import SCENARIOS, RouteSpec
+
+
+@dataclass
+class Sample:
+    route: str
+    status: int
+    latency_ms: float
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    ordered = sorted(latencies)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "p50": round(pick(0.50), 3),
+        "p95": round(pick(0.95), 3),
+        "p99": round(pick(0.99), 3),
+        "mean": round(statistics.fmean(ordered), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def summarize(samples: list[Sample], duration: float) -> dict[str, Any]:
+    errors = sum(1 for s in samples if s.status == 0 or s.status >= 500)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / max(len(samples), 1), 4),
+        "rps": round(len(samples) / duration, 1),
+        "latency_ms": percentiles([s.latency_ms for s in samples]),
+    }
+
+
+async def generate_load(
+    base_url: str,
+    specs: list[RouteSpec],
+    concurrency: int,
+    duration: float,
+    warmup: float = 2.0,
+    seed: int = 42,
+) -> tuple[list[Sample], float]:
+    """
+    Замкнутая нагрузка: concurrency воркеров шлют запросы без пауз.
+
+    Запросы во время прогрева (warmup) не учитываются.
+
+    Returns:
+        Сэмплы измеренного периода и его длительность в секундах.
+    """
+    token = mint_token()
+    weights = [spec.weight for spec in specs]
+    samples: list[Sample] = []
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=30.0
+    ) as client:
+        loop_start = time.perf_counter()
+        measure_start = loop_start + warmup
+        deadline = measure_start + duration
+
+        async def worker(worker_id: int) -> None:
+            rng = random.Random(seed + worker_id)
+            while (now := time.perf_counter()) < deadline:
+                spec = rng.choices(specs, weights)[0]
+                headers = spec.render_headers(rng, token)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(
+                        spec.method,
+                        spec.render_path(rng),
+                        headers=headers,
+                        json=spec.body,
+                    )
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = 0
+                end = time.perf_counter()
+                if now >= measure_start:
+                    samples.append(Sample(spec.name, status, (end - start) * 1000))
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+    return samples, duration
+
+
+async def fetch_event_loop_lag(base_url: str) -> dict[str, Any] | None:
+    """Гистограмма задержки event loop gateway за прогон (включая прогрев)."""
+    headers = {"Authorization": f"Bearer {mint_token(role='admin')}"}
+    async with httpx.AsyncClient(base_url=base_url, timeout=5.0) as client:
+        try:
+            response = await client.get("/api/admin/event-loop", headers=headers)
+        except httpx.HTTPError:
+            return None
+    return response.json() if response.status_code == 200 else None
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    specs = SCENARIOS[args.scenario]
+    gateway_url = f"http://127.0.0.1:{args.gateway_port}"
+    fake_ports = service_ports(args.port_base)
+
+    with (
+        running_process(
+            fake_services_command(
+                args.port_base,
+                args.latency_ms,
+                args.jitter_ms,
+                args.error_rate,
+                args.payload,
+            )
+        ),
+        running_process(
+            gateway_command(args.gateway_port),
+            env=gateway_env(
+                args.port_base, LOG_LEVEL=args.log_level, **dict(args.gateway_env)
+            ),
+        ) as gateway,
+    ):
+        for port in fake_ports.values():
+            await wait_until_ready(f"http://127.0.0.1:{port}/health")
+        await wait_until_ready(f"{gateway_url}/health")
+
+        monitor = ProcessMonitor(gateway.pid)
+        monitor.start()
+        samples, duration = await generate_load(
+            gateway_url,
+            specs,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            warmup=args.warmup,
+        )
+        await monitor.stop()
+        event_loop = await fetch_event_loop_lag(gateway_url)
+
+    routes = {
+        spec.name: summarize([s for s in samples if s.route == spec.name], duration)
+        for spec in specs
+    }
+    return {
+        "benchmark": f"load-{args.scenario}",
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "config": {
+            "scenario": args.scenario,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "payload": args.payload,
+            "log_level": args.log_level,
+            "gateway_env": dict(args.gateway_env),
+        },
+        "summary": summarize(samples, duration),
+        "routes": routes,
+        "gateway": monitor.summary(len(samples)),
+        "event_loop": event_loop,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк gateway")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--gateway-port", type=int, default=8900)
+    parser.add_argument("--port-base", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload", choices=sorted(PAYLOAD_SIZES), default="medium")
+    parser.add_argument("--log-level", default="INFO")
+    parser.add_argument(
+        "--gateway-env",
+        type=lambda item: tuple(item.split("=", 1)),
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Дополнительная настройка gateway (например, TRACING_ENABLED=true)",
+    )
+    parser.add_argument("--output", type=Path, help="Файл для сохранения JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON базовой линии")
+    parser.add_argument("--threshold", type=float, default=5.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    path = save_result(result, args.output)
+
+    summary = result["summary"]
+    print(f"scenario: {args.scenario}  saved: {path}")
+    print(
+        f"requests: {summary['requests']}  rps: {summary['rps']}  "
+        f"errors: {summary['errors']}"
+    )
+    print(f"latency ms: {summary['latency_ms']}")
+    print(f"gateway: {result['gateway']}")
+    if result["event_loop"]:
+        print(
+            f"event loop lag ms: max {result['event_loop']['max_ms']}  "
+            f"blocked: {result['event_loop']['blocked_count']}"
+        )
+
+    if args.baseline:
+        deltas = compare(result, load_result(args.baseline), args.threshold)
+        print_comparison(deltas)
+        if any(d.regression for d in deltas):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
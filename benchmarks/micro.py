@@ -0,0 +1,513 @@
+"""
+Микробенчмарки накладных расходов gateway по стадиям обработки запроса.
+
+Каждая стадия (CORS, RequestLoggingMiddleware, извлечение Bearer-токена,
+decode_jwt — при первой встрече токена и из кэша, TokenPayloadSchema,
+UserIdentity, to_headers, проверка по списку отзыва, слот очереди
+к сервисам, построение URL и заголовков в ProxyClient.forward, фильтрация заголовков ответа) измеряется отдельно
+в одном процессе, без сети. Сквозные стадии прогоняют запрос через
+httpx.ASGITransport к gateway, который в свою очередь ходит в заглушки
+сервисов (benchmarks/fake_services.py) тоже через ASGI-транспорт;
+стадии fast_path_* — те же запросы через FastPathMiddleware.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --stage decode_jwt --stage token_payload_schema
+    python -m benchmarks.micro --baseline baseline.json
+    python -m benchmarks.micro --allocations --stage decode_jwt
+
+Для воспроизводимости: фиксированное число итераций, прогрев, несколько
+повторов (в отчёт идут медиана, минимум и разброс в мкс на операцию),
+GC отключён на время замера; в результат пишутся версия Python,
+платформа и коммит. С --allocations для каждой стадии дополнительно
+измеряется пик памяти, выделяемой за одну операцию (tracemalloc, отдельным
+проходом — на время замера он не влияет).
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+import jwt
+import structlog
+
+from benchmarks.compare import (
+    compare,
+    environment_info,
+    load_result,
+    print_comparison,
+    save_result,
+)
+from benchmarks.fake_services import Profile, make_app, service_ports
+from benchmarks.load import git_commit
+from benchmarks.processes import gateway_env, mint_token
+
+PORT_BASE = 9001
+
+# Настройки gateway должны быть заданы до импорта src. Приватный кэш
+# выключен: стадии users_me измеряют проксирование, а не попадание в кэш
+os.environ.update(gateway_env(PORT_BASE, LOG_LEVEL="INFO", PRIVATE_CACHE_TTL="0"))
+
+from fastapi.security import HTTPBearer
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+
+from src.admission import admission
+from src.cache import response_cache
+from src.config import settings
+from src.dependencies import decode_jwt
+from src.identity import UserIdentity, token_cache
+from src.logger import setup_logging
+from src.main import app as gateway_app
+from src.main import cors_options
+from src.middleware.fast_path import FastPathMiddleware
+from src.middleware.request_logger import RequestLoggingMiddleware
+from src.proxy import (
+    build_target_url,
+    build_upstream_headers,
+    filter_response_headers,
+    proxy_client,
+)
+from src.revocation import RevocationList
+from src.schemas.auth import TokenPayloadSchema
+
+GATEWAY_HOST = "gateway.local"
+ORIGIN = "http://localhost:3000"
+
+
+@dataclass
+class Stage:
+    """Измеряемая стадия: op вызывается iterations раз за повтор."""
+
+    name: str
+    op: Callable[[], Any]
+    is_async: bool = False
+    # Стадия, время которой вычитается (например, пустое ASGI-приложение)
+    baseline: str | None = None
+    iterations: int | None = None
+
+
+def _scope(
+    method: str = "GET",
+    path: str = "/api/products",
+    query: bytes = b"page=1&page_size=20",
+    headers: list[tuple[bytes, bytes]] | None = None,
+) -> dict[str, Any]:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": headers or [],
+        "client": ("127.0.0.1", 50000),
+        "server": (GATEWAY_HOST, 80),
+        "state": {},
+    }
+
+
+def _browser_headers(token: str) -> list[tuple[bytes, bytes]]:
+    """Типичный набор заголовков запроса из браузера."""
+    return [
+        (b"host", GATEWAY_HOST.encode()),
+        (b"user-agent", b"Mozilla/5.0 (X11; Linux x86_64) Firefox/131.0"),
+        (b"accept", b"application/json"),
+        (b"accept-language", b"ru-RU,ru;q=0.9,en;q=0.8"),
+        (b"accept-encoding", b"gzip, deflate, br, zstd"),
+        (b"origin", ORIGIN.encode()),
+        (b"referer", f"{ORIGIN}/catalog".encode()),
+        (b"authorization", f"Bearer {token}".encode()),
+        (b"x-request-id", b"00000000-0000-0000-0000-000000000001"),
+    ]
+
+
+async def _receive() -> dict[str, Any]:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(_message: dict[str, Any]) -> None:
+    pass
+
+
+async def _noop_app(scope, receive, send) -> None:
+    """Пустое ASGI-приложение — точка отсчёта для middleware."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def _asgi_call(app, scope: dict[str, Any]) -> Callable[[], Awaitable[None]]:
+    def call() -> Awaitable[None]:
+        # Middleware изменяют scope (state, user и т.д.) — каждому вызову свой
+        return app(dict(scope, state={}), _receive, _send)
+
+    return call
+
+
+def _upstream_transport() -> httpx.AsyncBaseTransport:
+    """Заглушки всех сервисов за одним ASGI-транспортом (маршрутизация по порту)."""
+    profile = Profile(latency_ms=0.0, jitter_ms=0.0)
+    apps = {
+        port: make_app(service, profile)
+        for service, port in service_ports(PORT_BASE).items()
+    }
+
+    async def dispatch(scope, receive, send):
+        await apps[scope["server"][1]](scope, receive, send)
+
+    return httpx.ASGITransport(app=dispatch)
+
+
+def build_stages(token: str) -> list[Stage]:
+    headers = _browser_headers(token)
+    scope = _scope(headers=headers)
+    preflight_scope = _scope(
+        method="OPTIONS",
+        query=b"",
+        headers=headers
+        + [
+            (b"access-control-request-method", b"POST"),
+            (b"access-control-request-headers", b"authorization, content-type"),
+        ],
+    )
+
+    cors = CORSMiddleware(
+        _noop_app,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    request_logging = RequestLoggingMiddleware(_noop_app)
+
+    bearer = HTTPBearer(auto_error=False)
+    request = Request(scope)
+    payload = jwt.decode(
+        token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+    )
+    token_payload = TokenPayloadSchema(**payload)
+    user = UserIdentity.from_payload(token_payload)
+    extra_headers = user.to_headers()
+
+    # Список отзыва с записями других пользователей: токен не отозван
+    revocations = RevocationList()
+    for _ in range(10000):
+        revocations.revoke_user(str(uuid.uuid4()), int(time.time()))
+        revocations.revoke_token(uuid.uuid4().hex, time.time() + 3600)
+
+    async def admission_slot() -> None:
+        async with admission.slot():
+            pass
+
+    def decode_jwt_first_sight() -> UserIdentity:
+        token_cache.clear()
+        return decode_jwt(token)
+
+    upstream_response = httpx.Response(
+        200,
+        headers=[
+            ("content-type", "application/json"),
+            ("content-length", "12345"),
+            ("content-encoding", "gzip"),
+            ("etag", '"0123456789abcdef"'),
+            ("date", "Mon, 19 Oct 2026 12:00:00 GMT"),
+            ("server", "uvicorn"),
+            ("cache-control", "public, max-age=60"),
+            ("x-request-id", "00000000-0000-0000-0000-000000000001"),
+        ],
+    )
+
+    def upstream_request() -> tuple[str, dict[str, str]]:
+        url = build_target_url(
+            settings.PRODUCT_SERVICE_URL, "/api/v1/products", request.url.query
+        )
+        return url, build_upstream_headers(request, extra_headers)
+
+    gateway_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=gateway_app),
+        base_url=f"http://{GATEWAY_HOST}",
+        headers={"origin": ORIGIN},
+    )
+    # Тот же gateway за fast path (как при FAST_PATH_ENABLED=true)
+    fast_path_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(
+            app=FastPathMiddleware(gateway_app, cors_options=cors_options)
+        ),
+        base_url=f"http://{GATEWAY_HOST}",
+        headers={"origin": ORIGIN},
+    )
+    auth_headers = {"Authorization": f"Bearer {token}"}
+    cart_item = {"product_id": 1, "quantity": 1}
+
+    return [
+        Stage("asgi_noop", _asgi_call(_noop_app, scope), is_async=True),
+        Stage(
+            "cors",
+            _asgi_call(cors, scope),
+            is_async=True,
+            baseline="asgi_noop",
+        ),
+        Stage(
+            "cors_preflight",
+            _asgi_call(cors, preflight_scope),
+            is_async=True,
+        ),
+        Stage(
+            "request_logging_middleware",
+            _asgi_call(request_logging, scope),
+            is_async=True,
+            baseline="asgi_noop",
+        ),
+        Stage("http_bearer", lambda: bearer(request), is_async=True),
+        # Полная проверка: подпись, TokenPayloadSchema, UserIdentity
+        Stage("decode_jwt_first_sight", decode_jwt_first_sight),
+        # Повторный запрос с тем же токеном (из token_cache)
+        Stage("decode_jwt", lambda: decode_jwt(token)),
+        Stage("token_payload_schema", lambda: TokenPayloadSchema(**payload)),
+        Stage("user_identity", lambda: UserIdentity.from_payload(token_payload)),
+        Stage("to_headers", user.to_headers),
+        Stage("revocation_check", lambda: revocations.is_revoked(user)),
+        Stage("proxy_upstream_request", upstream_request),
+        # Слот очереди к сервисам без конкуренции
+        Stage("admission_slot", admission_slot, is_async=True),
+        Stage(
+            "filter_response_headers",
+            lambda: filter_response_headers(upstream_response.headers),
+        ),
+        Stage(
+            "gateway_catalog_request",
+            lambda: gateway_client.get("/api/products", params={"page": 1}),
+            is_async=True,
+            iterations=500,
+        ),
+        Stage(
+            "gateway_cart_request",
+            lambda: gateway_client.get("/api/cart", headers=auth_headers),
+            is_async=True,
+            iterations=500,
+        ),
+        Stage(
+            "gateway_users_me_request",
+            lambda: gateway_client.get("/api/users/me", headers=auth_headers),
+            is_async=True,
+            iterations=500,
+        ),
+        Stage(
+            "fast_path_users_me_request",
+            lambda: fast_path_client.get("/api/users/me", headers=auth_headers),
+            is_async=True,
+            iterations=500,
+        ),
+        Stage(
+            "gateway_cart_add_request",
+            lambda: gateway_client.post(
+                "/api/cart/items", json=cart_item, headers=auth_headers
+            ),
+            is_async=True,
+            iterations=500,
+        ),
+        Stage(
+            "fast_path_cart_add_request",
+            lambda: fast_path_client.post(
+                "/api/cart/items", json=cart_item, headers=auth_headers
+            ),
+            is_async=True,
+            iterations=500,
+        ),
+    ]
+
+
+def _measure_sync(op: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        op()
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+
+async def _measure_async(op: Callable[[], Awaitable[Any]], iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        await op()
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+
+async def measure_allocations(stage: Stage, iterations: int) -> float:
+    """
+    Средний пик памяти, выделяемой за одну операцию (байт).
+
+    Пик отсчитывается от объёма до операции: это временные объекты
+    операции, даже если после неё они освобождены.
+    """
+    iterations = min(stage.iterations or iterations, 1000)
+    total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            if stage.is_async:
+                await stage.op()
+            else:
+                stage.op()
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / iterations
+
+
+async def measure(stage: Stage, iterations: int, repeats: int) -> dict[str, float]:
+    """
+    Замер стадии: прогрев и repeats повторов по iterations вызовов.
+
+    Returns:
+        Медиана, минимум и стандартное отклонение времени одной операции (мкс).
+    """
+    iterations = stage.iterations or iterations
+    warmup = max(iterations // 10, 10)
+    timings = []
+
+    gc.collect()
+    gc.disable()
+    try:
+        for n in [warmup] + [iterations] * repeats:
+            if stage.is_async:
+                per_op = await _measure_async(stage.op, n)
+            else:
+                per_op = _measure_sync(stage.op, n)
+            timings.append(per_op)
+    finally:
+        gc.enable()
+
+    timings = timings[1:]
+    return {
+        "median_us": round(statistics.median(timings), 3),
+        "min_us": round(min(timings), 3),
+        "stdev_us": round(statistics.stdev(timings), 3) if len(timings) > 1 else 0.0,
+        "iterations": iterations,
+        "repeats": repeats,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    # Логи рендерятся как обычно (стоимость учитывается), но никуда не пишутся
+    setup_logging()
+    structlog.configure(logger_factory=structlog.ReturnLoggerFactory())
+    if args.no_cache:
+        response_cache.ttl = 0.0
+
+    await proxy_client.start()
+    await proxy_client.client.aclose()
+    proxy_client.client = httpx.AsyncClient(
+        transport=_upstream_transport(), trust_env=False
+    )
+
+    stages = build_stages(mint_token())
+    if args.stage:
+        stages = [s for s in stages if s.name in args.stage or s.name == "asgi_noop"]
+
+    results: dict[str, dict[str, float]] = {}
+    try:
+        for stage in stages:
+            result = await measure(stage, args.iterations, args.repeats)
+            if args.allocations:
+                result["alloc_peak_bytes"] = round(
+                    await measure_allocations(stage, args.iterations), 1
+                )
+            if stage.baseline in results:
+                base = results[stage.baseline]["median_us"]
+                result["net_median_us"] = round(result["median_us"] - base, 3)
+            results[stage.name] = result
+    finally:
+        await proxy_client.stop()
+
+    return {
+        "benchmark": "micro",
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "environment": environment_info(),
+        "config": {
+            "iterations": args.iterations,
+            "repeats": args.repeats,
+            "response_cache": not args.no_cache,
+            "allocations": args.allocations,
+        },
+        "stages": results,
+    }
+
+
+def print_stages(stages: dict[str, dict[str, float]]) -> None:
+    allocations = any("alloc_peak_bytes" in r for r in stages.values())
+    header = f"{'stage':<32}{'median µs':>12}{'min µs':>12}{'stdev':>10}{'net µs':>10}"
+    if allocations:
+        header += f"{'alloc B':>12}"
+    print(header)
+    for name, r in stages.items():
+        net = r.get("net_median_us")
+        net_str = f"{net:>10.2f}" if net is not None else f"{'':>10}"
+        line = (
+            f"{name:<32}{r['median_us']:>12.2f}{r['min_us']:>12.2f}"
+            f"{r['stdev_us']:>10.2f}{net_str}"
+        )
+        if allocations:
+            line += f"{r.get('alloc_peak_bytes', 0):>12.0f}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Микробенчмарки стадий gateway")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument(
+        "--stage", action="append", help="Измерить только указанные стадии"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Отключить кэш ответов в сквозных стадиях",
+    )
+    parser.add_argument(
+        "--allocations",
+        action="store_true",
+        help="Измерить пик выделяемой памяти на операцию (tracemalloc)",
+    )
+    parser.add_argument("--output", type=Path, help="Файл для сохранения JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON базовой линии")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    path = save_result(result, args.output)
+
+    print(f"python {result['environment']['python']}  saved: {path}")
+    print_stages(result["stages"])
+
+    if args.baseline:
+        deltas = compare(result, load_result(args.baseline), args.threshold)
+        print_comparison(deltas)
+        if any(d.regression for d in deltas):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Запуск gateway и заглушек в отдельных процессах и замер их ресурсов."""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import jwt
+
+from benchmarks.fake_services import service_ports
+
+ROOT_DIR = Path(__file__).parent.parent
+
+JWT_SECRET = "benchmark-secret-key-0123456789abcdef"
+JWT_ALGORITHM = "HS256"
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def mint_token(role: str = "user", ttl: int = 3600) -> str:
+    """Access-токен, который примет gateway, запущенный через start_gateway."""
+    now = int(time.time())
+    payload = {
+        "sub": str(uuid.uuid4()),
+        "email": "bench@example.com",
+        "role": role,
+        "type": "access",
+        "iat": now,
+        "exp": now + ttl,
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def gateway_env(port_base: int, **overrides: str) -> dict[str, str]:
+    """Окружение gateway, направленное на локальные заглушки."""
+    ports = service_ports(port_base)
+    env = {
+        **os.environ,
+        "AUTH_SERVICE_URL": f"http://127.0.0.1:{ports['auth']}",
+        "PRODUCT_SERVICE_URL": f"http://127.0.0.1:{ports['product']}",
+        "CART_SERVICE_URL": f"http://127.0.0.1:{ports['cart']}",
+        "ORDER_SERVICE_URL": f"http://127.0.0.1:{ports['order']}",
+        "TRACING_OTLP_ENDPOINT": f"http://127.0.0.1:{ports['collector']}/v1/traces",
+        "JWT_SECRET_KEY": JWT_SECRET,
+        "JWT_ALGORITHM": JWT_ALGORITHM,
+    }
+    env.update(overrides)
+    return env
+
+
+@contextmanager
+def running_process(args: list[str], env: dict[str, str] | None = None):
+    """Дочерний процесс, который гарантированно завершается при выходе."""
+    process = subprocess.Popen(
+        args,
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def fake_services_command(
+    port_base: int,
+    latency_ms: float,
+    jitter_ms: float,
+    error_rate: float,
+    payload: str,
+) -> list[str]:
+    return [
+        sys.executable,
+        "-m",
+        "benchmarks.fake_services",
+        "--port-base",
+        str(port_base),
+        "--latency-ms",
+        str(latency_ms),
+        "--jitter-ms",
+        str(jitter_ms),
+        "--error-rate",
+        str(error_rate),
+        "--payload",
+        payload,
+    ]
+
+
+def gateway_command(port: int, app: str = "src.main:app") -> list[str]:
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        app,
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--no-access-log",
+    ]
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> float:
+    """
+    Ожидание, пока URL начнёт отвечать.
+
+    Returns:
+        Время ожидания в секундах.
+    """
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=1.0) as client:
+        while True:
+            try:
+                await client.get(url)
+                return time.perf_counter() - start
+            except httpx.HTTPError:
+                if time.perf_counter() - start > timeout:
+                    raise TimeoutError(f"{url} is not ready after {timeout}s")
+                await asyncio.sleep(0.02)
+
+
+@dataclass
+class ProcessMonitor:
+    """Замер CPU и RSS процесса через /proc (только Linux)."""
+
+    pid: int
+    interval: float = 0.25
+    rss_samples: list[float] = field(default_factory=list)
+    _cpu_start: float = 0.0
+    _wall_start: float = 0.0
+    _cpu_seconds: float = 0.0
+    _wall_seconds: float = 0.0
+    _task: asyncio.Task | None = None
+
+    def _cpu_time(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Имя процесса может содержать пробелы — разбираем после ')'
+            fields = f.read().rsplit(")", 1)[1].split()
+        utime, stime = int(fields[11]), int(fields[12])
+        return (utime + stime) / CLOCK_TICKS
+
+    def _rss_mb(self) -> float:
+        with open(f"/proc/{self.pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * PAGE_SIZE / (1024 * 1024)
+
+    async def _sample(self) -> None:
+        while True:
+            self.rss_samples.append(self._rss_mb())
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._cpu_start = self._cpu_time()
+        self._wall_start = time.perf_counter()
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        self._cpu_seconds = self._cpu_time() - self._cpu_start
+        self._wall_seconds = time.perf_counter() - self._wall_start
+        self.rss_samples.append(self._rss_mb())
+        if self._task is not None:
+            self._task.cancel()
+
+    def summary(self, requests: int) -> dict[str, float]:
+        return {
+            "cpu_seconds": round(self._cpu_seconds, 3),
+            "cpu_percent": round(self._cpu_seconds / self._wall_seconds * 100, 1),
+            "cpu_ms_per_request": round(self._cpu_seconds * 1000 / max(requests, 1), 4),
+            "rss_mb_max": round(max(self.rss_samples), 1),
+            "rss_mb_end": round(self.rss_samples[-1], 1),
+        }
@@ -0,0 +1,112 @@
+"""Смеси запросов к gateway для нагрузочных бенчмарков."""
+
+import random
+import uuid
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RouteSpec:
+    """Один тип запроса в смеси."""
+
+    name: str
+    weight: int
+    method: str
+    path: str
+    auth: bool = False
+    body: dict | None = None
+    # Сколько разных Idempotency-Key отправляется по кругу (0 — без заголовка)
+    idempotency_keys: int = 0
+
+    def render_path(self, rng: random.Random) -> str:
+        return self.path.format(
+            product_id=rng.randint(1, 1000),
+            category_id=rng.randint(1, 10),
+            order_id=uuid.UUID(int=rng.getrandbits(128)),
+        )
+
+    def render_headers(self, rng: random.Random, token: str) -> dict[str, str]:
+        headers = {"Authorization": f"Bearer {token}"} if self.auth else {}
+        if self.idempotency_keys:
+            key = rng.randrange(self.idempotency_keys)
+            headers["Idempotency-Key"] = f"{self.name}-{key}"
+        return headers
+
+
+CATALOG = [
+    RouteSpec("products_list", 40, "GET", "/api/products?page=1"),
+    RouteSpec("product_detail", 30, "GET", "/api/products/{product_id}"),
+    RouteSpec("categories_list", 15, "GET", "/api/categories"),
+    RouteSpec(
+        "category_attributes", 15, "GET", "/api/categories/{category_id}/attributes"
+    ),
+]
+
+AUTHENTICATED = [
+    RouteSpec("cart", 40, "GET", "/api/cart", auth=True),
+    RouteSpec("users_me", 30, "GET", "/api/users/me", auth=True),
+    RouteSpec("orders", 20, "GET", "/api/v1/orders", auth=True),
+    RouteSpec(
+        "add_cart_item",
+        10,
+        "POST",
+        "/api/cart/items",
+        auth=True,
+        body={"product_id": 1, "quantity": 1},
+    ),
+]
+
+CHECKOUT = [
+    RouteSpec("cart", 40, "GET", "/api/cart", auth=True),
+    RouteSpec("checkout", 30, "POST", "/api/v1/orders/checkout", auth=True),
+    RouteSpec("pay", 30, "POST", "/api/v1/orders/{order_id}/pay", auth=True),
+]
+
+# Повторы оформления заказа клиентами с теми же Idempotency-Key
+RETRY_STORM = [
+    RouteSpec(
+        "checkout_retry",
+        100,
+        "POST",
+        "/api/v1/orders/checkout",
+        auth=True,
+        idempotency_keys=50,
+    ),
+]
+
+# Поток просмотра каталога вперемешку с оформлением и оплатой заказа
+# (латентность checkout/pay под нагрузкой, очередь по классам запросов)
+PRIORITY = CATALOG + [
+    RouteSpec("checkout", 4, "POST", "/api/v1/orders/checkout", auth=True),
+    RouteSpec("pay", 4, "POST", "/api/v1/orders/{order_id}/pay", auth=True),
+]
+
+# Маршруты, которые при FAST_PATH_ENABLED=true обрабатывает fast path
+PASSTHROUGH = [
+    RouteSpec("users_me", 40, "GET", "/api/users/me", auth=True),
+    RouteSpec(
+        "add_cart_item",
+        30,
+        "POST",
+        "/api/cart/items",
+        auth=True,
+        body={"product_id": 1, "quantity": 1},
+    ),
+    RouteSpec("order_detail", 30, "GET", "/api/v1/orders/{order_id}", auth=True),
+]
+
+# Типичная сессия витрины: в основном каталог, часть запросов с авторизацией
+MIXED = CATALOG + [
+    RouteSpec(spec.name, spec.weight // 2, spec.method, spec.path, spec.auth, spec.body)
+    for spec in AUTHENTICATED
+]
+
+SCENARIOS: dict[str, list[RouteSpec]] = {
+    "catalog": CATALOG,
+    "authenticated": AUTHENTICATED,
+    "checkout": CHECKOUT,
+    "retry_storm": RETRY_STORM,
+    "priority": PRIORITY,
+    "passthrough": PASSTHROUGH,
+    "mixed": MIXED,
+}
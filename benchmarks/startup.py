@@ -0,0 +1,214 @@
+"""
+Бенчмарк запуска gateway: время импорта и время до первого ответа.
+
+Импорт измеряется через `python -X importtime -c "import src.main"` в отдельных
+процессах (время src.main целиком, собственные модули src.* и самые
+тяжёлые модули). Время до первого ответа — от запуска процесса uvicorn до
+первого успешного ответа на запрос каталога; затем измеряется первый запрос
+с токеном и тот же запрос на прогретом процессе. Запуски повторяются
+с выключенным прогревом (WARMUP_ENABLED=false), чтобы видеть разницу
+первого запроса на холодном и прогретом пуле соединений.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.compare import (
+    compare,
+    environment_info,
+    load_result,
+    print_comparison,
+    save_result,
+)
+from benchmarks.fake_services import service_ports
+from benchmarks.load import git_commit
+from benchmarks.processes import (
+    ROOT_DIR,
+    fake_services_command,
+    gateway_command,
+    gateway_env,
+    mint_token,
+    running_process,
+    wait_until_ready,
+)
+
+READY_PATH = "/api/products?page=1"
+AUTH_PATH = "/api/cart"
+WARM_REQUESTS = 20
+
+
+def _parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Строки "import time: self | cumulative | module" -> {module: (self, cum)}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import(runs: int, env: dict[str, str], top: int) -> dict[str, Any]:
+    totals, own = [], []
+    self_times: dict[str, list[int]] = defaultdict(list)
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import src.main"],
+            cwd=ROOT_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        modules = _parse_importtime(result.stderr)
+        totals.append(modules["src.main"][1] / 1000)
+        own.append(
+            sum(s for name, (s, _) in modules.items() if name.startswith("src")) / 1000
+        )
+        for name, (self_us, _) in modules.items():
+            self_times[name].append(self_us)
+
+    heaviest = sorted(
+        ((name, statistics.median(times) / 1000) for name, times in self_times.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    return {
+        "import_ms": round(statistics.median(totals), 1),
+        "own_modules_ms": round(statistics.median(own), 1),
+        "top_modules_ms": {name: round(ms, 2) for name, ms in heaviest},
+    }
+
+
+async def _timed_get(
+    client: httpx.AsyncClient, path: str, headers: dict[str, str] | None = None
+) -> tuple[int, float]:
+    start = time.perf_counter()
+    response = await client.get(path, headers=headers)
+    return response.status_code, (time.perf_counter() - start) * 1000
+
+
+async def measure_first_request(
+    port: int, env: dict[str, str], timeout: float = 30.0
+) -> dict[str, float]:
+    """Один холодный запуск gateway: время до первого ответа и первые запросы."""
+    base_url = f"http://127.0.0.1:{port}"
+    auth = {"Authorization": f"Bearer {mint_token()}"}
+
+    spawned = time.perf_counter()
+    with running_process(gateway_command(port), env=env):
+        async with httpx.AsyncClient(base_url=base_url, timeout=5.0) as client:
+            while True:
+                try:
+                    status, first_ms = await _timed_get(client, READY_PATH)
+                    if status == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.perf_counter() - spawned > timeout:
+                    raise TimeoutError(f"gateway is not ready after {timeout}s")
+                await asyncio.sleep(0.005)
+            ready_ms = (time.perf_counter() - spawned) * 1000
+
+            _, first_auth_ms = await _timed_get(client, AUTH_PATH, auth)
+            warm = [
+                (await _timed_get(client, AUTH_PATH, auth))[1]
+                for _ in range(WARM_REQUESTS)
+            ]
+
+    return {
+        "ready_ms": ready_ms,
+        "first_request_ms": first_ms,
+        "first_auth_request_ms": first_auth_ms,
+        "warm_request_ms": statistics.median(warm),
+    }
+
+
+def _median_runs(runs: list[dict[str, float]]) -> dict[str, float]:
+    return {key: round(statistics.median(r[key] for r in runs), 2) for key in runs[0]}
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    env = gateway_env(args.port_base, LOG_LEVEL="WARNING")
+    imports = measure_import(args.runs, env, args.top)
+
+    with running_process(
+        fake_services_command(args.port_base, 0.0, 0.0, 0.0, "medium")
+    ):
+        for port in service_ports(args.port_base).values():
+            await wait_until_ready(f"http://127.0.0.1:{port}/health")
+        warm_runs = [
+            await measure_first_request(args.gateway_port, env)
+            for _ in range(args.runs)
+        ]
+        cold_env = {**env, "WARMUP_ENABLED": "false"}
+        cold_runs = [
+            await measure_first_request(args.gateway_port, cold_env)
+            for _ in range(args.runs)
+        ]
+
+    startup = {
+        "import_ms": imports["import_ms"],
+        "own_modules_ms": imports["own_modules_ms"],
+        **_median_runs(warm_runs),
+    }
+
+    return {
+        "benchmark": "startup",
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "environment": environment_info(),
+        "config": {"runs": args.runs, "cpu_count": os.cpu_count()},
+        "startup": startup,
+        "startup_no_warmup": _median_runs(cold_runs),
+        "import_top_modules_ms": imports["top_modules_ms"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк запуска gateway")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Сколько модулей в отчёте")
+    parser.add_argument("--gateway-port", type=int, default=8900)
+    parser.add_argument("--port-base", type=int, default=9001)
+    parser.add_argument("--output", type=Path, help="Файл для сохранения JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON базовой линии")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    path = save_result(result, args.output)
+
+    print(f"saved: {path}")
+    print(f"{'':<24}{'warmup':>10}{'no warmup':>12}")
+    for key, value in result["startup"].items():
+        cold = result["startup_no_warmup"].get(key)
+        cold_str = f"{cold:>12.1f}" if cold is not None else f"{'':>12}"
+        print(f"{key:<24}{value:>10.1f}{cold_str}  ms")
+    print("heaviest modules (self, ms):")
+    for name, ms in result["import_top_modules_ms"].items():
+        print(f"  {name:<48}{ms:>8.2f}")
+
+    if args.baseline:
+        deltas = compare(result, load_result(args.baseline), args.threshold)
+        print_comparison(deltas)
+        if any(d.regression for d in deltas):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
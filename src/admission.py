@@ -0,0 +1,259 @@
+"""
+Приоритетная очередь запросов к внутренним сервисам.
+
+Все запросы к сервисам делят один пул соединений httpx, и без очереди
+поток анонимного просмотра каталога задерживает оформление и оплату заказа
+наравне со всеми. Перед отправкой каждой попытки ProxyClient занимает слот
+(ADMISSION_MAX_CONCURRENCY — не больше пула соединений); когда свободных
+слотов нет, запрос ждёт в очереди своего класса:
+- critical — оформление и оплата заказа;
+- authenticated — запросы с проверенным токеном;
+- anonymous — всё остальное (в основном каталог).
+
+Освободившийся слот получает класс с наименьшим виртуальным временем
+(stride scheduling): каждый выданный слот сдвигает время класса на
+1 / вес (ADMISSION_WEIGHTS). При весах 8:3:1 и очередях во всех классах
+critical получает 8 слотов из 12, но anonymous не голодает. Класс, очередь
+которого была пуста, не накапливает «кредит» за время простоя.
+
+Класс critical определяется по методу и пути в начале обработки входящего
+запроса. До authenticated запрос повышается только после проверки токена
+(decode_jwt): сам заголовок Authorization ничего не даёт, иначе любой
+«Bearer x» получал бы долю authenticated. Время ожидания слота
+попадает в Server-Timing (фаза queue) и в гистограммы по классам
+(GET /api/admin/admission).
+"""
+
+import asyncio
+import re
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+import httpx
+
+from src.config import settings
+from src.loop_monitor import LagHistogram
+from src.timing import measure
+
+CRITICAL = "critical"
+AUTHENTICATED = "authenticated"
+ANONYMOUS = "anonymous"
+PRIORITY_CLASSES = (CRITICAL, AUTHENTICATED, ANONYMOUS)
+
+_CRITICAL_PATH = re.compile(r"/api/v1/orders/(?:checkout|[^/]+/pay)")
+
+
+class RequestPriority:
+    """
+    Класс входящего запроса.
+
+    Один изменяемый объект на весь запрос (как RequestTimings): токен
+    проверяется в синхронных зависимостях FastAPI, которые выполняются
+    в пуле потоков с копией контекста, и новое значение ContextVar оттуда
+    не вернулось бы в запрос.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: str):
+        self.value = value
+
+
+# Класс текущего входящего запроса; вне запроса (прогрев, фоновые задачи) —
+# anonymous
+request_priority: ContextVar[RequestPriority | None] = ContextVar(
+    "request_priority", default=None
+)
+
+
+def start_request_priority(method: str, path: str) -> RequestPriority:
+    """
+    Класс входящего запроса для очереди к сервисам (до проверки токена).
+
+    Args:
+        method: HTTP-метод
+        path: Путь запроса
+
+    Returns:
+        Класс запроса (повышается mark_authenticated)
+    """
+    if method == "POST" and _CRITICAL_PATH.fullmatch(path):
+        priority = RequestPriority(CRITICAL)
+    else:
+        priority = RequestPriority(ANONYMOUS)
+    request_priority.set(priority)
+    return priority
+
+
+def mark_authenticated() -> None:
+    """Повышение anonymous до authenticated после проверки токена."""
+    priority = request_priority.get()
+    if priority is not None and priority.value == ANONYMOUS:
+        priority.value = AUTHENTICATED
+
+
+def current_priority() -> str:
+    priority = request_priority.get()
+    return ANONYMOUS if priority is None else priority.value
+
+
+@dataclass
+class _PriorityClass:
+    weight: float
+    waiters: deque[asyncio.Future] = field(default_factory=deque)
+    # Виртуальное время класса (stride scheduling)
+    pass_value: float = 0.0
+    admitted: int = 0
+    queued: int = 0
+    abandoned: int = 0
+    # Время ожидания слота (только запросы, которые ждали)
+    wait: LagHistogram = field(default_factory=LagHistogram)
+
+
+class AdmissionController:
+    """Слоты запросов к сервисам с взвешенной очередью по классам."""
+
+    def __init__(self, slots: int, weights: dict[str, float]):
+        self.slots = slots
+        self._classes = {
+            name: _PriorityClass(weight=max(weights.get(name, 1.0), 0.001))
+            for name in PRIORITY_CLASSES
+        }
+        self._in_use = 0
+        self._waiting = 0
+        self._virtual_time = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.slots > 0
+
+    def slot(self, priority: str | None = None) -> "AdmissionSlot":
+        """Слот на время одной попытки запроса к сервису (async with)."""
+        return AdmissionSlot(self, priority)
+
+    async def acquire(self, priority: str | None = None) -> None:
+        """
+        Ожидание свободного слота в очереди класса.
+
+        Время ожидания ограничивает вызывающий (дедлайн запроса): при отмене
+        запрос уходит из очереди, а уже выданный ему слот передаётся дальше.
+        """
+        state = self._classes[priority or current_priority()]
+        if self._in_use < self.slots and not self._waiting:
+            self._in_use += 1
+            state.admitted += 1
+            return
+
+        if not state.waiters:
+            state.pass_value = max(state.pass_value, self._virtual_time)
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        state.waiters.append(waiter)
+        self._waiting += 1
+        state.queued += 1
+        started = loop.time()
+        try:
+            with measure("queue"):
+                await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # Слот выдан, но ожидающий ушёл — он достаётся следующему
+                self.release()
+            else:
+                state.waiters.remove(waiter)
+                self._waiting -= 1
+            state.abandoned += 1
+            raise
+        finally:
+            state.wait.observe((loop.time() - started) * 1000)
+
+    def release(self) -> None:
+        self._in_use -= 1
+        while self._waiting and self._in_use < self.slots:
+            state = min(
+                (state for state in self._classes.values() if state.waiters),
+                key=lambda state: state.pass_value,
+            )
+            waiter = state.waiters.popleft()
+            self._waiting -= 1
+            self._virtual_time = state.pass_value
+            state.pass_value += 1 / state.weight
+            self._in_use += 1
+            state.admitted += 1
+            waiter.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "slots": self.slots,
+            "in_use": self._in_use,
+            "waiting": self._waiting,
+            "classes": {
+                name: {
+                    "weight": state.weight,
+                    "waiting": len(state.waiters),
+                    "admitted": state.admitted,
+                    "queued": state.queued,
+                    "abandoned": state.abandoned,
+                    "wait": state.wait.snapshot(),
+                }
+                for name, state in self._classes.items()
+            },
+        }
+
+
+class AdmissionSlot:
+    """
+    Контекстный менеджер слота.
+
+    Класс, а не asynccontextmanager: слот занимается на каждой попытке
+    запроса к сервису, а генераторная обёртка стоит в несколько раз дороже.
+    """
+
+    __slots__ = ("_controller", "_held", "_priority")
+
+    def __init__(self, controller: AdmissionController, priority: str | None):
+        self._controller = controller
+        self._priority = priority
+        self._held = False
+
+    async def __aenter__(self) -> None:
+        if self._controller.enabled:
+            await self._controller.acquire(self._priority)
+            self._held = True
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._held:
+            self._held = False
+            self._controller.release()
+
+
+class SlotReleasingStream(httpx.AsyncByteStream):
+    """
+    Поток тела ответа, который освобождает слот при закрытии.
+
+    Ответ с открытым потоком (fast path) занимает соединение пула, пока
+    тело передаётся клиенту, поэтому слот освобождается только вместе с ним.
+    """
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Callable[[], None] | None = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+admission = AdmissionController(
+    slots=settings.ADMISSION_MAX_CONCURRENCY, weights=settings.ADMISSION_WEIGHTS
+)
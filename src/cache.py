@@ -0,0 +1,340 @@
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from src import compression
+from src.config import settings
+
+
+@dataclass
+class CachedResponse:
+    """Закэшированный ответ внутреннего сервиса."""
+
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes
+    etag: str
+    expires_at: float
+    # Когда ответ получен от сервиса (time.monotonic) — для заголовка Age
+    stored_at: float = field(default_factory=time.monotonic)
+    # Теги ресурсов (product:{id}, category:{id}, ...) для инвалидации по событиям
+    tags: frozenset[str] = frozenset()
+    # Сжатые варианты тела: {encoding: bytes}
+    encodings: dict[str, bytes] = field(default_factory=dict)
+    # Content-Encoding апстрима, которую gateway не декодирует: тело хранится
+    # и отдаётся как есть, без пересжатия
+    content_encoding: str | None = None
+    # Вызывается, когда в запись добавлен сжатый вариант (учёт размера кэша)
+    on_grow: Callable[[int], None] | None = field(
+        default=None, repr=False, compare=False
+    )
+
+    @property
+    def content_type(self) -> str | None:
+        for key, value in self.headers:
+            if key.lower() == "content-type":
+                return value
+        return None
+
+    @property
+    def is_expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    @property
+    def size(self) -> int:
+        """Примерный объём записи в памяти: тела и заголовки (байт)."""
+        return (
+            len(self.content)
+            + sum(len(body) for body in self.encodings.values())
+            + sum(len(key) + len(value) for key, value in self.headers)
+        )
+
+    @property
+    def age(self) -> int:
+        """Возраст ответа в секундах (заголовок Age)."""
+        return int(time.monotonic() - self.stored_at)
+
+    @property
+    def compressible(self) -> bool:
+        if self.content_encoding is not None:
+            return False
+        return compression.is_compressible(
+            self.status_code, self.content_type, len(self.content)
+        )
+
+    async def encoded(self, encoding: str) -> bytes:
+        """
+        Тело в указанной кодировке.
+
+        Сжатие выполняется один раз на каждую кодировку, результат
+        сохраняется в записи кэша.
+        """
+        body = self.encodings.get(encoding)
+        if body is None:
+            body = await compression.compress(self.content, encoding)
+            self.encodings[encoding] = body
+            if self.on_grow is not None:
+                self.on_grow(len(body))
+        return body
+
+
+# Теги ресурсов каталога. Списки помечаются общим тегом ресурса: изменение
+# любого товара (категории, атрибута) инвалидирует все его списки
+PRODUCTS_TAG = "products"
+CATEGORIES_TAG = "categories"
+# Списки атрибутов, в том числе атрибуты отдельных категорий
+ATTRIBUTES_TAG = "attributes"
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def category_tag(category_id: int) -> str:
+    return f"category:{category_id}"
+
+
+def category_attributes_tag(category_id: int) -> str:
+    return f"attributes:category:{category_id}"
+
+
+def attribute_tag(attribute_id: int) -> str:
+    return f"attribute:{attribute_id}"
+
+
+# Разделы приватного кэша пользователя: запись пользователя в разделе
+# инвалидирует его закэшированные чтения этого раздела
+PROFILE_SECTION = "profile"
+CART_SECTION = "cart"
+ORDERS_SECTION = "orders"
+
+
+def user_tag(user_id, section: str) -> str:
+    return f"user:{user_id}:{section}"
+
+
+def compute_etag(content: bytes) -> str:
+    """Strong ETag по содержимому (несжатому) тела ответа."""
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def variant_etag(etag: str | None, encoding: str | None) -> str | None:
+    """
+    ETag сжатого варианта ответа.
+
+    Strong ETag должен различаться для разных content-encoding,
+    поэтому к нему добавляется суффикс кодировки.
+    """
+    if etag is None or encoding is None or not etag.endswith('"'):
+        return etag
+    if etag.startswith("W/"):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _strip_variant(tag: str) -> str:
+    tag = tag.strip()
+    for encoding in compression.SUPPORTED_ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return f'{tag[: -len(suffix)]}"'
+    return tag
+
+
+def strip_etag_variants(if_none_match: str) -> str:
+    """If-None-Match без суффиксов кодировок (для передачи апстриму)."""
+    if if_none_match.strip() == "*":
+        return "*"
+    return ", ".join(_strip_variant(tag) for tag in if_none_match.split(","))
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak-сравнение If-None-Match с ETag ответа (RFC 9110, 13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    base = _strip_variant(etag).removeprefix("W/")
+    return any(
+        _strip_variant(tag).removeprefix("W/") == base
+        for tag in if_none_match.split(",")
+    )
+
+
+class ResponseCache:
+    """
+    In-memory LRU-кэш ответов с TTL.
+
+    Общий кэш (response_cache) хранит публичные данные каталога, приватный
+    (private_cache) — ответы конкретному пользователю: его ключи включают
+    ID пользователя, поэтому записи разных пользователей не пересекаются.
+
+    Размер ограничен и числом записей, и суммарным объёмом (с учётом сжатых
+    вариантов): при превышении вытесняются давно не использованные записи.
+
+    Истёкшая запись хранится ещё stale_ttl секунд: get() её
+    не возвращает, но get_stale() отдаёт её, когда сервис недоступен
+    (stale-if-error, RFC 5861).
+
+    Вторичный индекс tag -> ключи позволяет удалить все записи ресурса
+    за O(число тегов + число удаляемых записей), без обхода всего кэша.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        private: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # Кэш ответов одному пользователю: Cache-Control: private допустим
+        self.private = private
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        # Учтённый объём каждой записи и их сумма
+        self._sizes: dict[str, int] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._evictions = 0
+        self._purged = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        if entry.is_expired:
+            if self._outlived(entry):
+                self._remove(key)
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry
+
+    def get_stale(self, key: str) -> CachedResponse | None:
+        """Запись, в том числе истёкшая, но ещё в пределах окна stale."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._outlived(entry):
+            self._remove(key)
+            return None
+        self._stale_hits += 1
+        return entry
+
+    def get_many(self, keys: list[str]) -> dict[str, CachedResponse]:
+        """Пакетный поиск: только найденные и не истёкшие записи."""
+        found = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                found[key] = entry
+        return found
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = entry.size
+        if size > self.max_bytes:
+            # Запись больше всего кэша: вытеснила бы всё остальное
+            return
+        self._entries[key] = entry
+        self._sizes[key] = size
+        self._bytes += size
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+        entry.on_grow = lambda grown: self._grow(key, entry, grown)
+        self._evict()
+
+    def purge_tags(self, tags: Iterable[str]) -> int:
+        """
+        Удаление записей с любым из тегов (вместе с устаревшими).
+
+        Returns:
+            Число удалённых записей
+        """
+        keys: set[str] = set()
+        for tag in tags:
+            keys |= self._tags.get(tag, set())
+        for key in keys:
+            self._remove(key)
+        self._purged += len(keys)
+        return len(keys)
+
+    def stats(self) -> dict[str, int]:
+        """Состояние кэша и счётчики с момента запуска."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "tags": len(self._tags),
+            "hits": self._hits,
+            "misses": self._misses,
+            "stale_hits": self._stale_hits,
+            "evictions": self._evictions,
+            "purged": self._purged,
+        }
+
+    def clear(self) -> None:
+        for entry in self._entries.values():
+            entry.on_grow = None
+        self._entries.clear()
+        self._tags.clear()
+        self._sizes.clear()
+        self._bytes = 0
+
+    def _outlived(self, entry: CachedResponse) -> bool:
+        """Истекло и окно, в котором запись отдаётся при недоступности сервиса."""
+        return time.monotonic() >= entry.expires_at + self.stale_ttl
+
+    def _grow(self, key: str, entry: CachedResponse, grown: int) -> None:
+        # Сжатый вариант мог появиться у записи, которую уже заменили
+        if self._entries.get(key) is not entry:
+            return
+        self._sizes[key] += grown
+        self._bytes += grown
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        entry.on_grow = None
+        self._bytes -= self._sizes.pop(key)
+        for tag in entry.tags:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.RESPONSE_CACHE_TTL,
+    stale_ttl=settings.RESPONSE_CACHE_STALE_TTL,
+)
+
+private_cache = ResponseCache(
+    max_entries=settings.PRIVATE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.PRIVATE_CACHE_MAX_BYTES,
+    ttl=settings.PRIVATE_CACHE_TTL,
+    private=True,
+)
@@ -0,0 +1,116 @@
+"""
+Инвалидация кэша ответов каталога по событиям Product Service.
+
+Product Service сообщает об изменении товаров, категорий и атрибутов
+(тем же механизмом webhook'ов, которым обновляются флаги корзины) —
+gateway удаляет из кэша записи с тегами изменённого ресурса. Поэтому TTL
+кэша можно держать длинным, не рискуя отдавать старые цены.
+
+События принимаются двумя путями:
+- POST /api/internal/cache/invalidate с заголовком X-Internal-Token;
+- опционально — UDP-датаграммы с тем же JSON на локальном адресе
+  (CACHE_EVENTS_UDP_PORT): их публикует агент или sidecar рядом
+  с gateway, без HTTP-запроса на каждое событие.
+"""
+
+import asyncio
+
+from pydantic import ValidationError
+
+from src.cache import (
+    ATTRIBUTES_TAG,
+    CATEGORIES_TAG,
+    PRODUCTS_TAG,
+    attribute_tag,
+    category_attributes_tag,
+    category_tag,
+    product_tag,
+    response_cache,
+)
+from src.config import settings
+from src.logger import get_logger
+from src.schemas.internal import CacheInvalidationRequestSchema, CatalogEventSchema
+
+logger = get_logger(__name__)
+
+
+def event_tags(event: CatalogEventSchema) -> set[str]:
+    """Теги записей кэша, которые устаревают после события."""
+    if event.resource == "product":
+        return {product_tag(event.id), PRODUCTS_TAG}
+    if event.resource == "category":
+        return {
+            category_tag(event.id),
+            category_attributes_tag(event.id),
+            CATEGORIES_TAG,
+        }
+    return {attribute_tag(event.id), ATTRIBUTES_TAG}
+
+
+def invalidate(events: list[CatalogEventSchema], source: str) -> tuple[set[str], int]:
+    """
+    Удаление записей кэша по событиям каталога.
+
+    Args:
+        events: События изменения ресурсов
+        source: Откуда пришли события (для логирования)
+
+    Returns:
+        Теги, по которым удалялись записи, и число удалённых записей
+    """
+    tags: set[str] = set()
+    for event in events:
+        tags |= event_tags(event)
+    evicted = response_cache.purge_tags(tags)
+    logger.info(
+        "cache_invalidated",
+        source=source,
+        events=len(events),
+        tags=sorted(tags),
+        evicted=evicted,
+    )
+    return tags, evicted
+
+
+class _EventProtocol(asyncio.DatagramProtocol):
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            request = CacheInvalidationRequestSchema.model_validate_json(data)
+        except ValidationError as exc:
+            logger.warning(
+                "cache_event_invalid",
+                client=addr[0],
+                errors=exc.error_count(),
+            )
+            return
+        invalidate(request.events, source="udp")
+
+
+class CacheEventListener:
+    """Приём событий каталога UDP-датаграммами на локальном адресе."""
+
+    def __init__(self):
+        self._transport: asyncio.DatagramTransport | None = None
+
+    async def start(self) -> None:
+        if not settings.CACHE_EVENTS_UDP_PORT:
+            return
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            _EventProtocol,
+            local_addr=(settings.CACHE_EVENTS_UDP_HOST, settings.CACHE_EVENTS_UDP_PORT),
+        )
+        logger.info(
+            "cache_event_listener_started",
+            host=settings.CACHE_EVENTS_UDP_HOST,
+            port=settings.CACHE_EVENTS_UDP_PORT,
+        )
+
+    async def stop(self) -> None:
+        if self._transport is None:
+            return
+        self._transport.close()
+        self._transport = None
+
+
+cache_event_listener = CacheEventListener()
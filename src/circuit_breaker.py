@@ -0,0 +1,124 @@
+"""
+Circuit breaker для чтений каталога.
+
+Цепь работает только для запросов, у которых есть устаревшая копия в кэше
+ответов (stale-if-error, см. ProxyClient._send): при разомкнутой цепи
+клиент получает её, а не ошибку. Остальные запросы цепь не проходят — иначе
+один клиент, получающий 500 на своих запросах, отключал бы сервис для всех.
+
+После CIRCUIT_FAILURE_THRESHOLD неудач подряд (исчерпаны попытки подключения,
+таймаут, ответ 502/503/504) цепь сервиса размыкается: следующие
+CIRCUIT_RECOVERY_TIMEOUT секунд запросы к нему не отправляются вовсе —
+ProxyClient сразу поднимает CircuitOpenError. Ответы с другими статусами,
+в том числе 500 самого приложения, означают, что сервис отвечает. Затем
+пропускается один пробный запрос: успех замыкает цепь, неудача размыкает
+её снова.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+from src.config import settings
+from src.exceptions import CircuitOpenError
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Сервис (или балансировщик перед ним) недоступен или не успевает ответить
+FAILURE_STATUSES = frozenset({502, 503, 504})
+
+
+@dataclass
+class CircuitBreaker:
+    service_name: str
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    # Когда отправлен пробный запрос в состоянии half_open (None — не отправлен).
+    # Пробный запрос, оборванный без результата, не блокирует цепь дольше
+    # CIRCUIT_RECOVERY_TIMEOUT
+    trial_started_at: float | None = field(default=None, repr=False)
+
+    def before_request(self) -> None:
+        """
+        Проверка перед запросом к сервису.
+
+        Raises:
+            CircuitOpenError: Цепь разомкнута (или пробный запрос уже идёт)
+        """
+        if not settings.CIRCUIT_BREAKER_ENABLED or self.state == CLOSED:
+            return
+        now = time.monotonic()
+        recovery_timeout = settings.CIRCUIT_RECOVERY_TIMEOUT
+        if self.state == OPEN:
+            if now - self.opened_at < recovery_timeout:
+                raise self._open_error()
+            self.state = HALF_OPEN
+            self.trial_started_at = None
+            logger.info("circuit_half_open", service=self.service_name)
+        if (
+            self.trial_started_at is not None
+            and now - self.trial_started_at < recovery_timeout
+        ):
+            raise self._open_error()
+        self.trial_started_at = now
+
+    def _open_error(self) -> CircuitOpenError:
+        return CircuitOpenError(
+            f"Service {self.service_name} is temporarily unavailable"
+        )
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("circuit_closed", service=self.service_name)
+        self.state = CLOSED
+        self.failures = 0
+        self.trial_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_started_at = None
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.failures >= settings.CIRCUIT_FAILURE_THRESHOLD
+        ):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            logger.warning(
+                "circuit_opened",
+                service=self.service_name,
+                failures=self.failures,
+                recovery_timeout=settings.CIRCUIT_RECOVERY_TIMEOUT,
+            )
+
+    def record_status(self, status_code: int) -> None:
+        """Результат запроса по статусу ответа сервиса (502/503/504 — неудача)."""
+        if status_code in FAILURE_STATUSES:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+class CircuitBreakers:
+    """Цепи по имени сервиса (создаются при первом обращении)."""
+
+    def __init__(self):
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, service_name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(service_name)
+        if breaker is None:
+            breaker = self._breakers[service_name] = CircuitBreaker(service_name)
+        return breaker
+
+    def states(self) -> dict[str, str]:
+        return {name: breaker.state for name, breaker in self._breakers.items()}
+
+    def clear(self) -> None:
+        self._breakers.clear()
+
+
+circuit_breakers = CircuitBreakers()
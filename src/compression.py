@@ -0,0 +1,175 @@
+import asyncio
+import gzip
+import zlib
+from functools import lru_cache
+
+from src.config import settings
+
+# brotli и zstandard — опциональные зависимости: без них gateway
+# согласовывает только gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+IDENTITY = "identity"
+
+# Порядок предпочтения при равных q-значениях у клиента
+SUPPORTED_ENCODINGS: tuple[str, ...] = tuple(
+    name
+    for name, available in (
+        ("zstd", zstandard is not None),
+        ("br", brotli is not None),
+        ("gzip", True),
+    )
+    if available
+)
+
+# Что gateway умеет декодировать (передаётся апстриму в Accept-Encoding)
+DECODABLE_ENCODINGS: tuple[str, ...] = SUPPORTED_ENCODINGS + ("deflate",)
+UPSTREAM_ACCEPT_ENCODING = ", ".join(DECODABLE_ENCODINGS)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+NOT_COMPRESSIBLE_STATUSES = {204, 304}
+
+
+@lru_cache(maxsize=256)
+def _parse_accept_encoding(header: str) -> dict[str, float]:
+    """Разбор заголовка Accept-Encoding в словарь {encoding: q}."""
+    result: dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        result[name] = q
+    return result
+
+
+def accepts(accept_encoding: str, encoding: str) -> bool:
+    """Принимает ли клиент ответ в указанной кодировке."""
+    if encoding == IDENTITY:
+        return True
+    accepted = _parse_accept_encoding(accept_encoding)
+    q = accepted.get(encoding, accepted.get("*", 0.0))
+    return q > 0
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str) -> str | None:
+    """
+    Выбор кодировки ответа по заголовку Accept-Encoding клиента.
+
+    Returns:
+        Название кодировки или None, если сжимать не нужно
+    """
+    if not accept_encoding:
+        return None
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+
+    best: str | None = None
+    best_q = 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_decodable(encoding: str) -> bool:
+    """
+    Может ли gateway декодировать тело с таким Content-Encoding.
+
+    Цепочка кодировок ("gzip, br") и кодировки без установленной библиотеки
+    не декодируются: такое тело передаётся клиенту как есть.
+    """
+    return encoding in DECODABLE_ENCODINGS or encoding == "x-gzip"
+
+
+def is_compressible(status_code: int, content_type: str | None, size: int) -> bool:
+    """Подходит ли ответ для сжатия на gateway."""
+    if not settings.COMPRESSION_ENABLED:
+        return False
+    if status_code in NOT_COMPRESSIBLE_STATUSES or size < settings.COMPRESSION_MIN_SIZE:
+        return False
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def _compress_sync(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # mtime=0 — побайтово стабильный результат для одинакового тела
+        return gzip.compress(
+            data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0
+        )
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    if encoding == "zstd" and zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL)
+        return compressor.compress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def _decompress_sync(data: bytes, encoding: str) -> bytes:
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(data)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(data)
+        except zlib.error:
+            # Некоторые серверы отдают raw deflate без zlib-заголовка
+            return zlib.decompress(data, -zlib.MAX_WBITS)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(data)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+async def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Сжатие тела ответа.
+
+    Большие тела сжимаются в пуле потоков, чтобы не блокировать event loop.
+    """
+    if len(data) >= settings.COMPRESSION_THREADPOOL_MIN_SIZE:
+        return await asyncio.to_thread(_compress_sync, data, encoding)
+    return _compress_sync(data, encoding)
+
+
+async def decompress(data: bytes, encoding: str) -> bytes:
+    """
+    Декодирование тела ответа апстрима (большие тела — в пуле потоков).
+
+    Тело в кодировке, которую gateway не декодирует (is_decodable),
+    возвращается без изменений.
+    """
+    if not is_decodable(encoding):
+        return data
+    if len(data) >= settings.COMPRESSION_THREADPOOL_MIN_SIZE:
+        return await asyncio.to_thread(_decompress_sync, data, encoding)
+    return _decompress_sync(data, encoding)
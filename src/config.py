@@ -20,9 +20,20 @@ class Settings(BaseSettings):
 
     JWT_SECRET_KEY: str = ""
     JWT_ALGORITHM: str = "HS256"
+    # Сколько проверенных токенов хранится (повторная проверка не нужна), 0 — выкл.
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # Список отзыва access-токенов: максимальный срок жизни access-токена
+    # Auth Service (столько хранится отзыв по пользователю), период очистки
+    # истёкших записей и опроса ленты отзывов Auth Service (0 — выкл.), в секундах
+    ACCESS_TOKEN_MAX_LIFETIME: float = 3600.0
+    REVOCATION_COMPACT_INTERVAL: float = 60.0
+    REVOCATION_POLL_INTERVAL: float = 0.0
+    REVOCATION_POLL_PATH: str = "api/v1/auth/revocations"
 
     LOG_LEVEL: str = "INFO"
     DEBUG: bool = False
+    # /openapi.json и /docs; схема строится при первом запросе к ним
+    OPENAPI_ENABLED: bool = True
 
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:5173"]
 
@@ -33,8 +44,142 @@ class Settings(BaseSettings):
 
     HEALTH_CHECK_TIMEOUT: float = 3.0
 
+    # Сжатие ответов
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_THREADPOOL_MIN_SIZE: int = 256 * 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Кэш ответов публичных GET-эндпоинтов каталога
+    RESPONSE_CACHE_TTL: float = 10.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    # Суммарный объём записей кэша вместе со сжатыми вариантами (байт)
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Сколько истёкшая запись ещё хранится для ответа при недоступности сервиса
+    RESPONSE_CACHE_STALE_TTL: float = 300.0
+    # Приватный кэш GET-ответов пользователю (профиль, корзина, заказы);
+    # сбрасывается его же запросами на изменение, 0 — выключен
+    PRIVATE_CACHE_TTL: float = 5.0
+    PRIVATE_CACHE_MAX_ENTRIES: int = 10000
+    PRIVATE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Дедупликация checkout/pay по Idempotency-Key: сколько хранится ответ
+    # для повторов (в секундах, 0 — выкл.) и сколько ключей всего
+    IDEMPOTENCY_TTL: float = 300.0
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+
+    # Инвалидация кэша по событиям каталога: токен внутренних сервисов
+    # (пустой — эндпоинт /api/internal недоступен) и локальный UDP-порт (0 — выкл.)
+    INTERNAL_API_TOKEN: str = ""
+    CACHE_EVENTS_UDP_HOST: str = "127.0.0.1"
+    CACHE_EVENTS_UDP_PORT: int = 0
+
+    # Очередь запросов к сервисам по классам (critical — оформление и оплата
+    # заказа, authenticated — с токеном, anonymous — остальные): сколько
+    # запросов выполняется одновременно (не больше пула соединений, 0 — без
+    # очереди) и доли слотов классов при конкуренции
+    ADMISSION_MAX_CONCURRENCY: int = 100
+    ADMISSION_WEIGHTS: dict[str, float] = {
+        "critical": 8.0,
+        "authenticated": 3.0,
+        "anonymous": 1.0,
+    }
+
+    # Circuit breaker чтений каталога (только запросы с устаревшей копией в кэше)
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_TIMEOUT: float = 15.0
+
+    # Таймаут каждой части агрегированных (BFF) ответов
+    AGGREGATION_PART_TIMEOUT: float = 3.0
+
+    # Максимум параллельных запросов товаров при обогащении корзины
+    CART_ENRICHMENT_MAX_CONCURRENCY: int = 10
+
+    # Batch API (/api/batch)
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_MAX_CONCURRENCY: int = 5
+
+    # Разбивка времени запроса по фазам: off | admin | all
+    # (admin — заголовок Server-Timing только администраторам, в лог — всегда)
+    SERVER_TIMING: str = "admin"
+
+    # Трассировка (W3C traceparent, экспорт в OTLP/JSON)
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_TAIL_LATENCY_MS: float = 1000.0
+    TRACING_EXPORTER: str = "file"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://otel-collector:4318/v1/traces"
+    TRACING_EXPORT_BATCH_SIZE: int = 512
+    TRACING_EXPORT_INTERVAL: float = 5.0
+    TRACING_MAX_QUEUE_SIZE: int = 10000
+
+    # Профилирование (/api/admin/profile) и мониторинг задержки event loop
+    PROFILER_MAX_SECONDS: float = 60.0
+    LOOP_LAG_MONITOR_ENABLED: bool = True
+    LOOP_LAG_CHECK_INTERVAL: float = 0.5
+    LOOP_LAG_THRESHOLD_MS: float = 100.0
+    LOOP_LAG_CAPTURE_STACK: bool = True
+
+    # Прогрев при запуске: соединения с сервисами, DNS, проверка JWT
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS_PER_UPSTREAM: int = 4
+    WARMUP_RESOLVE_DNS: bool = True
+    WARMUP_TIMEOUT: float = 5.0
+
+    # Сквозной дедлайн входящего запроса (в секундах) — общий бюджет всех
+    # запросов к сервисам с повторами; по умолчанию и по префиксу пути
+    # (ключ "METHOD /path" — только для этого метода)
+    PROXY_REQUEST_DEADLINE: float = 30.0
+    ROUTE_DEADLINES: dict[str, float] = {
+        "GET /api/products": 5.0,
+        "GET /api/categories": 5.0,
+        "GET /api/attributes": 5.0,
+        "/api/pages": 8.0,
+        "/api/users": 10.0,
+        "/api/auth": 10.0,
+        "/api/cart": 10.0,
+        "/api/batch": 15.0,
+        "/api/v1/orders": 30.0,
+    }
+
+    # Лимиты тела запроса (в байтах): по умолчанию и по префиксу пути;
+    # таймауты чтения тела — между чанками и на всё тело (в секундах)
+    MAX_REQUEST_BODY_SIZE: int = 1024 * 1024
+    REQUEST_BODY_LIMITS: dict[str, int] = {
+        "/api/auth": 16 * 1024,
+        "/api/users": 16 * 1024,
+        "/api/cart": 16 * 1024,
+        "/api/v1/orders": 16 * 1024,
+        "/api/batch": 256 * 1024,
+    }
+    REQUEST_BODY_CHUNK_TIMEOUT: float = 10.0
+    REQUEST_BODY_TIMEOUT: float = 30.0
+
+    # Fast path: сквозные маршруты проксируются на уровне ASGI, минуя FastAPI
+    FAST_PATH_ENABLED: bool = False
+
+    # Кэш DNS для имён сервисов и круговой выбор адреса среди реплик
+    DNS_CACHE_ENABLED: bool = True
+    DNS_CACHE_TTL: float = 30.0
+    DNS_NEGATIVE_TTL: float = 5.0
+    DNS_REFRESH_INTERVAL: float = 10.0
+    DNS_TIMEOUT: float = 2.0
+
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
 
+    @property
+    def upstream_services(self) -> dict[str, str]:
+        """Внутренние сервисы: {имя сервиса: базовый URL}."""
+        return {
+            "auth-service": self.AUTH_SERVICE_URL,
+            "product-service": self.PRODUCT_SERVICE_URL,
+            "cart-service": self.CART_SERVICE_URL,
+            "order-service": self.ORDER_SERVICE_URL,
+        }
+
 
 settings = Settings()
@@ -0,0 +1,88 @@
+"""
+Сквозной дедлайн входящего запроса.
+
+У каждого маршрута свой бюджет времени (ROUTE_DEADLINES по префиксу пути,
+по умолчанию PROXY_REQUEST_DEADLINE): зависший каталог не должен держать
+ресурсы столько же, сколько законно медленное оформление заказа. Ключ
+с методом ("GET /api/products") задаёт бюджет только для этого метода —
+чтения каталога ограничены жёстче, чем запись в него администратором. Бюджет
+общий для всех запросов к сервисам в рамках входящего запроса — с повторами
+и паузами между ними.
+
+Остаток бюджета передаётся сервису в заголовке X-Request-Deadline
+(в миллисекундах), чтобы тот мог бросить работу, которую gateway уже
+не дождётся. Клиент может прислать тот же заголовок — он только сокращает
+бюджет маршрута, но не увеличивает его.
+"""
+
+import asyncio
+from contextvars import ContextVar
+
+from src.config import settings
+from src.prefix_map import PrefixMap
+
+# Имя в нижнем регистре, как ключи build_upstream_headers
+DEADLINE_HEADER = "x-request-deadline"
+
+# Момент (по часам event loop), после которого ответ клиенту уже не нужен
+request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+def _build_route_deadlines(
+    values: dict[str, float],
+) -> tuple[PrefixMap, dict[str, PrefixMap]]:
+    """Таблица для любого метода и таблицы методов из ключей "METHOD /path"."""
+    common: dict[str, float] = {}
+    by_method: dict[str, dict[str, float]] = {}
+    for key, value in values.items():
+        method, _, path = key.rpartition(" ")
+        if method:
+            by_method.setdefault(method.upper(), {})[path] = value
+        else:
+            common[path] = value
+    default = settings.PROXY_REQUEST_DEADLINE
+    return PrefixMap(default, common), {
+        # Самый длинный префикс выигрывает; для того же префикса — ключ с методом
+        method: PrefixMap(default, {**common, **paths})
+        for method, paths in by_method.items()
+    }
+
+
+_route_deadlines, _method_deadlines = _build_route_deadlines(settings.ROUTE_DEADLINES)
+
+
+def start_request_deadline(method: str, path: str, header: str | None = None) -> float:
+    """
+    Начало отсчёта дедлайна входящего запроса.
+
+    Args:
+        method: HTTP метод запроса
+        path: Путь запроса (вместе с методом определяет бюджет маршрута)
+        header: Значение X-Request-Deadline от клиента (мс), если есть
+
+    Returns:
+        Дедлайн по часам event loop
+    """
+    budget = _method_deadlines.get(method, _route_deadlines).for_path(path)
+    if header:
+        try:
+            client_budget = int(header) / 1000
+        except ValueError:
+            client_budget = 0.0
+        if client_budget > 0:
+            budget = min(budget, client_budget)
+    deadline = asyncio.get_running_loop().time() + budget
+    request_deadline.set(deadline)
+    return deadline
+
+
+def remaining(deadline: float) -> float:
+    """Остаток бюджета в секундах (не меньше нуля)."""
+    return max(deadline - asyncio.get_running_loop().time(), 0.0)
+
+
+def format_deadline_header(seconds: float) -> str:
+    """Значение X-Request-Deadline: остаток бюджета в целых миллисекундах."""
+    return str(int(seconds * 1000))
@@ -1,36 +1,105 @@
+import hmac
+import time
+import uuid
+from contextvars import ContextVar
 from typing import Annotated
 
-import jwt
-from fastapi import Depends, status, Security
+from fastapi import Depends, Header, status, Security
 from fastapi.exceptions import HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from src.admission import mark_authenticated
 from src.config import settings
 from src.exceptions import AuthenticationError
+from src.identity import UserIdentity, token_cache
+from src.revocation import revocation_list
 from src.schemas.auth import TokenPayloadSchema
+from src.timing import mark_user_role, measure
+from src.tracing import start_span
 
 ACCESS_TOKEN_TYPE = "access"
 
 security = HTTPBearer(auto_error=False)
 
-
-def decode_jwt(token: str) -> TokenPayloadSchema:
-    """Декодирование и валидация JWT токена."""
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-    except jwt.ExpiredSignatureError:
-        raise AuthenticationError("Token expired")
-    except jwt.InvalidTokenError:
-        raise AuthenticationError("Invalid token")
-
-    token_data = TokenPayloadSchema(**payload)
+# Заголовок Authorization: Bearer, если передан
+BearerCredentialsDep = Annotated[
+    HTTPAuthorizationCredentials | None, Security(security)
+]
+
+# Токен, уже проверенный в текущем контексте (например, batch-запросом):
+# (token, payload). Под-запросы с тем же токеном не декодируют его повторно.
+authenticated_token: ContextVar[tuple[str, UserIdentity] | None] = ContextVar(
+    "authenticated_token", default=None
+)
+
+
+def decode_jwt(token: str) -> UserIdentity:
+    """
+    Декодирование и валидация JWT токена.
+
+    Токен проверяется целиком только при первой встрече, дальше
+    пользователь берётся из token_cache (см. src.identity). Список отзыва
+    проверяется всегда: отозванный токен может уже лежать в кэше. Только
+    проверенный токен переводит запрос в класс authenticated очереди
+    к сервисам (src.admission).
+    """
+    identity = token_cache.get(token)
+    if identity is None:
+        identity = _verify_token(token)
+        token_cache.set(token, identity)
+    if revocation_list.is_revoked(identity):
+        raise AuthenticationError("Token revoked")
+    mark_user_role(identity.role)
+    mark_authenticated()
+    return identity
+
+
+def _verify_token(token: str) -> UserIdentity:
+    # PyJWT при импорте загружает crypto-бэкенды (cryptography), которые
+    # не нужны, пока запросов с токеном нет: импорт откладывается до первого
+    import jwt
+
+    with measure("auth"), start_span("auth"):
+        try:
+            payload = jwt.decode(
+                token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+            )
+        except jwt.ExpiredSignatureError:
+            raise AuthenticationError("Token expired")
+        except jwt.InvalidTokenError:
+            raise AuthenticationError("Invalid token")
+
+        token_data = TokenPayloadSchema(**payload)
 
     if token_data.type != ACCESS_TOKEN_TYPE:
         raise AuthenticationError("Token is not an access token")
-
-    return token_data
+    return UserIdentity.from_payload(token_data)
+
+
+def warm_up_auth() -> None:
+    """
+    Прогрев проверки токенов до первого запроса.
+
+    Импортирует PyJWT и проверяет одноразовый токен, подписанный тем же ключом:
+    первый настоящий запрос не платит за импорт и инициализацию валидаторов.
+    Токен проверяется мимо token_cache — в кэше ему делать нечего.
+    """
+    import jwt
+
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "sub": str(uuid.UUID(int=0)),
+            "email": "warmup@example.com",
+            "role": "user",
+            "type": ACCESS_TOKEN_TYPE,
+            "iat": now,
+            "exp": now + 60,
+        },
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM,
+    )
+    _verify_token(token)
 
 
 def get_token(
@@ -47,8 +116,11 @@ def get_token(
     return creds.credentials
 
 
-def get_current_user(token: str = Depends(get_token)) -> TokenPayloadSchema:
+def get_current_user(token: str = Depends(get_token)) -> UserIdentity:
     """Проверка токена и получение данных текущего пользователя."""
+    authenticated = authenticated_token.get()
+    if authenticated is not None and authenticated[0] == token:
+        return authenticated[1]
     try:
         token_data = decode_jwt(token)
         return token_data
@@ -60,9 +132,22 @@ def get_current_user(token: str = Depends(get_token)) -> TokenPayloadSchema:
         )
 
 
+def get_optional_user(creds: BearerCredentialsDep) -> UserIdentity | None:
+    """
+    Данные пользователя, если передан токен (без заголовка — None).
+
+    Невалидный или истёкший токен — 401, как у маршрутов с обязательной
+    авторизацией: клиент должен обновить токен, а не получить страницу
+    анонимного пользователя.
+    """
+    if not creds:
+        return None
+    return get_current_user(creds.credentials)
+
+
 def get_current_admin(
-    user: TokenPayloadSchema = Depends(get_current_user),
-) -> TokenPayloadSchema:
+    user: UserIdentity = Depends(get_current_user),
+) -> UserIdentity:
     """Проверка прав администратора."""
     if user.role != "admin":
         raise HTTPException(
@@ -72,5 +157,26 @@ def get_current_admin(
     return user
 
 
-CurrentUserDep = Annotated[TokenPayloadSchema, Depends(get_current_user)]
-AdminUserDep = Annotated[TokenPayloadSchema, Depends(get_current_admin)]
+def verify_internal_token(
+    x_internal_token: Annotated[str | None, Header()] = None,
+) -> None:
+    """
+    Проверка токена внутренних сервисов (X-Internal-Token).
+
+    Без INTERNAL_API_TOKEN внутренние эндпоинты недоступны вовсе.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    if (
+        not expected
+        or not x_internal_token
+        or not hmac.compare_digest(x_internal_token.encode(), expected.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal token",
+        )
+
+
+CurrentUserDep = Annotated[UserIdentity, Depends(get_current_user)]
+OptionalUserDep = Annotated[UserIdentity | None, Depends(get_optional_user)]
+AdminUserDep = Annotated[UserIdentity, Depends(get_current_admin)]
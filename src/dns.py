@@ -0,0 +1,153 @@
+"""
+Кэш DNS для имён хостов внутренних сервисов.
+
+Без кэша каждое новое соединение с сервисом разрешает имя через системный
+резолвер (в Docker — встроенный DNS, который добавляет задержку и иногда
+не отвечает). Кэш:
+- хранит адреса DNS_CACHE_TTL секунд;
+- запоминает ошибки разрешения на DNS_NEGATIVE_TTL секунд (negative caching),
+  чтобы недоступный сервис не порождал запрос к DNS на каждую попытку;
+- обновляет известные имена в фоне каждые DNS_REFRESH_INTERVAL секунд,
+  поэтому запросы почти никогда не ждут резолвер;
+- при ошибке обновления продолжает отдавать последние известные адреса.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass
+
+from src.config import settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class DNSResolutionError(OSError):
+    """Имя хоста не разрешается (в том числе из negative-кэша)."""
+
+
+@dataclass
+class DNSEntry:
+    addresses: tuple[str, ...]
+    expires_at: float
+    # Текст ошибки для negative-записи (addresses пуст)
+    error: str | None = None
+
+    @property
+    def is_expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class DNSCache:
+    def __init__(self):
+        self._entries: dict[str, DNSEntry] = {}
+        # Разрешения в процессе: параллельные запросы ждут одно и то же
+        self._pending: dict[str, asyncio.Future[DNSEntry]] = {}
+        self._refresh_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if not settings.DNS_CACHE_ENABLED or settings.DNS_REFRESH_INTERVAL <= 0:
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        try:
+            await self._refresh_task
+        except asyncio.CancelledError:
+            pass
+        self._refresh_task = None
+
+    async def resolve(self, host: str, port: int) -> tuple[str, ...]:
+        """
+        Адреса хоста.
+
+        Свежая запись отдаётся сразу; устаревшая — тоже сразу, но в фоне
+        запускается обновление. Ждать резолвер приходится только при первом
+        обращении к имени.
+
+        Raises:
+            DNSResolutionError: Имя не разрешается (или ошибка ещё в negative-кэше)
+        """
+        if _is_ip_address(host):
+            return (host,)
+
+        entry = self._entries.get(host)
+        if entry is None or (entry.is_expired and not entry.addresses):
+            entry = await self._lookup(host, port)
+        elif entry.is_expired:
+            # Обновление в фоне; future хранится в _pending до завершения
+            self._lookup(host, port)
+
+        if entry.error is not None:
+            raise DNSResolutionError(f"Cannot resolve {host}: {entry.error}")
+        return entry.addresses
+
+    def _lookup(self, host: str, port: int) -> asyncio.Future[DNSEntry]:
+        pending = self._pending.get(host)
+        if pending is None:
+            pending = asyncio.ensure_future(self._query(host, port))
+            self._pending[host] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(host, None))
+        return pending
+
+    async def _query(self, host: str, port: int) -> DNSEntry:
+        start = time.perf_counter()
+        try:
+            infos = await asyncio.wait_for(
+                asyncio.get_running_loop().getaddrinfo(
+                    host, port, type=socket.SOCK_STREAM
+                ),
+                timeout=settings.DNS_TIMEOUT,
+            )
+        except (OSError, TimeoutError) as exc:
+            error = str(exc) or type(exc).__name__
+            previous = self._entries.get(host)
+            if previous is not None and previous.addresses:
+                # Лучше старые адреса, чем отказ из-за сбоя DNS
+                logger.warning("dns_refresh_failed", host=host, error=error)
+                previous.expires_at = time.monotonic() + settings.DNS_NEGATIVE_TTL
+                return previous
+            logger.warning("dns_resolution_failed", host=host, error=error)
+            entry = DNSEntry((), time.monotonic() + settings.DNS_NEGATIVE_TTL, error)
+            self._entries[host] = entry
+            return entry
+
+        # Порядок getaddrinfo сохраняется, дубликаты (разные протоколы) убираются
+        addresses = tuple(dict.fromkeys(info[4][0] for info in infos))
+        previous = self._entries.get(host)
+        if previous is None or previous.addresses != addresses:
+            logger.info(
+                "dns_resolved",
+                host=host,
+                addresses=list(addresses),
+                duration_ms=round((time.perf_counter() - start) * 1000, 2),
+            )
+        entry = DNSEntry(addresses, time.monotonic() + settings.DNS_CACHE_TTL)
+        self._entries[host] = entry
+        return entry
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.DNS_REFRESH_INTERVAL)
+            hosts = list(self._entries)
+            # Порт для getaddrinfo не важен: кэшируются только адреса
+            await asyncio.gather(*(self._lookup(host, 80) for host in hosts))
+
+    def snapshot(self) -> dict[str, list[str]]:
+        return {host: list(entry.addresses) for host, entry in self._entries.items()}
+
+
+dns_cache = DNSCache()
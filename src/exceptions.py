@@ -13,6 +13,12 @@ class ServiceUnavailableError(GatewayException):
     detail = "Service unavailable"
 
 
+class CircuitOpenError(ServiceUnavailableError):
+    """Цепь сервиса разомкнута: запрос не отправляется (см. circuit_breaker)."""
+
+    detail = "Service temporarily unavailable"
+
+
 class GatewayTimeoutError(GatewayException):
     """Таймаут при обращении к внутреннему сервису."""
 
@@ -29,3 +35,15 @@ class ForbiddenError(GatewayException):
     """Недостаточно прав для выполнения операции (требуется admin)."""
 
     detail = "Forbidden"
+
+
+class IdempotencyConflictError(GatewayException):
+    """Запрос с тем же Idempotency-Key ещё выполняется (или был прерван)."""
+
+    detail = "Request with this Idempotency-Key is in progress"
+
+
+class IdempotencyKeyMismatchError(GatewayException):
+    """Idempotency-Key уже использован с другим запросом."""
+
+    detail = "Idempotency-Key was already used with a different request"
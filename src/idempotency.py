@@ -0,0 +1,134 @@
+"""
+Дедупликация запросов с Idempotency-Key (оформление и оплата заказа).
+
+Клиент повторяет checkout/pay с тем же Idempotency-Key, если не дождался
+ответа. Order Service сам отвечает на такие повторы (409, пока заказ
+создаётся; тот же заказ — после), но каждый повтор всё равно занимает
+соединение и запрос к сервису. Gateway запоминает ключи пользователя:
+- пока первый запрос выполняется, повторы ждут его ответа и получают его же;
+- после ответа повторы в течение IDEMPOTENCY_TTL получают сохранённый ответ
+  с заголовком Idempotent-Replayed: true, без запроса к сервису.
+
+Ключ действует в пределах пользователя и запроса: тот же ключ с другим
+методом, URL или телом — ошибка клиента (422), а не повтор. Ответы 5xx,
+409 и 429 не сохраняются: следующий повтор снова уйдёт в сервис.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.cache import CachedResponse
+from src.config import settings
+from src.exceptions import IdempotencyKeyMismatchError
+
+IDEMPOTENCY_KEY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+
+# Ответы, которые повтор должен получить заново от сервиса
+_NOT_REPLAYABLE = frozenset({409, 429})
+
+
+@dataclass
+class IdempotencyRecord:
+    fingerprint: str
+    # Ответ первого запроса (или его ошибка) для повторов
+    future: asyncio.Future[CachedResponse]
+    # Пока первый запрос выполняется — бесконечность
+    expires_at: float = float("inf")
+
+
+def is_replayable(status_code: int) -> bool:
+    return status_code < 500 and status_code not in _NOT_REPLAYABLE
+
+
+def request_fingerprint(method: str, url: str, body: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{method} {url}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """Ключи идемпотентности пользователей: выполняющиеся и завершённые."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._records: OrderedDict[str, IdempotencyRecord] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def record_key(user_id: str, idempotency_key: str) -> str:
+        return f"{user_id}:{idempotency_key}"
+
+    def begin(self, key: str, fingerprint: str) -> tuple[IdempotencyRecord, bool]:
+        """
+        Запись для ключа: существующая (повтор) или новая (первый запрос).
+
+        Args:
+            key: Ключ записи (record_key)
+            fingerprint: Отпечаток запроса (request_fingerprint)
+
+        Returns:
+            Запись и признак первого запроса — только он отправляется
+            в сервис и обязан завершить запись (complete или fail)
+
+        Raises:
+            IdempotencyKeyMismatchError: Ключ уже использован с другим запросом
+        """
+        record = self._records.get(key)
+        if record is not None and record.expires_at > time.monotonic():
+            if record.fingerprint != fingerprint:
+                raise IdempotencyKeyMismatchError()
+            return record, False
+
+        record = IdempotencyRecord(
+            fingerprint=fingerprint,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._records[key] = record
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_entries:
+            # Вытесненная выполняющаяся запись всё равно завершится для тех,
+            # кто её уже ждёт
+            self._records.popitem(last=False)
+        return record, True
+
+    def complete(
+        self, key: str, record: IdempotencyRecord, entry: CachedResponse
+    ) -> None:
+        """Ответ первого запроса: отдаётся ожидающим и сохраняется для повторов."""
+        if is_replayable(entry.status_code):
+            record.expires_at = time.monotonic() + self.ttl
+        else:
+            self._discard(key, record)
+        record.future.set_result(entry)
+
+    def fail(self, key: str, record: IdempotencyRecord, exc: Exception) -> None:
+        """Первый запрос завершился ошибкой: ожидающие получают её же."""
+        self._discard(key, record)
+        record.future.set_exception(exc)
+        # Ожидающих может не быть: без этого asyncio пишет в лог
+        # «Future exception was never retrieved»
+        record.future.exception()
+
+    def _discard(self, key: str, record: IdempotencyRecord) -> None:
+        if self._records.get(key) is record:
+            del self._records[key]
+
+    def clear(self) -> None:
+        self._records.clear()
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES, ttl=settings.IDEMPOTENCY_TTL
+)
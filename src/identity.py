@@ -0,0 +1,133 @@
+"""
+Данные пользователя из access-токена для горячего пути.
+
+Полная проверка токена — подпись (PyJWT) и валидация claims через
+TokenPayloadSchema (UUID, EmailStr, datetime) — выполняется только при первой
+встрече токена. Результат сохраняется в TokenCache как UserIdentity: объект
+со __slots__ и заранее собранными заголовками X-User-*, так что следующие
+запросы с тем же токеном не декодируют JWT и ничего не аллоцируют под
+пользователя.
+
+Ключ кэша — строка токена целиком, вместе с подписью: попадание означает,
+что именно эта строка уже прошла проверку. При каждом попадании проверяется
+только срок действия и список отзывов (src.revocation).
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from uuid import UUID
+
+from src.config import settings
+from src.schemas.auth import TokenPayloadSchema
+
+
+class UserIdentity:
+    """Пользователь из проверенного токена (поля как у TokenPayloadSchema)."""
+
+    __slots__ = (
+        "_headers",
+        "email",
+        "exp",
+        "expires_at",
+        "iat",
+        "issued_at",
+        "jti",
+        "raw_headers",
+        "role",
+        "sub",
+        "type",
+        "user_id",
+    )
+
+    def __init__(
+        self,
+        sub: UUID,
+        email: str,
+        role: str,
+        type: str,
+        iat: datetime,
+        exp: datetime,
+        jti: str | None = None,
+    ):
+        self.sub = sub
+        # Строковый ID: для заголовков, логов и ключей кэша
+        self.user_id = str(sub)
+        self.email = email
+        self.role = role
+        self.type = type
+        self.iat = iat
+        self.exp = exp
+        self.jti = jti
+        # Метки времени для проверки срока и отзыва (src.revocation)
+        self.issued_at = iat.timestamp()
+        self.expires_at = exp.timestamp()
+        self._headers = (
+            ("X-User-ID", self.user_id),
+            ("X-User-Email", email),
+            ("X-User-Role", role),
+        )
+        # Те же заголовки в виде ASGI (fast path)
+        self.raw_headers = tuple(
+            (key.lower().encode(), value.encode()) for key, value in self._headers
+        )
+
+    @classmethod
+    def from_payload(cls, payload: TokenPayloadSchema) -> "UserIdentity":
+        return cls(
+            sub=payload.sub,
+            email=payload.email,
+            role=payload.role,
+            type=payload.type,
+            iat=payload.iat,
+            exp=payload.exp,
+            jti=payload.jti,
+        )
+
+    def to_headers(self) -> tuple[tuple[str, str], ...]:
+        """Заголовки X-User-* для внутренних сервисов (один кортеж на токен)."""
+        return self._headers
+
+    def __repr__(self) -> str:
+        return f"UserIdentity(sub={self.user_id!r}, role={self.role!r})"
+
+
+class TokenCache:
+    """LRU-кэш проверенных токенов: токен -> UserIdentity."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, UserIdentity] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> UserIdentity | None:
+        """
+        Пользователь из ранее проверенного токена.
+
+        Истёкший токен удаляется и возвращается None: повторная проверка
+        вернёт ту же ошибку, что и для нового токена.
+        """
+        identity = self._entries.get(token)
+        if identity is None:
+            return None
+        if identity.expires_at <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return identity
+
+    def set(self, token: str, identity: UserIdentity) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[token] = identity
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
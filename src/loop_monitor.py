@@ -0,0 +1,163 @@
+"""
+Мониторинг задержки event loop.
+
+Фоновая задача засыпает на LOOP_LAG_CHECK_INTERVAL и проверяет, насколько
+позже она проснулась. Опоздание больше LOOP_LAG_THRESHOLD_MS означает, что
+какой-то callback держал event loop (синхронный вызов, тяжёлые вычисления),
+и все запросы в это время стояли.
+
+Каждое измерение попадает в гистограмму. Сторожевой поток следит за той же
+задачей: если она не проснулась вовремя, он снимает стек потока event loop
+прямо во время блокировки — этот стек и пишется в лог event_loop_blocked.
+"""
+
+import asyncio
+import bisect
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+
+from src.config import settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Верхние границы корзин гистограммы (мс)
+LAG_BUCKETS_MS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+
+# Сколько последних фреймов блокирующего стека попадает в лог
+STACK_DEPTH = 30
+
+
+@dataclass
+class LagHistogram:
+    """Гистограмма задержки event loop (корзины как у Prometheus, кумулятивные)."""
+
+    bounds: tuple[float, ...] = LAG_BUCKETS_MS
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LAG_BUCKETS_MS) + 1))
+    count: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, lag_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, lag_ms)] += 1
+        self.count += 1
+        self.sum_ms += lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    def snapshot(self) -> dict:
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            buckets[f"{bound:g}"] = cumulative
+        buckets["+Inf"] = self.count
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class LoopLagMonitor:
+    def __init__(self):
+        self.histogram = LagHistogram()
+        self.blocked_count = 0
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._loop_thread_id: int | None = None
+        # Номер текущего измерения и момент, когда задача должна проснуться
+        self._tick = 0
+        self._wakeup_deadline = 0.0
+        # (номер измерения, стек), снятый сторожевым потоком
+        self._blocked_stack: tuple[int, list[str]] | None = None
+
+    async def start(self) -> None:
+        if not settings.LOOP_LAG_MONITOR_ENABLED:
+            return
+        self.histogram = LagHistogram()
+        self._loop_thread_id = threading.get_ident()
+        self._wakeup_deadline = time.perf_counter() + settings.LOOP_LAG_CHECK_INTERVAL
+        self._task = asyncio.create_task(self._run())
+        if settings.LOOP_LAG_CAPTURE_STACK:
+            self._stop.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-lag-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._watchdog is not None:
+            self._stop.set()
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        interval = settings.LOOP_LAG_CHECK_INTERVAL
+        threshold_ms = settings.LOOP_LAG_THRESHOLD_MS
+        while True:
+            start = time.perf_counter()
+            # Сначала срок, потом номер: сторожевой поток не должен увидеть
+            # новый номер измерения со старым сроком
+            self._wakeup_deadline = start + interval
+            self._tick += 1
+            await asyncio.sleep(interval)
+            lag_ms = max((time.perf_counter() - start - interval) * 1000, 0.0)
+            self.histogram.observe(lag_ms)
+
+            if lag_ms > threshold_ms:
+                self.blocked_count += 1
+                captured = self._blocked_stack
+                stack = captured[1] if captured and captured[0] == self._tick else None
+                logger.warning(
+                    "event_loop_blocked",
+                    lag_ms=round(lag_ms, 1),
+                    threshold_ms=threshold_ms,
+                    stack=stack,
+                )
+            self._blocked_stack = None
+
+    def _watch(self) -> None:
+        """Сторожевой поток: стек event loop, пока тот заблокирован."""
+        threshold = settings.LOOP_LAG_THRESHOLD_MS / 1000
+        check_interval = min(threshold / 2, settings.LOOP_LAG_CHECK_INTERVAL)
+        while not self._stop.wait(check_interval):
+            tick = self._tick
+            overdue = time.perf_counter() - self._wakeup_deadline
+            if overdue <= threshold or (
+                self._blocked_stack is not None and self._blocked_stack[0] == tick
+            ):
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._blocked_stack = (tick, self._format_stack(frame))
+
+    @staticmethod
+    def _format_stack(frame) -> list[str]:
+        return [
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame)[-STACK_DEPTH:]
+        ]
+
+    def snapshot(self) -> dict:
+        return {
+            **self.histogram.snapshot(),
+            "blocked_count": self.blocked_count,
+            "threshold_ms": settings.LOOP_LAG_THRESHOLD_MS,
+        }
+
+
+loop_lag_monitor = LoopLagMonitor()
@@ -5,23 +5,37 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import structlog
 
+from src.cache_events import cache_event_listener
 from src.config import settings
+from src.dns import dns_cache
 from src.exceptions import (
     GatewayException,
     ServiceUnavailableError,
     GatewayTimeoutError,
+    IdempotencyConflictError,
+    IdempotencyKeyMismatchError,
 )
 from src.logger import setup_logging, get_logger
+from src.loop_monitor import loop_lag_monitor
+from src.middleware.body_limit import BodyLimitMiddleware
+from src.middleware.fast_path import FastPathMiddleware
 from src.middleware.request_logger import RequestLoggingMiddleware
 from src.proxy import proxy_client
+from src.revocation import revocation_list
+from src.routes.admin import router as admin_router
 from src.routes.products import router as products_router
 from src.routes.categories import router as categories_router
 from src.routes.auth import router as auth_router
+from src.routes.batch import router as batch_router
+from src.routes.internal import router as internal_router
 from src.routes.users import router as users_router
 from src.routes.attributes import router as attributes_router
 from src.routes.cart import router as cart_router
 from src.routes.order import router as order_router
+from src.routes.pages import router as pages_router
 from src.services.health import HealthServiceDep
+from src.tracing import span_exporter
+from src.warmup import warm_up
 
 logger = get_logger(__name__)
 
@@ -32,11 +46,22 @@ setup_logging()
 async def lifespan(_app: FastAPI):
     """Управление жизненным циклом приложения."""
     # Startup
+    await dns_cache.start()
     await proxy_client.start()
+    await warm_up()
+    await span_exporter.start()
+    await loop_lag_monitor.start()
+    await cache_event_listener.start()
+    await revocation_list.start()
     logger.info("application_startup_complete")
     yield
     # Shutdown
+    await revocation_list.stop()
     await proxy_client.stop()
+    await dns_cache.stop()
+    await span_exporter.stop()
+    await loop_lag_monitor.stop()
+    await cache_event_listener.stop()
     logger.info("application_shutdown_complete")
 
 
@@ -46,18 +71,26 @@ app = FastAPI(
     version="0.1.0",
     debug=settings.DEBUG,
     lifespan=lifespan,
+    openapi_url="/openapi.json" if settings.OPENAPI_ENABLED else None,
 )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+cors_options = {
+    "allow_origins": settings.CORS_ORIGINS,
+    "allow_credentials": True,
+    "allow_methods": ["*"],
+    "allow_headers": ["*"],
+}
+# Самый внутренний слой: ошибки чтения тела доходят до FastAPI как есть,
+# а не через обёртку receive() в BaseHTTPMiddleware
+app.add_middleware(BodyLimitMiddleware)
+app.add_middleware(CORSMiddleware, **cors_options)
 
 app.add_middleware(RequestLoggingMiddleware)
 
+if settings.FAST_PATH_ENABLED:
+    # Внешний слой: сквозные маршруты не доходят до middleware и роутинга
+    app.add_middleware(FastPathMiddleware, cors_options=cors_options)
+
 app.include_router(products_router)
 app.include_router(categories_router)
 app.include_router(auth_router)
@@ -65,6 +98,10 @@ app.include_router(users_router)
 app.include_router(cart_router)
 app.include_router(attributes_router)
 app.include_router(order_router, prefix="/api/v1")
+app.include_router(pages_router)
+app.include_router(batch_router)
+app.include_router(admin_router)
+app.include_router(internal_router)
 
 
 @app.get("/health")
@@ -108,6 +145,34 @@ async def gateway_timeout_handler(request: Request, exc: GatewayTimeoutError):
     )
 
 
+@app.exception_handler(IdempotencyConflictError)
+async def idempotency_conflict_handler(request: Request, exc: IdempotencyConflictError):
+    request_id = structlog.contextvars.get_contextvars().get("request_id")
+    logger.warning("idempotency_conflict", detail=exc.detail)
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={
+            "detail": exc.detail,
+            "request_id": request_id,
+        },
+    )
+
+
+@app.exception_handler(IdempotencyKeyMismatchError)
+async def idempotency_key_mismatch_handler(
+    request: Request, exc: IdempotencyKeyMismatchError
+):
+    request_id = structlog.contextvars.get_contextvars().get("request_id")
+    logger.warning("idempotency_key_mismatch", detail=exc.detail)
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+        content={
+            "detail": exc.detail,
+            "request_id": request_id,
+        },
+    )
+
+
 @app.exception_handler(GatewayException)
 async def gateway_exception_handler(request: Request, exc: GatewayException):
     request_id = structlog.contextvars.get_contextvars().get("request_id")
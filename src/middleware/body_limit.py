@@ -0,0 +1,162 @@
+"""
+Лимиты размера тела запроса и таймауты его чтения.
+
+Самый внутренний ASGI-слой приложения (и fast path): запрос с Content-Length
+больше лимита маршрута отклоняется с 413 до того, как тело начнут читать
+(и до проверки токена).
+Тело без Content-Length (chunked) считается по мере чтения — как только
+прочитано больше лимита, receive() поднимает HTTPException(413), и в память
+попадает не больше лимита. HTTPException, а не GatewayException: FastAPI
+превращает любые другие ошибки чтения тела в 400.
+
+Медленный клиент (slowloris) не может держать запрос бесконечно: между
+чанками тела — не дольше REQUEST_BODY_CHUNK_TIMEOUT, всё тело — не дольше
+REQUEST_BODY_TIMEOUT, иначе HTTPException(408).
+"""
+
+import asyncio
+import json
+
+import structlog
+from fastapi.exceptions import HTTPException
+
+from src.config import settings
+from src.prefix_map import PrefixMap
+
+logger = structlog.get_logger()
+
+BODY_TOO_LARGE_DETAIL = "Request body too large"
+BODY_TIMEOUT_DETAIL = "Request body was not received in time"
+
+
+class BodyLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.limits = PrefixMap(
+            settings.MAX_REQUEST_BODY_SIZE, settings.REQUEST_BODY_LIMITS
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = None
+        chunked = False
+        for key, value in scope["headers"]:
+            if key == b"content-length":
+                content_length = value
+            elif key == b"transfer-encoding":
+                chunked = True
+        if content_length is None and not chunked:
+            # Запрос без тела: ничего не ограничиваем
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits.for_path(scope["path"])
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                declared = -1
+            if declared < 0:
+                await _send_error(send, 400, "Invalid Content-Length")
+                return
+            if declared > limit:
+                logger.warning(
+                    "request_body_too_large",
+                    path=scope["path"],
+                    content_length=declared,
+                    limit=limit,
+                )
+                await _send_error(send, 413, BODY_TOO_LARGE_DETAIL)
+                return
+
+        response_started = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        limited_receive = _LimitedReceive(receive, limit, scope["path"])
+        try:
+            await self.app(scope, limited_receive, send_wrapper)
+        except HTTPException as exc:
+            # Обычно исключение превращается в ответ внутри FastAPI или
+            # fast path; сюда оно доходит, если ответить было некому
+            if exc is not limited_receive.error or response_started:
+                raise
+            await _send_error(send, exc.status_code, exc.detail)
+
+
+class _LimitedReceive:
+    """receive(), который считает байты тела и ограничивает время чтения."""
+
+    def __init__(self, receive, limit: int, path: str):
+        self._receive = receive
+        self._limit = limit
+        self._path = path
+        self._received = 0
+        self._body_complete = False
+        self.error: HTTPException | None = None
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._deadline = loop.time() + settings.REQUEST_BODY_TIMEOUT
+
+    async def __call__(self):
+        if self._body_complete:
+            # После тела receive() ждёт только http.disconnect — без таймаута
+            return await self._receive()
+
+        deadline = min(
+            self._deadline, self._loop.time() + settings.REQUEST_BODY_CHUNK_TIMEOUT
+        )
+        try:
+            async with asyncio.timeout_at(deadline):
+                message = await self._receive()
+        except TimeoutError:
+            logger.warning(
+                "request_body_timeout", path=self._path, received=self._received
+            )
+            self.error = _body_error(408, BODY_TIMEOUT_DETAIL)
+            raise self.error from None
+
+        if message["type"] != "http.request":
+            return message
+        self._received += len(message.get("body", b""))
+        if self._received > self._limit:
+            logger.warning(
+                "request_body_too_large",
+                path=self._path,
+                received=self._received,
+                limit=self._limit,
+            )
+            self.error = _body_error(413, BODY_TOO_LARGE_DETAIL)
+            raise self.error
+        if not message.get("more_body", False):
+            self._body_complete = True
+        return message
+
+
+async def _send_error(send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                # Непрочитанное тело остаётся в соединении — его закрывают
+                (b"connection", b"close"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def _body_error(status_code: int, detail: str) -> HTTPException:
+    # Непрочитанное тело остаётся в соединении — его закрывают
+    return HTTPException(status_code, detail, headers={"Connection": "close"})
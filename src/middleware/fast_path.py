@@ -0,0 +1,499 @@
+"""
+Fast path: проксирование сквозных маршрутов на уровне ASGI.
+
+Обычный запрос проходит BaseHTTPMiddleware, маршрутизацию FastAPI,
+внедрение зависимостей (синхронные — через пул потоков), чтение тела
+в память и сборку Response. Для маршрутов, обработчик которых только
+проверяет токен и передаёт запрос сервису, всё это не нужно: fast path
+сопоставляет путь с таблицей префиксов, проверяет токен прямо в event loop
+и передаёт чанки тела запроса и ответа между клиентом и сервисом без
+промежуточных Request/Response и без копирования тел.
+
+Маршруты с дополнительной логикой (кэш каталога и приватный кэш чтений
+пользователя, дедупликация по Idempotency-Key, обогащение корзины,
+валидация query-параметров, агрегация) в таблицу не входят и обрабатываются
+приложением как обычно. Включается через FAST_PATH_ENABLED.
+"""
+
+import json
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import httpx
+import structlog
+from starlette.exceptions import HTTPException
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import ClientDisconnect
+
+from src.admission import start_request_priority
+from src.cache import (
+    CART_SECTION,
+    ORDERS_SECTION,
+    PROFILE_SECTION,
+    private_cache,
+    user_tag,
+)
+from src.config import settings
+from src.deadline import start_request_deadline
+from src.dependencies import decode_jwt
+from src.exceptions import (
+    AuthenticationError,
+    GatewayException,
+    GatewayTimeoutError,
+    ServiceUnavailableError,
+)
+from src.middleware.body_limit import BodyLimitMiddleware
+from src.proxy import build_target_url, proxy_client
+from src.timing import format_server_timing, should_expose, start_request_timings
+from src.tracing import (
+    SPAN_KIND_CLIENT,
+    finish_request_span,
+    start_request_span,
+    start_span,
+)
+
+logger = structlog.get_logger()
+
+AUTH_USER = "user"
+AUTH_ADMIN = "admin"
+
+# Только канонические записи: их обычный маршрут передаёт сервису без
+# изменений. Остальные (ведущие нули, UUID без дефисов или в верхнем
+# регистре) проверяет и нормализует обычный маршрут
+INT = r"(?:0|[1-9][0-9]*)"
+UUID = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+
+# Заголовки соединения (hop-by-hop) и заголовки, которые выставляет
+# сам gateway: от клиента сервису не передаются
+EXCLUDED_REQUEST_HEADERS = {
+    b"host",
+    b"connection",
+    b"keep-alive",
+    b"proxy-authorization",
+    b"te",
+    b"trailer",
+    b"transfer-encoding",
+    b"upgrade",
+    b"x-request-deadline",
+    b"x-user-id",
+    b"x-user-email",
+    b"x-user-role",
+}
+
+# Заголовки ответа сервиса, которые не передаются клиенту (date и server
+# добавляет uvicorn). Тело передаётся как есть, поэтому content-length,
+# content-encoding и etag сохраняются
+EXCLUDED_RESPONSE_HEADERS = {
+    b"connection",
+    b"keep-alive",
+    b"transfer-encoding",
+    b"date",
+    b"server",
+}
+
+
+@dataclass(frozen=True)
+class FastRoute:
+    """
+    Группа сквозных маршрутов с общим префиксом.
+
+    endpoints — пары (метод, регулярное выражение остатка пути после
+    префикса); остаток пути дописывается к upstream_prefix.
+    invalidates — разделы приватного кэша пользователя, которые сбрасывают
+    его запросы на изменение.
+    """
+
+    prefix: str
+    upstream_prefix: str
+    base_url: str
+    service_name: str
+    auth: str
+    endpoints: tuple[tuple[str, str], ...]
+    invalidates: tuple[str, ...] = ()
+    patterns: dict[str, re.Pattern] = field(init=False, compare=False)
+
+    def __post_init__(self):
+        by_method: dict[str, list[str]] = {}
+        for method, pattern in self.endpoints:
+            by_method.setdefault(method, []).append(pattern)
+        object.__setattr__(
+            self,
+            "patterns",
+            {
+                method: re.compile("|".join(f"(?:{p})" for p in patterns))
+                for method, patterns in by_method.items()
+            },
+        )
+
+    def matches(self, method: str, rest: str) -> bool:
+        pattern = self.patterns.get(method)
+        return pattern is not None and pattern.fullmatch(rest) is not None
+
+
+def build_fast_routes() -> tuple[FastRoute, ...]:
+    """Маршруты, обработчики которых только проверяют токен и проксируют."""
+    users_endpoints = [("PATCH", "/me")]
+    if settings.PRIVATE_CACHE_TTL <= 0:
+        # Иначе профиль отдаётся из приватного кэша приложением
+        users_endpoints.append(("GET", "/me"))
+    orders_endpoints = [("GET", f"/{UUID}")]
+    if settings.IDEMPOTENCY_TTL <= 0:
+        # Иначе повторы по Idempotency-Key обрабатывает приложение
+        orders_endpoints += [("POST", "/checkout"), ("POST", f"/{UUID}/pay")]
+    return (
+        FastRoute(
+            "/api/cart",
+            "/api/v1/cart",
+            settings.CART_SERVICE_URL,
+            "cart-service",
+            AUTH_USER,
+            (
+                ("DELETE", ""),
+                ("POST", "/items"),
+                ("PATCH", f"/items/{UUID}"),
+                ("DELETE", f"/items/{UUID}"),
+                ("PATCH", f"/items/{UUID}/select"),
+                ("PATCH", "/select-all"),
+            ),
+            (CART_SECTION,),
+        ),
+        FastRoute(
+            "/api/users",
+            "/api/v1/users",
+            settings.AUTH_SERVICE_URL,
+            "auth-service",
+            AUTH_USER,
+            tuple(users_endpoints),
+            (PROFILE_SECTION,),
+        ),
+        FastRoute(
+            "/api/v1/orders",
+            "/api/v1/orders",
+            settings.ORDER_SERVICE_URL,
+            "order-service",
+            AUTH_USER,
+            tuple(orders_endpoints),
+            (CART_SECTION, ORDERS_SECTION),
+        ),
+        *(
+            FastRoute(
+                f"/api/{resource}",
+                f"/api/v1/{resource}",
+                settings.PRODUCT_SERVICE_URL,
+                "product-service",
+                AUTH_ADMIN,
+                (("POST", ""), ("PATCH", f"/{INT}"), ("DELETE", f"/{INT}")),
+            )
+            for resource in ("products", "categories", "attributes")
+        ),
+    )
+
+
+class FastPathTable:
+    """Таблица префиксов: одно регулярное выражение на все префиксы."""
+
+    def __init__(self, routes: tuple[FastRoute, ...]):
+        self._routes = {route.prefix: route for route in routes}
+        prefixes = sorted(self._routes, key=len, reverse=True)
+        self._prefix_re = re.compile(
+            "({})(/.*)?".format("|".join(re.escape(p) for p in prefixes))
+        )
+
+    def match(self, method: str, path: str) -> tuple[FastRoute, str] | None:
+        """Маршрут и остаток пути, если запрос обрабатывается fast path."""
+        match = self._prefix_re.fullmatch(path)
+        if match is None:
+            return None
+        route = self._routes[match[1]]
+        rest = match[2] or ""
+        if not route.matches(method, rest):
+            return None
+        return route, rest
+
+
+class FastPathMiddleware:
+    """
+    Внешний ASGI-слой: сквозные маршруты из таблицы проксируются напрямую,
+    остальные запросы передаются приложению.
+
+    CORS и лимиты тела для fast path обрабатывают те же CORSMiddleware
+    (с теми же настройками) и BodyLimitMiddleware, что и у приложения.
+    """
+
+    def __init__(self, app, cors_options: dict | None = None):
+        self.app = app
+        self.table = FastPathTable(build_fast_routes())
+        handler = BodyLimitMiddleware(self._proxy)
+        self._handler = (
+            CORSMiddleware(handler, **cors_options) if cors_options else handler
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http":
+            matched = self.table.match(scope["method"], scope["path"])
+            if matched is not None:
+                scope["gateway.fast_route"] = matched
+                await self._handler(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    async def _proxy(self, scope, receive, send) -> None:
+        route, rest = scope["gateway.fast_route"]
+        headers = dict(scope["headers"])
+        request_id = headers.get(b"x-request-id", b"").decode() or str(uuid.uuid4())
+        client = scope.get("client")
+
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(
+            request_id=request_id,
+            client_ip=client[0] if client else "unknown",
+        )
+
+        span = start_request_span(
+            headers.get(b"traceparent", b"").decode() or None,
+            scope["method"],
+            scope["path"],
+        )
+        if span is not None:
+            structlog.contextvars.bind_contextvars(trace_id=span.trace.trace_id)
+
+        timings = start_request_timings()
+        start_request_deadline(
+            scope["method"],
+            scope["path"],
+            headers.get(b"x-request-deadline", b"").decode() or None,
+        )
+        start_request_priority(scope["method"], scope["path"])
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            status_code = await self._handle(
+                scope, receive, send, route, rest, headers, request_id, timings
+            )
+        finally:
+            if span is not None:
+                finish_request_span(span, status_code)
+
+        timing_fields = {}
+        if timings is not None:
+            timing_fields["timings"] = timings.as_dict()
+        logger.info(
+            "request_finished",
+            method=scope["method"],
+            status_code=status_code,
+            path=scope["path"],
+            duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
+            fast_path=True,
+            **timing_fields,
+        )
+
+    async def _handle(
+        self, scope, receive, send, route, rest, headers, request_id, timings
+    ) -> int:
+        """Проверка токена и проксирование; возвращает статус ответа клиенту."""
+        response_headers = [(b"x-request-id", request_id.encode())]
+
+        # decode_jwt синхронный, но дешёвый (HMAC): без пула потоков
+        user, error = self._authenticate(headers.get(b"authorization"), route.auth)
+        if error is not None:
+            status_code, detail = error
+            extra = [(b"www-authenticate", b"Bearer")] if status_code == 401 else []
+            await _send_json(
+                send, status_code, {"detail": detail}, response_headers + extra
+            )
+            return status_code
+        structlog.contextvars.bind_contextvars(user_id=user.user_id)
+
+        upstream_headers = [
+            (key, value)
+            for key, value in scope["headers"]
+            if key not in EXCLUDED_REQUEST_HEADERS
+        ]
+        upstream_headers.extend(user.raw_headers)
+
+        body_started = False
+
+        async def request_body():
+            nonlocal body_started
+            body_started = True
+            more_body = True
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    raise ClientDisconnect()
+                more_body = message.get("more_body", False)
+                chunk = message.get("body", b"")
+                if chunk:
+                    yield chunk
+
+        has_body = b"transfer-encoding" in headers or headers.get(
+            b"content-length", b"0"
+        ) not in (b"", b"0")
+
+        url = build_target_url(
+            route.base_url,
+            route.upstream_prefix + rest,
+            scope["query_string"].decode("latin-1"),
+        )
+        method = scope["method"]
+        with start_span(
+            f"{method} {route.service_name}",
+            SPAN_KIND_CLIENT,
+            {
+                "http.request.method": method,
+                "url.full": url,
+                "peer.service": route.service_name,
+            },
+        ) as client_span:
+            if client_span:
+                upstream_headers = [
+                    item for item in upstream_headers if item[0] != b"traceparent"
+                ]
+                upstream_headers.append(
+                    (b"traceparent", client_span.traceparent().encode())
+                )
+            try:
+                response = await proxy_client.open_stream(
+                    method=method,
+                    url=url,
+                    headers=upstream_headers,
+                    content=request_body() if has_body else None,
+                    service_name=route.service_name,
+                    can_retry=lambda: not body_started,
+                )
+            except ClientDisconnect:
+                logger.info("client_disconnected", path=scope["path"])
+                return 499
+            except HTTPException as exc:
+                # Лимит размера или времени чтения тела (BodyLimitMiddleware)
+                await _send_json(
+                    send,
+                    exc.status_code,
+                    {"detail": exc.detail},
+                    response_headers + [(b"connection", b"close")],
+                )
+                return exc.status_code
+            except ServiceUnavailableError as exc:
+                logger.error("service_unavailable", detail=exc.detail)
+                await _send_json(
+                    send,
+                    503,
+                    {"detail": exc.detail, "request_id": request_id},
+                    response_headers + [(b"retry-after", b"30")],
+                )
+                return 503
+            except GatewayTimeoutError as exc:
+                logger.error("gateway_timeout", detail=exc.detail)
+                await _send_json(
+                    send,
+                    504,
+                    {"detail": exc.detail, "request_id": request_id},
+                    response_headers,
+                )
+                return 504
+            except GatewayException as exc:
+                logger.error("gateway_error", detail=exc.detail)
+                await _send_json(
+                    send,
+                    400,
+                    {"detail": exc.detail, "request_id": request_id},
+                    response_headers,
+                )
+                return 400
+            except httpx.HTTPError:
+                # Как unhandled_exception_handler приложения
+                logger.exception("unhandled_exception")
+                await _send_json(
+                    send,
+                    500,
+                    {
+                        "detail": "Internal server error. "
+                        "Please report this ID to support.",
+                        "request_id": request_id,
+                    },
+                    response_headers,
+                )
+                return 500
+            finally:
+                # Изменение могло дойти до сервиса, даже если ответа нет
+                if route.invalidates and method != "GET":
+                    private_cache.purge_tags(
+                        user_tag(user.user_id, section) for section in route.invalidates
+                    )
+
+            if client_span:
+                client_span.attributes["http.response.status_code"] = (
+                    response.status_code
+                )
+            await self._relay(response, send, response_headers, timings)
+        return response.status_code
+
+    @staticmethod
+    def _authenticate(authorization: bytes | None, auth: str):
+        """(пользователь, None) или (None, (статус, detail)) — как у зависимостей."""
+        scheme, _, token = (authorization or b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None, (401, "Not authenticated")
+        try:
+            user = decode_jwt(token)
+        except AuthenticationError as exc:
+            return None, (401, str(exc))
+        if auth == AUTH_ADMIN and user.role != "admin":
+            return None, (403, "Admin access required")
+        return user, None
+
+    @staticmethod
+    async def _relay(
+        response: httpx.Response, send, response_headers: list, timings
+    ) -> None:
+        """Передача ответа сервиса клиенту по мере поступления чанков."""
+        try:
+            headers = [
+                (key.lower(), value)
+                for key, value in response.headers.raw
+                if key.lower() not in EXCLUDED_RESPONSE_HEADERS
+            ]
+            headers.extend(response_headers)
+            if timings is not None and should_expose(timings):
+                headers.append(
+                    (b"server-timing", format_server_timing(timings.as_dict()).encode())
+                )
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": headers,
+                }
+            )
+            async for chunk in response.aiter_raw():
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+        except httpx.HTTPError as exc:
+            # Статус уже отправлен: ответ обрывается, клиент увидит разрыв
+            logger.error("fast_path_stream_aborted", error=str(exc))
+            raise
+        finally:
+            await response.aclose()
+            trace = response.request.extensions.get("trace")
+            if trace is not None:
+                trace.finish()
+
+
+async def _send_json(send, status_code: int, content: dict, headers: list) -> None:
+    body = json.dumps(content).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -6,6 +6,11 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
+from src.admission import start_request_priority
+from src.deadline import start_request_deadline
+from src.timing import format_server_timing, should_expose, start_request_timings
+from src.tracing import finish_request_span, start_request_span
+
 logger = structlog.get_logger()
 
 
@@ -20,19 +25,51 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             client_ip=client_ip,
         )
 
+        span = start_request_span(
+            request.headers.get("traceparent"), request.method, request.url.path
+        )
+        if span is not None:
+            structlog.contextvars.bind_contextvars(trace_id=span.trace.trace_id)
+
+        # Объект общий для всего запроса: фазы дописываются в эндпоинте
+        timings = start_request_timings()
+        # Бюджет времени маршрута на все запросы к сервисам (с повторами)
+        start_request_deadline(
+            request.method,
+            request.url.path,
+            request.headers.get("X-Request-Deadline"),
+        )
+        # Класс запроса в очереди к сервисам
+        start_request_priority(request.method, request.url.path)
         start_time = time.perf_counter()
-        response = await call_next(request)
+        try:
+            response = await call_next(request)
+        except Exception:
+            if span is not None:
+                finish_request_span(span, 500)
+            raise
         duration_ms = (time.perf_counter() - start_time) * 1000
 
+        if span is not None:
+            finish_request_span(span, response.status_code)
+
         if hasattr(request.state, "user_id"):
             structlog.contextvars.bind_contextvars(user_id=request.state.user_id)
 
+        timing_fields = {}
+        if timings is not None:
+            phases = timings.as_dict()
+            timing_fields["timings"] = phases
+            if should_expose(timings):
+                response.headers["Server-Timing"] = format_server_timing(phases)
+
         logger.info(
             "request_finished",
             method=request.method,
             status_code=response.status_code,
             path=request.url.path,
             duration_ms=round(duration_ms, 2),
+            **timing_fields,
         )
 
         response.headers["X-Request-ID"] = request_id
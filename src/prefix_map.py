@@ -0,0 +1,19 @@
+"""Значения настроек по префиксу пути (лимиты, таймауты маршрутов)."""
+
+
+class PrefixMap:
+    """Значение для пути по самому длинному совпавшему префиксу."""
+
+    def __init__(self, default: float, values: dict[str, float]):
+        self.default = default
+        self._values = sorted(
+            ((prefix.rstrip("/"), value) for prefix, value in values.items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    def for_path(self, path: str) -> float:
+        for prefix, value in self._values:
+            if path == prefix or path.startswith(prefix + "/"):
+                return value
+        return self.default
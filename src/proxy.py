@@ -1,14 +1,121 @@
 import asyncio
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from urllib.parse import urlencode
 
 import httpx
 from fastapi import Request, Response
 
+from src import compression
+from src.admission import SlotReleasingStream, admission
+from src.cache import (
+    CachedResponse,
+    ResponseCache,
+    compute_etag,
+    etag_matches,
+    private_cache,
+    response_cache,
+    strip_etag_variants,
+    variant_etag,
+)
+from src.circuit_breaker import circuit_breakers
 from src.config import settings
-from src.exceptions import GatewayTimeoutError, ServiceUnavailableError
+from src.deadline import (
+    DEADLINE_HEADER,
+    format_deadline_header,
+    remaining,
+    request_deadline,
+)
+from src.dns import dns_cache
+from src.exceptions import (
+    GatewayException,
+    GatewayTimeoutError,
+    IdempotencyConflictError,
+    ServiceUnavailableError,
+)
+from src.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    REPLAYED_HEADER,
+    idempotency_store,
+    request_fingerprint,
+)
 from src.logger import get_logger
+from src.timing import upstream_trace
+from src.tracing import SPAN_KIND_CLIENT, start_span
 
 logger = get_logger(__name__)
 
+# Заголовки ответа апстрима, которые не передаются клиенту
+EXCLUDED_RESPONSE_HEADERS = {
+    "content-encoding",
+    "etag",
+    "transfer-encoding",
+    "content-length",
+    "date",
+    "server",
+}
+
+# Дополнительные заголовки запроса: словарь или пары (имя, значение),
+# например UserIdentity.to_headers()
+HeaderItems = Mapping[str, str] | Iterable[tuple[str, str]]
+
+# Методы, для которых If-None-Match даёт 304 (RFC 9110, 13.1.2)
+CONDITIONAL_METHODS = frozenset({"GET", "HEAD"})
+
+# Ответ из кэша вместо ответа недоступного сервиса (RFC 9111, 5.5)
+STALE_WARNING = '110 - "Response is Stale"'
+
+
+def build_target_url(base_url: str, path: str, query: str | None = None) -> str:
+    """URL внутреннего сервиса (он же ключ кэша ответов)."""
+    target_url = f"{base_url.rstrip('/')}/{path.lstrip('/')}"
+    if query:
+        target_url = f"{target_url}?{query}"
+    return target_url
+
+
+def build_upstream_headers(
+    request: Request, extra_headers: HeaderItems | None = None
+) -> dict[str, str]:
+    """Заголовки запроса к внутреннему сервису на основе входящего запроса."""
+    # Копирование заголовков (исключая host, content-length)
+    headers = dict(request.headers)
+    headers.pop("host", None)
+    headers.pop("content-length", None)
+    # Апстрим сжимает только тем, что gateway умеет декодировать
+    headers["accept-encoding"] = compression.UPSTREAM_ACCEPT_ENCODING
+    if "if-none-match" in headers:
+        # Условный запрос уходит апстриму с ETag без суффикса кодировки
+        headers["if-none-match"] = strip_etag_variants(headers["if-none-match"])
+
+    # Добавление дополнительных заголовков
+    if extra_headers:
+        headers.update(extra_headers)
+    return headers
+
+
+def filter_response_headers(headers: httpx.Headers) -> list[tuple[str, str]]:
+    """Заголовки ответа апстрима, которые передаются клиенту."""
+    return [
+        (key, value)
+        for key, value in headers.multi_items()
+        if key.lower() not in EXCLUDED_RESPONSE_HEADERS
+    ]
+
+
+def _cap(timeout: float | None, budget: float) -> float:
+    return budget if timeout is None else min(timeout, budget)
+
+
+def _content_encoding(response: httpx.Response) -> str:
+    return (
+        response.headers.get("content-encoding", compression.IDENTITY).strip().lower()
+    )
+
+
+def _is_undecodable(encoding: str) -> bool:
+    return encoding != compression.IDENTITY and not compression.is_decodable(encoding)
+
 
 class ProxyClient:
     """HTTP-клиент для проксирования запросов к внутренним сервисам."""
@@ -26,12 +133,23 @@ class ProxyClient:
         )
         limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
 
-        self.client = httpx.AsyncClient(timeout=timeout, limits=limits, trust_env=False)
+        transport = None
+        if settings.DNS_CACHE_ENABLED:
+            # httpcore (и trio, если установлен) импортируется только здесь,
+            # как и в самом httpx — импорт src.main остаётся быстрым
+            from src.transport import ResolvingTransport, RoundRobinBalancer
+
+            transport = ResolvingTransport(dns_cache, RoundRobinBalancer(), limits)
+
+        self.client = httpx.AsyncClient(
+            timeout=timeout, limits=limits, transport=transport, trust_env=False
+        )
         logger.info(
             "proxy_client_initialized",
             timeout_connect=settings.PROXY_TIMEOUT_CONNECT,
             timeout_read=settings.PROXY_TIMEOUT_READ,
             timeout_write=settings.PROXY_TIMEOUT_WRITE,
+            dns_cache=settings.DNS_CACHE_ENABLED,
         )
 
     async def stop(self):
@@ -46,8 +164,13 @@ class ProxyClient:
         target_base_url: str,
         path: str,
         service_name: str,
-        extra_headers: dict[str, str] | None = None,
+        extra_headers: HeaderItems | None = None,
         max_retries: int | None = None,
+        cacheable: bool = False,
+        cache_tags: Iterable[str] = (),
+        private_cache_user: str | None = None,
+        invalidates: Iterable[str] = (),
+        idempotency_user: str | None = None,
     ) -> Response:
         """
         Проксирование запроса к внутреннему сервису с retry логикой.
@@ -59,13 +182,27 @@ class ProxyClient:
             service_name: Имя сервиса для логирования
             extra_headers: Дополнительные заголовки (X-User-ID и т.д.)
             max_retries: Максимальное количество повторов при ConnectError
+            cacheable: Кэшировать успешный GET-ответ и отвечать 304 по ETag
+                (публичные данные каталога)
+            cache_tags: Теги ресурсов записи кэша (для инвалидации по событиям)
+            private_cache_user: ID пользователя — кэшировать успешный GET-ответ
+                в приватном кэше (ключ — пользователь и URL)
+            invalidates: Теги приватного кэша, которые сбрасываются после
+                запроса (изменение данных пользователя)
+            idempotency_user: ID пользователя — повторы запроса с тем же
+                Idempotency-Key получают ответ первого запроса (src.idempotency)
 
         Returns:
             Response: Ответ от целевого сервиса
 
         Raises:
             GatewayTimeoutError: При таймауте запроса
-            ServiceUnavailableError: Когда все попытки исчерпаны
+            ServiceUnavailableError: Когда все попытки исчерпаны (или цепь
+                сервиса разомкнута), а устаревшего ответа в кэше нет
+            IdempotencyKeyMismatchError: Idempotency-Key уже использован
+                с другим запросом
+            IdempotencyConflictError: Первый запрос с тем же Idempotency-Key
+                был прерван
         """
         if max_retries is None:
             max_retries = settings.PROXY_MAX_RETRIES
@@ -74,71 +211,523 @@ class ProxyClient:
             raise RuntimeError("ProxyClient не инициализирован. Вызовите start().")
 
         # Формирование целевого URL
-        target_url = f"{target_base_url.rstrip('/')}/{path.lstrip('/')}"
-        if request.url.query:
-            target_url = f"{target_url}?{request.url.query}"
+        target_url = build_target_url(target_base_url, path, request.url.query)
 
-        # Копирование заголовков (исключая host, content-length)
-        headers = dict(request.headers)
-        headers.pop("host", None)
-        headers.pop("content-length", None)
+        cache, cache_key = self._select_cache(
+            request.method, target_url, cacheable, private_cache_user
+        )
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.debug(
+                    "proxy_cache_hit",
+                    service=service_name,
+                    url=target_url,
+                    private=cache.private,
+                )
+                return await self._build_cached_response(request, cached)
 
-        # Добавление дополнительных заголовков
-        if extra_headers:
-            headers.update(extra_headers)
+        headers = build_upstream_headers(request, extra_headers)
 
         # Чтение body запроса
         body = await request.body()
 
-        # Retry-цикл
+        if idempotency_user is not None and idempotency_store.enabled:
+            idempotency_key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+            if idempotency_key:
+                return await self._forward_idempotent(
+                    request,
+                    idempotency_store.record_key(idempotency_user, idempotency_key),
+                    target_url,
+                    headers,
+                    body,
+                    service_name,
+                    max_retries,
+                    invalidates,
+                )
+
+        try:
+            response, raw_content = await self._send(
+                method=request.method,
+                url=target_url,
+                headers=headers,
+                body=body,
+                service_name=service_name,
+                max_retries=max_retries,
+                circuit_breaker=self._can_serve_stale(cache, cache_key),
+            )
+        except (ServiceUnavailableError, GatewayTimeoutError) as exc:
+            stale = self._get_stale(cache, cache_key, service_name, type(exc).__name__)
+            if stale is None:
+                raise
+            return await self._build_stale_response(request, stale)
+        finally:
+            # Изменение могло дойти до сервиса, даже если ответа нет
+            if invalidates:
+                private_cache.purge_tags(invalidates)
+        if response.status_code >= 500:
+            stale = self._get_stale(
+                cache, cache_key, service_name, f"status {response.status_code}"
+            )
+            if stale is not None:
+                return await self._build_stale_response(request, stale)
+        return await self._build_response(
+            request, response, raw_content, cache, cache_key, cache_tags
+        )
+
+    async def _forward_idempotent(
+        self,
+        request: Request,
+        record_key: str,
+        target_url: str,
+        headers: dict[str, str],
+        body: bytes,
+        service_name: str,
+        max_retries: int,
+        invalidates: Iterable[str],
+    ) -> Response:
+        """
+        Запрос с Idempotency-Key: в сервис уходит только первый из повторов.
+
+        Повторы, пришедшие во время первого запроса, ждут его ответа;
+        пришедшие после — получают сохранённый ответ.
+        """
+        record, first = idempotency_store.begin(
+            record_key, request_fingerprint(request.method, target_url, body)
+        )
+        if not first:
+            in_flight = not record.future.done()
+            # shield: отключение клиента-повтора не отменяет ожидание остальных
+            entry = await asyncio.shield(record.future)
+            logger.info(
+                "idempotent_request_replayed",
+                service=service_name,
+                url=target_url,
+                in_flight=in_flight,
+                status_code=entry.status_code,
+            )
+            replayed = await self._build_cached_response(
+                request, entry, with_etag=False
+            )
+            replayed.headers[REPLAYED_HEADER] = "true"
+            return replayed
+
+        try:
+            response, raw_content = await self._send(
+                method=request.method,
+                url=target_url,
+                headers=headers,
+                body=body,
+                service_name=service_name,
+                max_retries=max_retries,
+            )
+            entry = await self._make_cache_entry(
+                response, raw_content, idempotency_store.ttl
+            )
+        except GatewayException as exc:
+            idempotency_store.fail(record_key, record, exc)
+            raise
+        except BaseException:
+            # Отмена или непредвиденная ошибка: исход запроса неизвестен,
+            # повтор должен прийти ещё раз
+            idempotency_store.fail(record_key, record, IdempotencyConflictError())
+            raise
+        finally:
+            if invalidates:
+                private_cache.purge_tags(invalidates)
+        idempotency_store.complete(record_key, record, entry)
+        return await self._build_cached_response(request, entry, with_etag=False)
+
+    async def fetch(
+        self,
+        method: str,
+        target_base_url: str,
+        path: str,
+        service_name: str,
+        headers: HeaderItems | None = None,
+        params: dict[str, str] | None = None,
+        max_retries: int | None = None,
+        cacheable: bool = False,
+        cache_tags: Iterable[str] = (),
+        private_cache_user: str | None = None,
+    ) -> httpx.Response:
+        """
+        Запрос к внутреннему сервису от имени самого gateway (агрегация).
+
+        В отличие от forward, не привязан к входящему запросу и возвращает
+        httpx.Response с уже декодированным телом.
+
+        Args:
+            method: HTTP-метод
+            target_base_url: URL целевого сервиса
+            path: Путь к эндпоинту
+            service_name: Имя сервиса для логирования
+            headers: Заголовки запроса (X-User-ID и т.д.)
+            params: Query-параметры
+            max_retries: Максимальное количество повторов при ConnectError
+            cacheable: Использовать кэш ответов (публичные данные каталога)
+            cache_tags: Теги ресурсов записи кэша (для инвалидации по событиям)
+            private_cache_user: ID пользователя — кэшировать успешный GET-ответ
+                в приватном кэше (ключ — пользователь и URL)
+
+        Raises:
+            GatewayTimeoutError: При таймауте запроса
+            ServiceUnavailableError: Когда все попытки исчерпаны (или цепь
+                сервиса разомкнута), а устаревшего ответа в кэше нет
+        """
+        if max_retries is None:
+            max_retries = settings.PROXY_MAX_RETRIES
+
+        if not self.client:
+            raise RuntimeError("ProxyClient не инициализирован. Вызовите start().")
+
+        target_url = build_target_url(
+            target_base_url, path, urlencode(params) if params else None
+        )
+
+        cache, cache_key = self._select_cache(
+            method, target_url, cacheable, private_cache_user
+        )
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.debug(
+                    "proxy_cache_hit",
+                    service=service_name,
+                    url=target_url,
+                    private=cache.private,
+                )
+                return httpx.Response(
+                    status_code=cached.status_code,
+                    headers=cached.headers,
+                    content=cached.content,
+                )
+
+        request_headers = {"accept-encoding": compression.UPSTREAM_ACCEPT_ENCODING}
+        if headers:
+            request_headers.update(headers)
+
+        try:
+            response, raw_content = await self._send(
+                method=method,
+                url=target_url,
+                headers=request_headers,
+                body=b"",
+                service_name=service_name,
+                max_retries=max_retries,
+                circuit_breaker=self._can_serve_stale(cache, cache_key),
+            )
+        except (ServiceUnavailableError, GatewayTimeoutError) as exc:
+            stale = self._get_stale(cache, cache_key, service_name, type(exc).__name__)
+            if stale is None:
+                raise
+            return self._stale_httpx_response(stale)
+        if response.status_code >= 500:
+            stale = self._get_stale(
+                cache, cache_key, service_name, f"status {response.status_code}"
+            )
+            if stale is not None:
+                return self._stale_httpx_response(stale)
+        if cache_key is not None and self._is_cacheable(response, cache.private):
+            entry = await self._make_cache_entry(
+                response, raw_content, cache.ttl, cache_tags
+            )
+            cache.set(cache_key, entry)
+            content = entry.content
+        else:
+            content = await self._decode_content(response, raw_content)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=filter_response_headers(response.headers),
+            content=content,
+        )
+
+    async def open_stream(
+        self,
+        method: str,
+        url: str,
+        headers: list[tuple[bytes, bytes]],
+        content: AsyncIterator[bytes] | None,
+        service_name: str,
+        can_retry: Callable[[], bool],
+        max_retries: int | None = None,
+    ) -> httpx.Response:
+        """
+        Запрос к сервису без буферизации тел (fast path).
+
+        Тело запроса передаётся итератором, ответ возвращается с открытым
+        потоком — вызывающий читает его через aiter_raw() и закрывает.
+
+        Args:
+            method: HTTP-метод
+            url: URL внутреннего сервиса
+            headers: Заголовки запроса
+            content: Тело запроса (None — без тела)
+            service_name: Имя сервиса для логирования
+            can_retry: Можно ли повторить запрос — тело из итератора
+                нельзя отправить второй раз, если его уже начали читать
+            max_retries: Максимальное количество повторов при ConnectError
+
+        Raises:
+            GatewayTimeoutError: При таймауте запроса
+            ServiceUnavailableError: Когда все попытки исчерпаны
+        """
+        if max_retries is None:
+            max_retries = settings.PROXY_MAX_RETRIES
+
+        if not self.client:
+            raise RuntimeError("ProxyClient не инициализирован. Вызовите start().")
+
+        return await self._open_stream_with_retries(
+            method, url, headers, content, service_name, can_retry, max_retries
+        )
+
+    async def _open_stream_with_retries(
+        self,
+        method: str,
+        url: str,
+        headers: list[tuple[bytes, bytes]],
+        content: AsyncIterator[bytes] | None,
+        service_name: str,
+        can_retry: Callable[[], bool],
+        max_retries: int,
+    ) -> httpx.Response:
+        timing = upstream_trace()
+        deadline = request_deadline.get()
+        last_error: Exception | None = None
+        attempts = 0
+        while attempts < max_retries:
+            attempts += 1
+            timeout, deadline_header = self._attempt_budget(
+                deadline, service_name, method, url
+            )
+            attempt_headers = headers
+            if deadline_header is not None:
+                attempt_headers = [
+                    *headers,
+                    (DEADLINE_HEADER.encode(), deadline_header.encode()),
+                ]
+            try:
+                upstream_request = self.client.build_request(
+                    method=method,
+                    url=url,
+                    headers=attempt_headers,
+                    content=content,
+                    timeout=timeout,
+                    extensions={"trace": timing} if timing else None,
+                )
+                # Дедлайн ограничивает ожидание слота и ответа; чтение тела —
+                # read-таймаутом, урезанным до остатка бюджета
+                async with asyncio.timeout_at(deadline):
+                    response = await self._send_stream(upstream_request)
+                logger.info(
+                    "proxy_request_success",
+                    service=service_name,
+                    method=method,
+                    status_code=response.status_code,
+                    attempt=attempts,
+                )
+                return response
+
+            except httpx.ConnectError as exc:
+                last_error = exc
+                backoff_time = 0.5 * attempts
+                if (
+                    attempts >= max_retries
+                    or not can_retry()
+                    or not self._can_wait(deadline, backoff_time)
+                ):
+                    break
+                logger.warning(
+                    "proxy_connection_failed",
+                    service=service_name,
+                    method=method,
+                    url=url,
+                    attempt=attempts,
+                    max_retries=max_retries,
+                    backoff_seconds=backoff_time,
+                    error=str(exc),
+                )
+                await asyncio.sleep(backoff_time)
+
+            except httpx.TimeoutException as exc:
+                logger.error(
+                    "proxy_timeout",
+                    service=service_name,
+                    method=method,
+                    url=url,
+                    error=str(exc),
+                )
+                raise GatewayTimeoutError(
+                    f"Timeout while requesting {service_name}"
+                ) from exc
+
+            except TimeoutError as exc:
+                raise self._deadline_exceeded(service_name, method, url) from exc
+
+            except httpx.HTTPError as exc:
+                logger.error(
+                    "proxy_http_error",
+                    service=service_name,
+                    method=method,
+                    url=url,
+                    error=str(exc),
+                )
+                raise
+
+        logger.error(
+            "proxy_all_retries_failed",
+            service=service_name,
+            method=method,
+            url=url,
+            max_retries=max_retries,
+            attempts=attempts,
+            last_error=str(last_error) if last_error else "Unknown",
+        )
+        raise ServiceUnavailableError(
+            f"Service {service_name} is unavailable after {attempts} retries"
+        )
+
+    async def _send_stream(self, upstream_request: httpx.Request) -> httpx.Response:
+        """Отправка с открытым потоком ответа: слот очереди занят до его закрытия."""
+        if not admission.enabled:
+            return await self.client.send(upstream_request, stream=True)
+        await admission.acquire()
+        try:
+            response = await self.client.send(upstream_request, stream=True)
+        except BaseException:
+            admission.release()
+            raise
+        response.stream = SlotReleasingStream(response.stream, admission.release)
+        return response
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes,
+        service_name: str,
+        max_retries: int,
+        circuit_breaker: bool = False,
+    ) -> tuple[httpx.Response, bytes]:
+        """
+        Отправка запроса апстриму.
+
+        С circuit_breaker запрос идёт через цепь сервиса: при разомкнутой
+        цепи он не отправляется вовсе. Цепь включается только для чтений
+        каталога, у которых есть устаревшая копия на замену (stale-if-error):
+        иначе ошибки одного клиента отключали бы сервис для всех.
+
+        Returns:
+            Ответ апстрима (с закрытым потоком) и сырое, не декодированное тело
+
+        Raises:
+            CircuitOpenError: Цепь сервиса разомкнута
+        """
+        if not circuit_breaker:
+            return await self._send_with_retries(
+                method, url, headers, body, service_name, max_retries
+            )
+        breaker = circuit_breakers.get(service_name)
+        breaker.before_request()
+        try:
+            response, raw_content = await self._send_with_retries(
+                method, url, headers, body, service_name, max_retries
+            )
+        except (ServiceUnavailableError, GatewayTimeoutError):
+            breaker.record_failure()
+            raise
+        breaker.record_status(response.status_code)
+        return response, raw_content
+
+    async def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes,
+        service_name: str,
+        max_retries: int,
+    ) -> tuple[httpx.Response, bytes]:
+        """
+        Отправка запроса апстриму с retry при ошибках подключения.
+
+        Returns:
+            Ответ апстрима (с закрытым потоком) и сырое, не декодированное тело
+        """
         last_error: Exception | None = None
+        deadline = request_deadline.get()
 
         for attempt in range(max_retries):
+            timeout, deadline_header = self._attempt_budget(
+                deadline, service_name, method, url
+            )
+            if deadline_header is not None:
+                headers[DEADLINE_HEADER] = deadline_header
             try:
                 logger.debug(
                     "proxy_request_attempt",
                     service=service_name,
-                    method=request.method,
-                    url=target_url,
+                    method=method,
+                    url=url,
                     attempt=attempt + 1,
                     max_retries=max_retries,
                 )
 
-                response = await self.client.request(
-                    method=request.method,
-                    url=target_url,
-                    headers=headers,
-                    content=body,
-                )
+                # Вся попытка, вместе с чтением тела и ожиданием слота в очереди
+                # класса запроса, укладывается в дедлайн
+                async with asyncio.timeout_at(deadline), admission.slot():
+                    # Span на каждую попытку; его traceparent уходит сервису
+                    with start_span(
+                        f"{method} {service_name}",
+                        SPAN_KIND_CLIENT,
+                        {
+                            "http.request.method": method,
+                            "url.full": url,
+                            "peer.service": service_name,
+                            "http.request.resend_count": attempt,
+                        },
+                    ) as span:
+                        if span:
+                            headers["traceparent"] = span.traceparent()
+
+                        # Фазы запроса (pool, connect, wait, ...) для Server-Timing
+                        timing = upstream_trace()
+                        upstream_request = self.client.build_request(
+                            method=method,
+                            url=url,
+                            headers=headers,
+                            content=body,
+                            timeout=timeout,
+                            extensions={"trace": timing} if timing else None,
+                        )
+                        response = await self.client.send(upstream_request, stream=True)
+                        try:
+                            # Сырые байты без декодирования: сжатый ответ апстрима
+                            # может уйти клиенту как есть
+                            raw_content = b"".join(
+                                [chunk async for chunk in response.aiter_raw()]
+                            )
+                        finally:
+                            await response.aclose()
+                        if timing:
+                            timing.finish()
+                        if span:
+                            span.attributes["http.response.status_code"] = (
+                                response.status_code
+                            )
 
                 logger.info(
                     "proxy_request_success",
                     service=service_name,
-                    method=request.method,
+                    method=method,
                     status_code=response.status_code,
                     attempt=attempt + 1,
                     upstream_headers=dict(response.headers),
                 )
 
-                # Фильтрация заголовков ответа
-                fastapi_response = Response(
-                    content=response.content,
-                    status_code=response.status_code,
-                )
-
-                exclude_headers = {
-                    "content-encoding",
-                    "transfer-encoding",
-                    "content-length",
-                    "date",
-                    "server",
-                }
-
-                for key, value in response.headers.multi_items():
-                    if key.lower() not in exclude_headers:
-                        fastapi_response.headers.append(key, value)
-
-                return fastapi_response
+                return response, raw_content
 
             except httpx.ConnectError as exc:
                 # Ошибка подключения - retry с exponential backoff
@@ -148,8 +737,8 @@ class ProxyClient:
                 logger.warning(
                     "proxy_connection_failed",
                     service=service_name,
-                    method=request.method,
-                    url=target_url,
+                    method=method,
+                    url=url,
                     attempt=attempt + 1,
                     max_retries=max_retries,
                     backoff_seconds=backoff_time,
@@ -157,6 +746,8 @@ class ProxyClient:
                 )
 
                 if attempt < max_retries - 1:
+                    if not self._can_wait(deadline, backoff_time):
+                        break
                     await asyncio.sleep(backoff_time)
                 continue
 
@@ -165,21 +756,25 @@ class ProxyClient:
                 logger.error(
                     "proxy_timeout",
                     service=service_name,
-                    method=request.method,
-                    url=target_url,
+                    method=method,
+                    url=url,
                     error=str(exc),
                 )
                 raise GatewayTimeoutError(
                     f"Timeout while requesting {service_name}"
                 ) from exc
 
+            except TimeoutError as exc:
+                # Исчерпан бюджет входящего запроса
+                raise self._deadline_exceeded(service_name, method, url) from exc
+
             except httpx.HTTPError as exc:
                 # Другие HTTP ошибки - не retryable
                 logger.error(
                     "proxy_http_error",
                     service=service_name,
-                    method=request.method,
-                    url=target_url,
+                    method=method,
+                    url=url,
                     error=str(exc),
                 )
                 raise
@@ -188,8 +783,8 @@ class ProxyClient:
         logger.error(
             "proxy_all_retries_failed",
             service=service_name,
-            method=request.method,
-            url=target_url,
+            method=method,
+            url=url,
             max_retries=max_retries,
             last_error=str(last_error) if last_error else "Unknown",
         )
@@ -197,5 +792,301 @@ class ProxyClient:
             f"Service {service_name} is unavailable after {max_retries} retries"
         )
 
+    def _attempt_budget(
+        self, deadline: float | None, service_name: str, method: str, url: str
+    ) -> tuple[httpx.Timeout, str | None]:
+        """
+        Таймауты попытки и значение X-Request-Deadline по остатку бюджета.
+
+        Без дедлайна (запрос вне входящего запроса) — таймауты клиента.
+
+        Raises:
+            GatewayTimeoutError: Бюджет уже исчерпан
+        """
+        default = self.client.timeout
+        if deadline is None:
+            return default, None
+        budget = remaining(deadline)
+        if budget <= 0:
+            raise self._deadline_exceeded(service_name, method, url)
+        timeout = httpx.Timeout(
+            connect=_cap(default.connect, budget),
+            read=_cap(default.read, budget),
+            write=_cap(default.write, budget),
+            pool=_cap(default.pool, budget),
+        )
+        return timeout, format_deadline_header(budget)
+
+    @staticmethod
+    def _can_wait(deadline: float | None, seconds: float) -> bool:
+        """Остаётся ли после паузы перед повтором хоть какой-то бюджет."""
+        return deadline is None or remaining(deadline) > seconds
+
+    @staticmethod
+    def _deadline_exceeded(
+        service_name: str, method: str, url: str
+    ) -> GatewayTimeoutError:
+        logger.error(
+            "proxy_deadline_exceeded",
+            service=service_name,
+            method=method,
+            url=url,
+        )
+        return GatewayTimeoutError(f"Deadline exceeded while requesting {service_name}")
+
+    async def _build_response(
+        self,
+        request: Request,
+        response: httpx.Response,
+        raw_content: bytes,
+        cache: ResponseCache | None,
+        cache_key: str | None,
+        cache_tags: Iterable[str] = (),
+    ) -> Response:
+        """
+        Формирование ответа клиенту из ответа апстрима.
+
+        Сжатый апстримом ответ передаётся как есть, если клиент принимает
+        эту кодировку. Иначе тело декодируется и при необходимости сжимается
+        заново согласованной с клиентом кодировкой.
+        """
+        accept_encoding = request.headers.get("accept-encoding", "")
+        headers = filter_response_headers(response.headers)
+        upstream_etag = response.headers.get("etag")
+        upstream_encoding = _content_encoding(response)
+
+        if cache is not None and self._is_cacheable(response, cache.private):
+            entry = await self._make_cache_entry(
+                response, raw_content, cache.ttl, cache_tags
+            )
+            if cache_key is not None:
+                cache.set(cache_key, entry)
+            return await self._build_cached_response(request, entry)
+
+        if _is_undecodable(upstream_encoding):
+            # zstd без zstandard, цепочка "gzip, br" и т.п. — тело
+            # передаётся клиенту как есть, без пересжатия
+            return self._make_response(
+                response.status_code,
+                headers,
+                raw_content,
+                upstream_encoding,
+                upstream_etag,
+            )
+
+        if upstream_encoding != compression.IDENTITY:
+            if compression.accepts(accept_encoding, upstream_encoding):
+                return self._make_response(
+                    response.status_code,
+                    headers,
+                    raw_content,
+                    upstream_encoding,
+                    variant_etag(upstream_etag, upstream_encoding),
+                )
+            raw_content = await compression.decompress(raw_content, upstream_encoding)
+
+        encoding = None
+        if compression.is_compressible(
+            response.status_code,
+            response.headers.get("content-type"),
+            len(raw_content),
+        ):
+            encoding = compression.negotiate(accept_encoding)
+        if encoding is not None:
+            raw_content = await compression.compress(raw_content, encoding)
+        return self._make_response(
+            response.status_code,
+            headers,
+            raw_content,
+            encoding,
+            variant_etag(upstream_etag, encoding),
+        )
+
+    async def _build_cached_response(
+        self, request: Request, entry: CachedResponse, with_etag: bool = True
+    ) -> Response:
+        """
+        Ответ из кэша в согласованной с клиентом кодировке.
+
+        Если ETag из If-None-Match совпадает с актуальным — 304 без тела
+        (только для GET и HEAD: If-None-Match с другими методами не делает
+        ответ условным).
+
+        Args:
+            request: Входящий запрос
+            entry: Сохранённый ответ
+            with_etag: Добавлять ETag; ответы на повторы с Idempotency-Key
+                отдаются без него — это не представление ресурса
+        """
+        encoding = None
+        if entry.compressible:
+            encoding = compression.negotiate(request.headers.get("accept-encoding", ""))
+        etag = variant_etag(entry.etag, encoding) if with_etag else None
+
+        if_none_match = request.headers.get("if-none-match")
+        if (
+            if_none_match
+            and etag is not None
+            and request.method in CONDITIONAL_METHODS
+            and etag_matches(if_none_match, entry.etag)
+        ):
+            not_modified = self._make_response(
+                304, entry.headers, b"", None, etag, drop_entity_headers=True
+            )
+            if entry.compressible:
+                not_modified.headers.append("vary", "Accept-Encoding")
+            return not_modified
+
+        content = await entry.encoded(encoding) if encoding else entry.content
+        return self._make_response(
+            entry.status_code,
+            entry.headers,
+            content,
+            encoding or entry.content_encoding,
+            etag,
+        )
+
+    @staticmethod
+    def _can_serve_stale(cache: ResponseCache | None, cache_key: str | None) -> bool:
+        """Есть ли у запроса устаревшая копия на случай ошибки сервиса."""
+        return cache is not None and cache_key is not None and cache.stale_ttl > 0
+
+    @staticmethod
+    def _get_stale(
+        cache: ResponseCache | None,
+        cache_key: str | None,
+        service_name: str,
+        reason: str,
+    ) -> CachedResponse | None:
+        """Устаревший ответ из кэша вместо ошибки сервиса (stale-if-error)."""
+        if cache is None or cache_key is None or cache.stale_ttl <= 0:
+            return None
+        entry = cache.get_stale(cache_key)
+        if entry is not None:
+            logger.warning(
+                "proxy_stale_served",
+                service=service_name,
+                url=cache_key,
+                reason=reason,
+                age=entry.age,
+            )
+        return entry
+
+    async def _build_stale_response(
+        self, request: Request, entry: CachedResponse
+    ) -> Response:
+        response = await self._build_cached_response(request, entry)
+        response.headers["warning"] = STALE_WARNING
+        response.headers["age"] = str(entry.age)
+        return response
+
+    @staticmethod
+    def _stale_httpx_response(entry: CachedResponse) -> httpx.Response:
+        return httpx.Response(
+            status_code=entry.status_code,
+            headers=[
+                *entry.headers,
+                ("warning", STALE_WARNING),
+                ("age", str(entry.age)),
+            ],
+            content=entry.content,
+        )
+
+    @staticmethod
+    async def _decode_content(response: httpx.Response, raw_content: bytes) -> bytes:
+        """
+        Декодирование тела ответа апстрима по его Content-Encoding.
+
+        Тело в кодировке, которую gateway не декодирует, возвращается как есть.
+        """
+        upstream_encoding = _content_encoding(response)
+        if upstream_encoding == compression.IDENTITY:
+            return raw_content
+        return await compression.decompress(raw_content, upstream_encoding)
+
+    @staticmethod
+    async def _make_cache_entry(
+        response: httpx.Response,
+        raw_content: bytes,
+        ttl: float,
+        tags: Iterable[str] = (),
+    ) -> CachedResponse:
+        """
+        Запись кэша из ответа апстрима (тело хранится несжатым).
+
+        Тело в кодировке, которую gateway не декодирует, хранится как есть
+        вместе с этой кодировкой (content_encoding) и не пересжимается.
+        """
+        upstream_encoding = _content_encoding(response)
+        content = await ProxyClient._decode_content(response, raw_content)
+        undecodable = _is_undecodable(upstream_encoding)
+        entry = CachedResponse(
+            status_code=response.status_code,
+            headers=filter_response_headers(response.headers),
+            content=content,
+            etag=response.headers.get("etag") or compute_etag(content),
+            expires_at=time.monotonic() + ttl,
+            tags=frozenset(tags),
+            content_encoding=upstream_encoding if undecodable else None,
+        )
+        if upstream_encoding != compression.IDENTITY and not undecodable:
+            # Уже сжатый апстримом вариант сохраняется без пересжатия
+            entry.encodings[upstream_encoding] = raw_content
+        return entry
+
+    @staticmethod
+    def _is_cacheable(response: httpx.Response, private: bool = False) -> bool:
+        if response.status_code != 200 or "set-cookie" in response.headers:
+            return False
+        # Тело, которое gateway не декодирует, не кэшируется: его нельзя
+        # отдать клиентам с другим Accept-Encoding
+        if _is_undecodable(_content_encoding(response)):
+            return False
+        cache_control = response.headers.get("cache-control", "").lower()
+        if "no-store" in cache_control:
+            return False
+        return private or "private" not in cache_control
+
+    @staticmethod
+    def _select_cache(
+        method: str, url: str, cacheable: bool, private_cache_user: str | None
+    ) -> tuple[ResponseCache | None, str | None]:
+        """
+        Кэш для ответа на запрос и ключ записи.
+
+        Кэш без ключа (TTL равен нулю) — ответ не сохраняется, но строится
+        как закэшированный: с ETag и 304 на If-None-Match.
+        """
+        if method != "GET":
+            return None, None
+        if private_cache_user is not None:
+            if private_cache.ttl <= 0:
+                return None, None
+            return private_cache, f"{private_cache_user} {url}"
+        if not cacheable:
+            return None, None
+        return response_cache, url if response_cache.ttl > 0 else None
+
+    @staticmethod
+    def _make_response(
+        status_code: int,
+        headers: list[tuple[str, str]],
+        content: bytes,
+        encoding: str | None,
+        etag: str | None = None,
+        drop_entity_headers: bool = False,
+    ) -> Response:
+        fastapi_response = Response(content=content, status_code=status_code)
+        for key, value in headers:
+            if drop_entity_headers and key.lower() == "content-type":
+                continue
+            fastapi_response.headers.append(key, value)
+        if etag is not None:
+            fastapi_response.headers["etag"] = etag
+        if encoding is not None:
+            fastapi_response.headers["content-encoding"] = encoding
+            fastapi_response.headers.append("vary", "Accept-Encoding")
+        return fastapi_response
+
 
 proxy_client = ProxyClient()
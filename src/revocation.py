@@ -0,0 +1,209 @@
+"""
+Список отзыва access-токенов на стороне gateway.
+
+Auth Service при logout-all удаляет только refresh-токены, а access-токены
+gateway проверяет сам и без списка отзыва принимал бы их до exp. Список
+хранит два вида записей:
+- по пользователю: токены с iat не позже cut-off (logout-all, блокировка);
+- по jti: отдельный отозванный токен.
+
+Записи поступают из трёх источников:
+- успешный POST /api/auth/logout-all через этот gateway — сразу;
+- POST /api/internal/auth/revoke от Auth Service (X-Internal-Token);
+- опционально — опрос ленты отзывов Auth Service (REVOCATION_POLL_INTERVAL),
+  чтобы отзыв через другую реплику gateway дошёл и сюда.
+
+Проверка выполняется на каждом запросе с токеном, в том числе при попадании
+в token_cache, поэтому должна стоить почти ноль в обычном случае (токен
+не отозван): пустой список проверяется одним сравнением, иначе — поиском
+в словарях по строкам user_id/jti, хэш которых уже посчитан и закэширован
+в самой строке. Запись по пользователю нужна, пока живы выпущенные до отзыва
+токены (ACCESS_TOKEN_MAX_LIFETIME), запись по jti — до exp токена; истёкшие
+записи периодически удаляются, словари при этом пересобираются, чтобы
+вернуть память.
+"""
+
+import asyncio
+import math
+import time
+
+from pydantic import ValidationError
+
+from src.config import settings
+from src.exceptions import GatewayException
+from src.identity import UserIdentity
+from src.logger import get_logger
+from src.proxy import proxy_client
+from src.schemas.internal import (
+    TokenRevocationFeedSchema,
+    TokenRevocationRequestSchema,
+)
+
+logger = get_logger(__name__)
+
+
+def issued_through(issued_before: float) -> int:
+    """Включительный cut-off по iat для «отозваны токены с iat раньше момента»."""
+    return math.ceil(issued_before) - 1
+
+
+class RevocationList:
+    """Отозванные access-токены: по пользователю (cut-off по iat) и по jti."""
+
+    def __init__(self):
+        # user_id -> (отозваны токены с iat не позже, когда запись не нужна)
+        self._users: dict[str, tuple[int, float]] = {}
+        # jti -> exp токена
+        self._tokens: dict[str, float] = {}
+        self._cursor: str | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return len(self._users) + len(self._tokens)
+
+    @property
+    def users(self) -> int:
+        return len(self._users)
+
+    @property
+    def tokens(self) -> int:
+        return len(self._tokens)
+
+    def is_revoked(self, identity: UserIdentity) -> bool:
+        """Отозван ли токен пользователя (вызывается на каждом запросе)."""
+        if self._users:
+            entry = self._users.get(identity.user_id)
+            if entry is not None and identity.issued_at <= entry[0]:
+                return True
+        if self._tokens and identity.jti is not None:
+            return identity.jti in self._tokens
+        return False
+
+    def revoke_user(self, user_id: str, issued_through: int) -> None:
+        """
+        Отзыв всех токенов пользователя с iat не позже issued_through.
+
+        iat — целые секунды, поэтому cut-off тоже целый и включительный.
+        Более ранний cut-off не заменяет уже известный более поздний.
+        """
+        current = self._users.get(user_id)
+        if current is not None and current[0] >= issued_through:
+            return
+        self._users[user_id] = (
+            issued_through,
+            issued_through + 1 + settings.ACCESS_TOKEN_MAX_LIFETIME,
+        )
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        """Отзыв одного токена; уже истёкший токен не запоминается."""
+        if expires_at > time.time():
+            self._tokens[jti] = expires_at
+
+    def apply(self, request: TokenRevocationRequestSchema, source: str) -> None:
+        """
+        Применение пакета отзывов от Auth Service.
+
+        Args:
+            request: Отзывы по пользователям и по jti
+            source: Откуда пришёл пакет (для логирования)
+        """
+        for user in request.users:
+            self.revoke_user(
+                str(user.user_id), issued_through(user.issued_before.timestamp())
+            )
+        for token in request.tokens:
+            self.revoke_token(token.jti, token.expires_at.timestamp())
+        if request.users or request.tokens:
+            logger.info(
+                "tokens_revoked",
+                source=source,
+                users=len(request.users),
+                tokens=len(request.tokens),
+            )
+
+    def compact(self) -> int:
+        """
+        Удаление записей, которые уже не могут совпасть ни с одним живым токеном.
+
+        Returns:
+            Количество удалённых записей
+        """
+        now = time.time()
+        users = {
+            user_id: entry for user_id, entry in self._users.items() if entry[1] > now
+        }
+        tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+        removed = len(self) - len(users) - len(tokens)
+        # Новые словари вместо удаления по ключу: dict не уменьшается сам
+        self._users = users
+        self._tokens = tokens
+        if removed:
+            logger.debug("revocations_compacted", removed=removed, remaining=len(self))
+        return removed
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._tokens.clear()
+
+    async def start(self) -> None:
+        if settings.REVOCATION_COMPACT_INTERVAL > 0:
+            self._tasks.append(asyncio.create_task(self._compact_loop()))
+        if settings.REVOCATION_POLL_INTERVAL > 0:
+            self._tasks.append(asyncio.create_task(self._poll_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+
+    async def _compact_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.REVOCATION_COMPACT_INTERVAL)
+            self.compact()
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except (GatewayException, ValidationError) as exc:
+                logger.warning("revocations_poll_failed", error=str(exc))
+            await asyncio.sleep(settings.REVOCATION_POLL_INTERVAL)
+
+    async def poll(self) -> None:
+        """
+        Запрос новых отзывов у Auth Service (с позиции прошлого опроса).
+
+        Raises:
+            GatewayTimeoutError: При таймауте запроса
+            ServiceUnavailableError: Auth Service недоступен
+            ValidationError: Ответ не соответствует TokenRevocationFeedSchema
+        """
+        params = {"since": self._cursor} if self._cursor else None
+        headers = (
+            {"X-Internal-Token": settings.INTERNAL_API_TOKEN}
+            if settings.INTERNAL_API_TOKEN
+            else None
+        )
+        response = await proxy_client.fetch(
+            "GET",
+            settings.AUTH_SERVICE_URL,
+            settings.REVOCATION_POLL_PATH,
+            service_name="auth-service",
+            headers=headers,
+            params=params,
+        )
+        if response.status_code != 200:
+            logger.warning("revocations_poll_failed", status_code=response.status_code)
+            return
+        feed = TokenRevocationFeedSchema.model_validate_json(response.content)
+        self.apply(feed, source="poll")
+        if feed.cursor is not None:
+            self._cursor = feed.cursor
+
+
+revocation_list = RevocationList()
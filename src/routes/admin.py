@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from src.admission import admission
+from src.cache import response_cache
+from src.config import settings
+from src.dependencies import AdminUserDep
+from src.loop_monitor import loop_lag_monitor
+from src.schemas.admin import (
+    AdmissionStatsSchema,
+    LoopLagResponseSchema,
+    ResponseCacheStatsSchema,
+)
+from src.services.profiler import SamplingProfilerDep
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_gateway(
+    user: AdminUserDep,
+    profiler: SamplingProfilerDep,
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1.0, le=1000.0),
+) -> PlainTextResponse:
+    """
+    Профилирование gateway в течение seconds секунд (только для администраторов).
+
+    Возвращает стеки потока event loop в формате collapsed — файл можно
+    открыть в speedscope или построить flamegraph (flamegraph.pl, inferno).
+    Одновременно выполняется только одно профилирование.
+    """
+    if profiler.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Profiling is already in progress",
+        )
+    stacks = await profiler.profile(seconds, interval_ms)
+    return PlainTextResponse(
+        stacks,
+        headers={"Content-Disposition": 'attachment; filename="gateway.collapsed"'},
+    )
+
+
+@router.get("/event-loop", response_model=LoopLagResponseSchema)
+async def get_event_loop_lag(user: AdminUserDep) -> LoopLagResponseSchema:
+    """
+    Гистограмма задержки event loop (только для администраторов).
+
+    Задержка измеряется непрерывно с момента запуска; стеки блокировок
+    дольше LOOP_LAG_THRESHOLD_MS пишутся в лог event_loop_blocked.
+    """
+    return LoopLagResponseSchema(**loop_lag_monitor.snapshot())
+
+
+@router.get("/cache", response_model=ResponseCacheStatsSchema)
+async def get_response_cache_stats(user: AdminUserDep) -> ResponseCacheStatsSchema:
+    """Состояние кэша ответов каталога (только для администраторов)."""
+    return ResponseCacheStatsSchema(**response_cache.stats())
+
+
+@router.get("/admission", response_model=AdmissionStatsSchema)
+async def get_admission_stats(user: AdminUserDep) -> AdmissionStatsSchema:
+    """
+    Очередь запросов к сервисам по классам (только для администраторов).
+
+    Время ожидания слота — гистограммы по классам с момента запуска.
+    """
+    return AdmissionStatsSchema(**admission.stats())
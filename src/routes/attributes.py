@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request, status
 
+from src.cache import ATTRIBUTES_TAG, attribute_tag
 from src.config import settings
 from src.dependencies import AdminUserDep
 from src.proxy import proxy_client
@@ -25,6 +26,8 @@ async def get_attributes(request: Request) -> list[AttributeResponseSchema]:
         target_base_url=settings.PRODUCT_SERVICE_URL,
         path="api/v1/attributes",
         service_name="product-service",
+        cacheable=True,
+        cache_tags=(ATTRIBUTES_TAG,),
     )
 
 
@@ -40,6 +43,8 @@ async def get_attribute(attribute_id: int, request: Request) -> AttributeRespons
         target_base_url=settings.PRODUCT_SERVICE_URL,
         path=f"api/v1/attributes/{attribute_id}",
         service_name="product-service",
+        cacheable=True,
+        cache_tags=(attribute_tag(attribute_id),),
     )
 
 
@@ -1,11 +1,41 @@
-from fastapi import APIRouter, Request, status
+import math
+
+from fastapi import APIRouter, Request, Response, status
 
 from src.config import settings
-from src.proxy import proxy_client
 from src.dependencies import CurrentUserDep
+from src.identity import UserIdentity
+from src.logger import get_logger
+from src.proxy import proxy_client
+from src.revocation import issued_through, revocation_list
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
+# Момент отзыва от Auth Service (unix-время; отозваны токены с iat раньше)
+REVOKED_BEFORE_HEADER = "x-revoked-before"
+
+
+def _logout_all_cutoff(response: Response, user: UserIdentity) -> int:
+    """
+    Последний отзываемый iat после logout-all (включительно).
+
+    iat — целые секунды, и вход, выполненный сразу после logout-all, может
+    получить тот же iat, что и момент отзыва по часам gateway. Поэтому без
+    границы от Auth Service (X-Revoked-Before) отзываются токены не новее
+    того, которым вызван logout-all: граница взята по часам Auth Service,
+    и расхождение часов с gateway новый вход не задевает. Токены, выпущенные
+    после вызывающего, отзывает сам Auth Service (вебхук или лента отзывов).
+    """
+    revoked_before = response.headers.get(REVOKED_BEFORE_HEADER)
+    if revoked_before is not None:
+        try:
+            return issued_through(float(revoked_before))
+        except ValueError:
+            logger.warning("revoked_before_header_invalid", value=revoked_before)
+    return math.floor(user.issued_at)
+
 
 @router.get("/google", status_code=status.HTTP_302_FOUND)
 async def google_login(request: Request):
@@ -68,11 +98,19 @@ async def logout_all(request: Request, user: CurrentUserDep):
     """
     Выход со всех устройств (удаление всех refresh токенов пользователя).
     Проксирует запрос в Auth Service: POST /api/v1/auth/logout-all
+
+    После успешного ответа выпущенные ранее access-токены пользователя
+    отзываются и в gateway, не дожидаясь их exp (граница по iat —
+    см. _logout_all_cutoff).
     """
-    return await proxy_client.forward(
+    response = await proxy_client.forward(
         request=request,
         target_base_url=settings.AUTH_SERVICE_URL,
         path="api/v1/auth/logout-all",
         service_name="auth-service",
         extra_headers=user.to_headers(),
     )
+    if response.status_code < 300:
+        revocation_list.revoke_user(user.user_id, _logout_all_cutoff(response, user))
+        logger.info("tokens_revoked", source="logout_all", users=1, tokens=0)
+    return response
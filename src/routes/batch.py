@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Query, Request, status
+from fastapi.exceptions import HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from src.dependencies import BearerCredentialsDep, authenticated_token, decode_jwt
+from src.exceptions import AuthenticationError
+from src.schemas.batch import BatchRequestSchema, BatchResponseSchema
+from src.services.batch import BatchServiceDep
+
+router = APIRouter(prefix="/api/batch", tags=["Batch"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@router.post("", response_model=BatchResponseSchema)
+async def batch(
+    request: Request,
+    body: BatchRequestSchema,
+    service: BatchServiceDep,
+    creds: BearerCredentialsDep,
+    stream: bool = Query(
+        default=False,
+        description="Отдавать результаты в NDJSON по мере готовности",
+    ),
+) -> BatchResponseSchema:
+    """
+    Выполнить несколько запросов к gateway одним HTTP-вызовом.
+
+    Под-запросы выполняются параллельно (не более BATCH_MAX_CONCURRENCY
+    одновременно) через обычные роутеры gateway. Токен из Authorization
+    проверяется один раз и используется всеми под-запросами.
+
+    С stream=true (или Accept: application/x-ndjson) каждый результат
+    отдаётся отдельной строкой NDJSON сразу после завершения под-запроса.
+    """
+    if creds:
+        try:
+            user = decode_jwt(creds.credentials)
+        except AuthenticationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=str(e),
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        authenticated_token.set((creds.credentials, user))
+
+    if stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(
+            service.stream(request, body.requests), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    results = await service.execute(request, body.requests)
+    return JSONResponse(content={"responses": results})
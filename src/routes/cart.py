@@ -1,7 +1,9 @@
 import uuid
 
-from fastapi import APIRouter, Request, status
+from fastapi import APIRouter, Query, Request, Response, status
+from fastapi.responses import JSONResponse
 
+from src.cache import CART_SECTION, user_tag
 from src.config import settings
 from src.dependencies import CurrentUserDep
 from src.proxy import proxy_client
@@ -13,6 +15,7 @@ from src.schemas.cart import (
     ItemSelectionSchema,
     SelectAllSchema,
 )
+from src.services.cart_enrichment import CartEnrichmentServiceDep
 
 router = APIRouter(prefix="/api/cart", tags=["Cart"])
 
@@ -21,19 +24,47 @@ router = APIRouter(prefix="/api/cart", tags=["Cart"])
 async def get_cart(
     request: Request,
     user: CurrentUserDep,
+    enrichment: CartEnrichmentServiceDep,
+    enrich: bool = Query(
+        default=False,
+        description="Добавить актуальные данные товаров (live_product)",
+    ),
 ) -> CartResponseSchema:
     """
     Получить корзину текущего пользователя.
 
     Маппинг: GET /api/cart → Cart Service: GET /api/v1/cart
+
+    С enrich=true к каждому товару добавляется live_product из Product Service
+    (один пакетный запрос к кэшу товаров, недостающие — параллельно).
     """
-    return await proxy_client.forward(
-        request=request,
+    if not enrich:
+        return await proxy_client.forward(
+            request=request,
+            target_base_url=settings.CART_SERVICE_URL,
+            path="api/v1/cart",
+            service_name="cart-service",
+            extra_headers=user.to_headers(),
+            private_cache_user=user.user_id,
+            cache_tags=(user_tag(user.user_id, CART_SECTION),),
+        )
+
+    response = await proxy_client.fetch(
+        method="GET",
         target_base_url=settings.CART_SERVICE_URL,
         path="api/v1/cart",
         service_name="cart-service",
-        extra_headers=user.to_headers(),
+        headers=user.to_headers(),
+        private_cache_user=user.user_id,
+        cache_tags=(user_tag(user.user_id, CART_SECTION),),
     )
+    if response.status_code != status.HTTP_200_OK:
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type"),
+        )
+    return JSONResponse(content=await enrichment.enrich(response.json()))
 
 
 @router.post(
@@ -55,6 +86,7 @@ async def add_cart_item(
         path="api/v1/cart/items",
         service_name="cart-service",
         extra_headers=user.to_headers(),
+        invalidates=(user_tag(user.user_id, CART_SECTION),),
     )
 
 
@@ -80,6 +112,7 @@ async def update_cart_item(
         path=f"api/v1/cart/items/{item_id}",
         service_name="cart-service",
         extra_headers=user.to_headers(),
+        invalidates=(user_tag(user.user_id, CART_SECTION),),
     )
 
 
@@ -100,6 +133,7 @@ async def delete_cart_item(
         path=f"api/v1/cart/items/{item_id}",
         service_name="cart-service",
         extra_headers=user.to_headers(),
+        invalidates=(user_tag(user.user_id, CART_SECTION),),
     )
 
 
@@ -119,6 +153,7 @@ async def clear_cart(
         path="api/v1/cart",
         service_name="cart-service",
         extra_headers=user.to_headers(),
+        invalidates=(user_tag(user.user_id, CART_SECTION),),
     )
 
 
@@ -144,6 +179,7 @@ async def change_item_selection(
         path=f"api/v1/cart/items/{item_id}/select",
         service_name="cart-service",
         extra_headers=user.to_headers(),
+        invalidates=(user_tag(user.user_id, CART_SECTION),),
     )
 
 
@@ -166,4 +202,5 @@ async def select_all(
         path="api/v1/cart/select-all",
         service_name="cart-service",
         extra_headers=user.to_headers(),
+        invalidates=(user_tag(user.user_id, CART_SECTION),),
     )
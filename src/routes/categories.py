@@ -1,5 +1,11 @@
 from fastapi import APIRouter, Request
 
+from src.cache import (
+    ATTRIBUTES_TAG,
+    CATEGORIES_TAG,
+    category_attributes_tag,
+    category_tag,
+)
 from src.config import settings
 from src.dependencies import AdminUserDep
 from src.proxy import proxy_client
@@ -24,6 +30,8 @@ async def get_categories_list(request: Request) -> list[CategoryResponseSchema]:
         target_base_url=settings.PRODUCT_SERVICE_URL,
         path="api/v1/categories",
         service_name="product-service",
+        cacheable=True,
+        cache_tags=(CATEGORIES_TAG,),
     )
 
 
@@ -39,6 +47,8 @@ async def get_category(category_id: int, request: Request) -> CategoryResponseSc
         target_base_url=settings.PRODUCT_SERVICE_URL,
         path=f"api/v1/categories/{category_id}",
         service_name="product-service",
+        cacheable=True,
+        cache_tags=(category_tag(category_id),),
     )
 
 
@@ -55,6 +65,8 @@ async def get_category_attributes(category_id: int, request: Request):
         target_base_url=settings.PRODUCT_SERVICE_URL,
         path=f"api/v1/categories/{category_id}/attributes",
         service_name="product-service",
+        cacheable=True,
+        cache_tags=(category_attributes_tag(category_id), ATTRIBUTES_TAG),
     )
 
 
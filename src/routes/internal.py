@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+
+from src.cache_events import invalidate
+from src.dependencies import verify_internal_token
+from src.revocation import revocation_list
+from src.schemas.internal import (
+    CacheInvalidationRequestSchema,
+    CacheInvalidationResponseSchema,
+    TokenRevocationRequestSchema,
+    TokenRevocationResponseSchema,
+)
+
+router = APIRouter(
+    prefix="/api/internal",
+    tags=["Internal"],
+    dependencies=[Depends(verify_internal_token)],
+    include_in_schema=False,
+)
+
+
+@router.post("/cache/invalidate", response_model=CacheInvalidationResponseSchema)
+async def invalidate_cache(
+    body: CacheInvalidationRequestSchema,
+) -> CacheInvalidationResponseSchema:
+    """
+    Инвалидация кэша каталога по событиям Product Service (webhook).
+
+    Доступно только внутренним сервисам: заголовок X-Internal-Token
+    должен совпадать с INTERNAL_API_TOKEN.
+    """
+    tags, evicted = invalidate(body.events, source="webhook")
+    return CacheInvalidationResponseSchema(tags=sorted(tags), evicted=evicted)
+
+
+@router.post("/auth/revoke", response_model=TokenRevocationResponseSchema)
+async def revoke_tokens(
+    body: TokenRevocationRequestSchema,
+) -> TokenRevocationResponseSchema:
+    """
+    Отзыв access-токенов по событиям Auth Service (logout-all, блокировка).
+
+    Токены пользователя с iat раньше issued_before и токены с указанными jti
+    отклоняются gateway с 401 до истечения их срока действия.
+    """
+    revocation_list.apply(body, source="webhook")
+    return TokenRevocationResponseSchema(
+        users=revocation_list.users, tokens=revocation_list.tokens
+    )
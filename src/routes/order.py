@@ -3,6 +3,7 @@ from fastapi import APIRouter, Request, status, Query
 
 from src.dependencies import CurrentUserDep
 from src.proxy import proxy_client
+from src.cache import CART_SECTION, ORDERS_SECTION, user_tag
 from src.config import settings
 
 from src.schemas.order import (
@@ -29,18 +30,32 @@ router = APIRouter(prefix="/orders")
             "description": "Заказ с таким ключом уже (или только что) был создан",
             "model": CheckoutResponseSchema,
         },
+        status.HTTP_422_UNPROCESSABLE_CONTENT: {
+            "description": "Ключ уже использован с другим запросом"
+        },
     },
 )
 async def checkout(
     request: Request,
     user: CurrentUserDep,
 ) -> CheckoutResponseSchema:
+    """
+    Оформление заказа.
+
+    Повторы с тем же заголовком Idempotency-Key не доходят до Order Service:
+    они получают ответ первого запроса (Idempotent-Replayed: true).
+    """
     return await proxy_client.forward(
         request=request,
         target_base_url=settings.ORDER_SERVICE_URL,
         path="api/v1/orders/checkout",
         service_name="order-service",
         extra_headers=user.to_headers(),
+        invalidates=(
+            user_tag(user.user_id, CART_SECTION),
+            user_tag(user.user_id, ORDERS_SECTION),
+        ),
+        idempotency_user=user.user_id,
     )
 
 
@@ -56,6 +71,9 @@ async def checkout(
             "description": "Некорректный статус заказа для оплаты (отменен или уже оплачен)"
         },
         status.HTTP_409_CONFLICT: {"description": "Заказ еще в процессе создания"},
+        status.HTTP_422_UNPROCESSABLE_CONTENT: {
+            "description": "Ключ уже использован с другим запросом"
+        },
     },
 )
 async def pay(
@@ -63,13 +81,22 @@ async def pay(
     order_id: uuid.UUID,
     user: CurrentUserDep,
 ) -> PayResponseSchema:
-    """Оплата заказа и очистка корзины."""
+    """
+    Оплата заказа и очистка корзины.
+
+    Повторы с тем же Idempotency-Key получают ответ первого запроса.
+    """
     return await proxy_client.forward(
         request=request,
         target_base_url=settings.ORDER_SERVICE_URL,
         path=f"api/v1/orders/{order_id}/pay",
         service_name="order-service",
         extra_headers=user.to_headers(),
+        invalidates=(
+            user_tag(user.user_id, CART_SECTION),
+            user_tag(user.user_id, ORDERS_SECTION),
+        ),
+        idempotency_user=user.user_id,
     )
 
 
@@ -101,6 +128,8 @@ async def get_orders(
         path="api/v1/orders",
         service_name="order-service",
         extra_headers=user.to_headers(),
+        private_cache_user=user.user_id,
+        cache_tags=(user_tag(user.user_id, ORDERS_SECTION),),
     )
 
 
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+
+from src.dependencies import OptionalUserDep
+from src.schemas.pages import ProductPageResponseSchema
+from src.services.product_page import ProductPageServiceDep
+
+router = APIRouter(prefix="/api/pages", tags=["Pages"])
+
+
+@router.get("/products/{product_id}", response_model=ProductPageResponseSchema)
+async def get_product_page(
+    product_id: int,
+    user: OptionalUserDep,
+    service: ProductPageServiceDep,
+) -> ProductPageResponseSchema:
+    """
+    Данные для страницы товара одним запросом.
+
+    Параллельно запрашивает:
+    - Product Service: GET /api/v1/products/{product_id}
+    - Product Service: GET /api/v1/categories/{category_id}/attributes
+    - Cart Service: GET /api/v1/cart (только для авторизованных пользователей)
+
+    Атрибуты и корзина необязательны: если часть не получена, поле равно null,
+    а причина указывается в errors.
+    """
+    return await service.get_product_page(product_id, user)
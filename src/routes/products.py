@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request
 
+from src.cache import PRODUCTS_TAG, product_tag
 from src.config import settings
 from src.dependencies import AdminUserDep
 from src.proxy import proxy_client
@@ -26,6 +27,8 @@ async def get_products_list(request: Request) -> ProductListResponse:
         target_base_url=settings.PRODUCT_SERVICE_URL,
         path="api/v1/products",
         service_name="product-service",
+        cacheable=True,
+        cache_tags=(PRODUCTS_TAG,),
     )
 
 
@@ -43,6 +46,8 @@ async def get_product_by_id(
         target_base_url=settings.PRODUCT_SERVICE_URL,
         path=f"api/v1/products/{product_id}",
         service_name="product-service",
+        cacheable=True,
+        cache_tags=(product_tag(product_id),),
     )
 
 
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request
 
+from src.cache import PROFILE_SECTION, user_tag
 from src.config import settings
 from src.dependencies import CurrentUserDep
 from src.proxy import proxy_client
@@ -24,6 +25,8 @@ async def get_current_user_profile(
         path="api/v1/users/me",
         service_name="auth-service",
         extra_headers=user.to_headers(),
+        private_cache_user=user.user_id,
+        cache_tags=(user_tag(user.user_id, PROFILE_SECTION),),
     )
 
 
@@ -44,4 +47,5 @@ async def update_current_user_profile(
         path="api/v1/users/me",
         service_name="auth-service",
         extra_headers=user.to_headers(),
+        invalidates=(user_tag(user.user_id, PROFILE_SECTION),),
     )
@@ -0,0 +1,72 @@
+from pydantic import BaseModel, Field
+
+
+class LoopLagResponseSchema(BaseModel):
+    """Гистограмма задержки event loop с момента запуска gateway."""
+
+    buckets: dict[str, int] = Field(
+        ...,
+        description="Кумулятивное число измерений с задержкой не больше границы (мс)",
+        examples=[{"1": 950, "5": 990, "100": 999, "+Inf": 1000}],
+    )
+    count: int = Field(..., description="Число измерений")
+    sum_ms: float = Field(..., description="Суммарная задержка (мс)")
+    max_ms: float = Field(..., description="Максимальная задержка (мс)")
+    blocked_count: int = Field(..., description="Сколько раз задержка превысила порог")
+    threshold_ms: float = Field(..., description="Порог блокировки (мс)")
+
+
+class ResponseCacheStatsSchema(BaseModel):
+    """Состояние кэша ответов каталога и счётчики с момента запуска."""
+
+    entries: int = Field(..., description="Число записей (вместе с устаревшими)")
+    max_entries: int = Field(..., description="Лимит числа записей")
+    bytes: int = Field(..., description="Объём записей вместе со сжатыми вариантами")
+    max_bytes: int = Field(..., description="Лимит объёма (байт)")
+    tags: int = Field(..., description="Число тегов в индексе")
+    hits: int = Field(..., description="Ответов из кэша")
+    misses: int = Field(..., description="Промахов (нет записи или она истекла)")
+    stale_hits: int = Field(
+        ..., description="Устаревших ответов при недоступности сервиса"
+    )
+    evictions: int = Field(..., description="Записей, вытесненных по лимитам")
+    purged: int = Field(..., description="Записей, удалённых по событиям каталога")
+
+
+class QueueWaitHistogramSchema(BaseModel):
+    """Гистограмма ожидания слота в очереди к сервисам."""
+
+    buckets: dict[str, int] = Field(
+        ...,
+        description="Кумулятивное число ожиданий не дольше границы (мс)",
+        examples=[{"1": 40, "5": 90, "100": 99, "+Inf": 100}],
+    )
+    count: int = Field(..., description="Число ожиданий")
+    sum_ms: float = Field(..., description="Суммарное ожидание (мс)")
+    max_ms: float = Field(..., description="Максимальное ожидание (мс)")
+
+
+class AdmissionClassStatsSchema(BaseModel):
+    """Класс запросов в очереди к сервисам: счётчики с момента запуска."""
+
+    weight: float = Field(..., description="Вес класса (доля слотов при конкуренции)")
+    waiting: int = Field(..., description="Запросов в очереди сейчас")
+    admitted: int = Field(..., description="Запросов, получивших слот")
+    queued: int = Field(..., description="Из них ждали в очереди")
+    abandoned: int = Field(
+        ..., description="Ушли из очереди без слота (дедлайн, отключение клиента)"
+    )
+    wait: QueueWaitHistogramSchema
+
+
+class AdmissionStatsSchema(BaseModel):
+    """Состояние очереди запросов к сервисам."""
+
+    slots: int = Field(
+        ..., description="Лимит одновременных запросов (0 — без очереди)"
+    )
+    in_use: int = Field(..., description="Занятых слотов")
+    waiting: int = Field(..., description="Запросов в очереди")
+    classes: dict[str, AdmissionClassStatsSchema] = Field(
+        ..., description="По классам: critical, authenticated, anonymous"
+    )
@@ -13,6 +13,7 @@ class TokenPayloadSchema(BaseModel):
     type: str = Field(..., description="Token type (access/refresh)")
     iat: datetime = Field(..., description="Issued at")
     exp: datetime = Field(..., description="Expiration time")
+    jti: str | None = Field(None, description="Token ID")
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,54 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+from src.config import settings
+
+
+class BatchSubRequestSchema(BaseModel):
+    """Один под-запрос внутри batch."""
+
+    id: str | None = Field(
+        None, description="Идентификатор под-запроса для сопоставления с ответом"
+    )
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = Field(
+        ..., description="HTTP-метод", examples=["GET"]
+    )
+    path: str = Field(
+        ...,
+        pattern=r"^/api/",
+        description="Путь эндпоинта gateway (с query-строкой)",
+        examples=["/api/products/1"],
+    )
+    body: Any | None = Field(None, description="JSON-тело запроса")
+
+
+class BatchRequestSchema(BaseModel):
+    """Тело запроса POST /api/batch."""
+
+    requests: list[BatchSubRequestSchema] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_REQUESTS,
+        description="Список под-запросов",
+    )
+
+
+class BatchSubResponseSchema(BaseModel):
+    """Результат одного под-запроса."""
+
+    id: str | None = Field(None, description="Идентификатор под-запроса")
+    index: int = Field(..., description="Позиция под-запроса в batch")
+    status: int = Field(..., description="HTTP-статус ответа", examples=[200])
+    headers: dict[str, str] = Field(
+        default_factory=dict, description="Заголовки ответа"
+    )
+    body: Any | None = Field(None, description="Тело ответа (JSON или текст)")
+
+
+class BatchResponseSchema(BaseModel):
+    """Ответ POST /api/batch (в порядке под-запросов)."""
+
+    responses: list[BatchSubResponseSchema] = Field(
+        ..., description="Результаты под-запросов"
+    )
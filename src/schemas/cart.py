@@ -28,6 +28,15 @@ class SelectAllSchema(BaseModel):
     )
 
 
+class LiveProductSchema(BaseModel):
+    """Актуальные данные товара из Product Service."""
+
+    title: str = Field(..., description="Текущее название товара")
+    price: int = Field(..., description="Текущая цена в копейках")
+    stock: int = Field(..., description="Количество товара в наличии")
+    status: str = Field(..., description="Статус товара (active, archived, draft)")
+
+
 class CartItemResponseSchema(BaseModel):
     """Ответ с данными одного элемента корзины."""
 
@@ -54,6 +63,11 @@ class CartItemResponseSchema(BaseModel):
         ..., description="True если товар выбран для оформления заказа"
     )
 
+    live_product: LiveProductSchema | None = Field(
+        None,
+        description="Актуальные данные товара — только для GET /api/cart?enrich=true",
+    )
+
     created_at: datetime = Field(..., description="Дата добавления в корзину")
     updated_at: datetime = Field(..., description="Дата последнего изменения")
 
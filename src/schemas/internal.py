@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class CatalogEventSchema(BaseModel):
+    """Событие изменения данных каталога от Product Service."""
+
+    resource: Literal["product", "category", "attribute"] = Field(
+        ..., description="Тип изменённого ресурса", examples=["product"]
+    )
+    id: int = Field(..., description="ID ресурса", examples=[42])
+    action: Literal["created", "updated", "deleted"] | None = Field(
+        None, description="Что произошло с ресурсом", examples=["updated"]
+    )
+
+
+class CacheInvalidationRequestSchema(BaseModel):
+    """Пакет событий каталога для инвалидации кэша gateway."""
+
+    events: list[CatalogEventSchema] = Field(..., min_length=1, max_length=1000)
+
+
+class CacheInvalidationResponseSchema(BaseModel):
+    """Результат инвалидации кэша."""
+
+    tags: list[str] = Field(
+        ...,
+        description="Теги, по которым удалены записи",
+        examples=[["product:42", "products"]],
+    )
+    evicted: int = Field(..., description="Сколько записей кэша удалено")
+
+
+class UserRevocationSchema(BaseModel):
+    """Отзыв всех access-токенов пользователя, выпущенных до момента."""
+
+    user_id: UUID = Field(..., description="ID пользователя")
+    issued_before: datetime = Field(
+        ..., description="Токены с iat раньше этого момента отозваны"
+    )
+
+
+class TokenRevocationSchema(BaseModel):
+    """Отзыв одного access-токена по jti."""
+
+    jti: str = Field(..., min_length=1, max_length=128, description="ID токена (jti)")
+    expires_at: datetime = Field(
+        ..., description="Срок действия токена (exp): после него запись не нужна"
+    )
+
+
+class TokenRevocationRequestSchema(BaseModel):
+    """Пакет отзывов токенов от Auth Service."""
+
+    users: list[UserRevocationSchema] = Field(default_factory=list, max_length=10000)
+    tokens: list[TokenRevocationSchema] = Field(default_factory=list, max_length=10000)
+
+
+class TokenRevocationFeedSchema(TokenRevocationRequestSchema):
+    """Ответ Auth Service на опрос списка отзывов."""
+
+    cursor: str | None = Field(
+        None, description="Позиция в ленте отзывов для следующего опроса"
+    )
+
+
+class TokenRevocationResponseSchema(BaseModel):
+    """Размер списка отзывов после применения пакета."""
+
+    users: int = Field(..., description="Пользователей с отозванными токенами")
+    tokens: int = Field(..., description="Отозванных токенов (jti)")
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+
+from src.schemas.attributes import AttributeResponseSchema
+from src.schemas.cart import CartResponseSchema
+from src.schemas.products import ProductDetailResponseSchema
+
+
+class ProductPageResponseSchema(BaseModel):
+    """Агрегированные данные для страницы товара."""
+
+    product: ProductDetailResponseSchema = Field(..., description="Данные товара")
+    attributes: list[AttributeResponseSchema] | None = Field(
+        None, description="Атрибуты категории товара (null, если не получены)"
+    )
+    cart: CartResponseSchema | None = Field(
+        None,
+        description="Корзина текущего пользователя (null для анонимных "
+        "пользователей или если не получена)",
+    )
+    errors: dict[str, str] = Field(
+        default_factory=dict,
+        description="Части ответа, которые не удалось получить: {часть: причина}",
+        examples=[{"cart": "timeout"}],
+    )
@@ -0,0 +1,208 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+from urllib.parse import urlsplit
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.middleware.asyncexitstack import AsyncExitStackMiddleware
+from starlette.middleware.exceptions import ExceptionMiddleware
+
+from src.admission import (
+    ANONYMOUS,
+    current_priority,
+    mark_authenticated,
+    start_request_priority,
+)
+from src.config import settings
+from src.logger import get_logger
+from src.schemas.batch import BatchSubRequestSchema
+
+logger = get_logger(__name__)
+
+BATCH_PATH = "/api/batch"
+
+# Заголовки родительского запроса, передаваемые под-запросам
+FORWARDED_HEADERS = {"authorization", "x-request-id", "user-agent"}
+# Заголовки под-ответа, возвращаемые клиенту
+RESPONSE_HEADERS = {"content-type", "etag", "location", "retry-after"}
+
+
+class BatchService:
+    """Выполнение нескольких под-запросов через роутеры gateway в одном HTTP-вызове."""
+
+    def __init__(self, app: FastAPI):
+        """
+        Args:
+            app: Приложение, роутеры которого обрабатывают под-запросы.
+        """
+        self.app = app
+        # Под-запросы идут напрямую в роутер: CORS и логирование запроса уже
+        # выполнены для самого batch, а обработчики исключений сохраняются
+        self._handler = ExceptionMiddleware(
+            AsyncExitStackMiddleware(app.router),
+            handlers=dict(app.exception_handlers),
+        )
+
+    async def execute(
+        self, parent: Request, requests: list[BatchSubRequestSchema]
+    ) -> list[dict[str, Any]]:
+        """Все под-запросы параллельно; результаты в исходном порядке."""
+        results = await asyncio.gather(*self._dispatch_all(parent, requests))
+        logger.info("batch_request_finished", sub_requests=len(results))
+        return list(results)
+
+    async def stream(
+        self, parent: Request, requests: list[BatchSubRequestSchema]
+    ) -> AsyncIterator[bytes]:
+        """Результаты в формате NDJSON по мере завершения под-запросов."""
+        for future in asyncio.as_completed(self._dispatch_all(parent, requests)):
+            result = await future
+            yield json.dumps(result, ensure_ascii=False).encode() + b"\n"
+        logger.info("batch_request_finished", sub_requests=len(requests))
+
+    def _dispatch_all(
+        self, parent: Request, requests: list[BatchSubRequestSchema]
+    ) -> list[asyncio.Task]:
+        semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+        async def dispatch(index: int, sub_request: BatchSubRequestSchema):
+            async with semaphore:
+                return await self._dispatch(parent, index, sub_request)
+
+        return [
+            asyncio.create_task(dispatch(index, sub_request))
+            for index, sub_request in enumerate(requests)
+        ]
+
+    async def _dispatch(
+        self, parent: Request, index: int, sub_request: BatchSubRequestSchema
+    ) -> dict[str, Any]:
+        """Выполнение одного под-запроса как ASGI-вызова роутера."""
+        url = urlsplit(sub_request.path)
+        if url.path.rstrip("/") == BATCH_PATH:
+            return self._result(
+                index,
+                sub_request,
+                400,
+                {"content-type": "application/json"},
+                {"detail": "Nested batch requests are not allowed"},
+            )
+
+        # Класс в очереди к сервисам — по пути самого под-запроса (checkout
+        # внутри batch — critical); токен, проверенный batch-запросом,
+        # повышает под-запрос до authenticated. Задача выполняется в копии
+        # контекста: класс родителя и соседних под-запросов не меняется
+        authenticated = current_priority() != ANONYMOUS
+        start_request_priority(sub_request.method, url.path)
+        if authenticated:
+            mark_authenticated()
+
+        headers = [
+            (key, value)
+            for key, value in parent.headers.raw
+            if key.decode("latin-1").lower() in FORWARDED_HEADERS
+        ]
+        body = b""
+        if sub_request.body is not None:
+            body = json.dumps(sub_request.body).encode()
+            headers.append((b"content-type", b"application/json"))
+            headers.append((b"content-length", str(len(body)).encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": sub_request.method,
+            "scheme": parent.url.scheme,
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": parent.scope.get("client"),
+            "server": parent.scope.get("server"),
+            "app": self.app,
+            "state": {},
+        }
+
+        body_sent = False
+
+        async def receive() -> dict[str, Any]:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        status_code = 500
+        response_headers: dict[str, str] = {}
+        chunks: list[bytes] = []
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for key, value in message.get("headers", []):
+                    name = key.decode("latin-1").lower()
+                    if name in RESPONSE_HEADERS:
+                        response_headers[name] = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self._handler(scope, receive, send)
+
+        content = b"".join(chunks)
+        return self._result(
+            index,
+            sub_request,
+            status_code,
+            response_headers,
+            self._parse_body(content, response_headers.get("content-type")),
+        )
+
+    @staticmethod
+    def _parse_body(content: bytes, content_type: str | None) -> Any | None:
+        if not content:
+            return None
+        if content_type and "json" in content_type:
+            try:
+                return json.loads(content)
+            except ValueError:
+                pass
+        return content.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _result(
+        index: int,
+        sub_request: BatchSubRequestSchema,
+        status_code: int,
+        headers: dict[str, str],
+        body: Any | None,
+    ) -> dict[str, Any]:
+        return {
+            "id": sub_request.id,
+            "index": index,
+            "status": status_code,
+            "headers": headers,
+            "body": body,
+        }
+
+
+def get_batch_service(request: Request) -> BatchService:
+    """
+    Провайдер зависимости для BatchService.
+
+    Экземпляр создаётся один раз на приложение и хранится в app.state.
+
+    Returns:
+        BatchService: Экземпляр BatchService для текущего приложения.
+    """
+    service = getattr(request.app.state, "batch_service", None)
+    if service is None:
+        service = BatchService(request.app)
+        request.app.state.batch_service = service
+    return service
+
+
+BatchServiceDep = Annotated[BatchService, Depends(get_batch_service)]
@@ -0,0 +1,172 @@
+import asyncio
+import json
+from functools import lru_cache
+from typing import Annotated, Any
+
+import httpx
+from fastapi import Depends
+
+from src.cache import product_tag, response_cache
+from src.config import settings
+from src.exceptions import GatewayTimeoutError, ServiceUnavailableError
+from src.logger import get_logger
+from src.proxy import ProxyClient, build_target_url, proxy_client
+
+logger = get_logger(__name__)
+
+LIVE_PRODUCT_FIELDS = ("title", "price", "stock", "status")
+
+
+def _product_path(product_id: int) -> str:
+    return f"api/v1/products/{product_id}"
+
+
+class CartEnrichmentService:
+    """Обогащение корзины актуальными данными товаров из Product Service."""
+
+    def __init__(self, proxy: ProxyClient):
+        """
+        Args:
+            proxy: Общий ProxyClient для запросов к внутренним сервисам.
+        """
+        self.proxy = proxy
+
+    async def enrich(self, cart: dict[str, Any]) -> dict[str, Any]:
+        """
+        Добавление live_product к каждому элементу корзины.
+
+        ID товаров дедуплицируются и ищутся в кэше ответов одним пакетом;
+        отсутствующие в кэше товары запрашиваются параллельно (не более
+        CART_ENRICHMENT_MAX_CONCURRENCY запросов одновременно).
+
+        Флаги out_of_stock и product_deleted обновляются по актуальным
+        данным. Если товар получить не удалось, live_product равен null,
+        а флаги остаются как в ответе Cart Service.
+
+        Args:
+            cart: Ответ Cart Service (схема CartResponseSchema).
+
+        Returns:
+            Та же корзина с заполненными live_product.
+        """
+        items = cart.get("items", [])
+        product_ids = list({item["product_id"] for item in items})
+        products = await self._get_products(product_ids)
+
+        for item in items:
+            status_code, product = products.get(item["product_id"], (None, None))
+            if status_code == 404:
+                item["product_deleted"] = True
+                item["live_product"] = None
+            elif product is not None:
+                live_product = {key: product.get(key) for key in LIVE_PRODUCT_FIELDS}
+                item["live_product"] = live_product
+                item["out_of_stock"] = (live_product["stock"] or 0) <= 0
+            else:
+                item["live_product"] = None
+        return cart
+
+    async def _get_products(
+        self, product_ids: list[int]
+    ) -> dict[int, tuple[int, dict[str, Any] | None]]:
+        """
+        Товары по ID: сначала пакетно из кэша, затем недостающие из сервиса.
+
+        Returns:
+            {product_id: (status_code, product | None)}; товары, которые не
+            удалось получить, в результат не попадают.
+        """
+        keys = {
+            product_id: build_target_url(
+                settings.PRODUCT_SERVICE_URL, _product_path(product_id)
+            )
+            for product_id in product_ids
+        }
+        cached = response_cache.get_many(list(keys.values()))
+
+        products: dict[int, tuple[int, dict[str, Any] | None]] = {}
+        missing: list[int] = []
+        for product_id, key in keys.items():
+            entry = cached.get(key)
+            if entry is None:
+                missing.append(product_id)
+            else:
+                products[product_id] = (entry.status_code, json.loads(entry.content))
+
+        if missing:
+            semaphore = asyncio.Semaphore(settings.CART_ENRICHMENT_MAX_CONCURRENCY)
+
+            async def fetch_product(product_id: int) -> httpx.Response:
+                async with semaphore:
+                    return await self.proxy.fetch(
+                        method="GET",
+                        target_base_url=settings.PRODUCT_SERVICE_URL,
+                        path=_product_path(product_id),
+                        service_name="product-service",
+                        cacheable=True,
+                        cache_tags=(product_tag(product_id),),
+                    )
+
+            tasks = {
+                asyncio.create_task(fetch_product(product_id)): product_id
+                for product_id in missing
+            }
+            try:
+                # Таймаут на все запросы, но готовые ответы сохраняются:
+                # без live_product остаются только опоздавшие товары
+                done, pending = await asyncio.wait(
+                    tasks, timeout=settings.AGGREGATION_PART_TIMEOUT
+                )
+            finally:
+                for task in tasks:
+                    task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+                logger.warning(
+                    "cart_enrichment_timeout",
+                    product_ids=[tasks[task] for task in pending],
+                )
+
+            for task, product_id in tasks.items():
+                if task not in done:
+                    continue
+                error = task.exception()
+                if error is None:
+                    response = task.result()
+                    product = response.json() if response.status_code == 200 else None
+                    products[product_id] = (response.status_code, product)
+                elif isinstance(
+                    error,
+                    (GatewayTimeoutError, ServiceUnavailableError, httpx.HTTPError),
+                ):
+                    logger.warning(
+                        "cart_enrichment_product_failed",
+                        product_id=product_id,
+                        error=str(error),
+                    )
+                else:
+                    raise error
+
+        logger.debug(
+            "cart_enrichment_products_resolved",
+            requested=len(product_ids),
+            cache_hits=len(cached),
+            fetched=len(missing),
+        )
+        return products
+
+
+@lru_cache
+def get_cart_enrichment_service() -> CartEnrichmentService:
+    """
+    Провайдер зависимости для CartEnrichmentService.
+
+    Returns:
+        CartEnrichmentService: Кэшированный экземпляр CartEnrichmentService.
+    """
+    return CartEnrichmentService(proxy=proxy_client)
+
+
+CartEnrichmentServiceDep = Annotated[
+    CartEnrichmentService, Depends(get_cart_enrichment_service)
+]
@@ -36,12 +36,7 @@ class HealthService:
             http_client: Экземпляр httpx.AsyncClient из proxy_client.
         """
         self.client = http_client
-        self.services = {
-            "auth-service": settings.AUTH_SERVICE_URL,
-            "product-service": settings.PRODUCT_SERVICE_URL,
-            "cart-service": settings.CART_SERVICE_URL,
-            "order-service": settings.ORDER_SERVICE_URL,
-        }
+        self.services = settings.upstream_services
 
     async def check_service(self, name: str, base_url: str) -> ServiceHealth:
         """
@@ -0,0 +1,176 @@
+import asyncio
+from collections.abc import Awaitable
+from functools import lru_cache
+from typing import Annotated, Any
+
+import httpx
+from fastapi import Depends, Response
+from fastapi.responses import JSONResponse
+
+from src.cache import ATTRIBUTES_TAG, category_attributes_tag, product_tag
+from src.config import settings
+from src.exceptions import GatewayTimeoutError, ServiceUnavailableError
+from src.identity import UserIdentity
+from src.logger import get_logger
+from src.proxy import ProxyClient, proxy_client
+
+logger = get_logger(__name__)
+
+
+class ProductPageService:
+    """Агрегация данных для страницы товара (Backend-for-Frontend)."""
+
+    def __init__(self, proxy: ProxyClient):
+        """
+        Args:
+            proxy: Общий ProxyClient для запросов к внутренним сервисам.
+        """
+        self.proxy = proxy
+
+    async def get_product_page(
+        self, product_id: int, user: UserIdentity | None
+    ) -> Response:
+        """
+        Товар, атрибуты его категории и корзина пользователя одним ответом.
+
+        Товар — обязательная часть: если он не получен, ошибка возвращается
+        клиенту как есть. Атрибуты и корзина — необязательные: при таймауте
+        или ошибке (для атрибутов — и если у товара нет category_id)
+        соответствующее поле равно null, а причина попадает в errors.
+
+        Args:
+            product_id: ID товара.
+            user: Данные пользователя, если передан валидный токен.
+
+        Returns:
+            Response: JSON-ответ со схемой ProductPageResponseSchema или
+                ответ Product Service с ошибкой.
+        """
+        errors: dict[str, str] = {}
+
+        # Корзина не зависит от товара — запрашивается сразу
+        cart_task: asyncio.Task | None = None
+        if user is not None:
+            cart_task = asyncio.create_task(
+                self._get_part("cart", self._fetch_cart(user), errors)
+            )
+
+        try:
+            try:
+                product_response = await asyncio.wait_for(
+                    self._fetch_product(product_id), settings.AGGREGATION_PART_TIMEOUT
+                )
+            except TimeoutError as exc:
+                raise GatewayTimeoutError(
+                    "Timeout while requesting product-service"
+                ) from exc
+
+            if product_response.status_code != 200:
+                return Response(
+                    content=product_response.content,
+                    status_code=product_response.status_code,
+                    media_type=product_response.headers.get("content-type"),
+                )
+
+            product = product_response.json()
+            # Атрибуты зависят от category_id товара и идут параллельно с корзиной
+            category_id = product.get("category_id")
+            if category_id is None:
+                errors["attributes"] = "no_category"
+                attributes = None
+            else:
+                attributes = await self._get_part(
+                    "attributes", self._fetch_attributes(category_id), errors
+                )
+            cart = await cart_task if cart_task is not None else None
+        finally:
+            # Любой выход до ответа корзины (ошибка товара, исключение, отмена)
+            # не оставляет её запрос висеть после ответа клиенту
+            if cart_task is not None and not cart_task.done():
+                cart_task.cancel()
+                await asyncio.wait([cart_task])
+
+        if errors:
+            logger.warning(
+                "product_page_partial_response", product_id=product_id, errors=errors
+            )
+
+        return JSONResponse(
+            content={
+                "product": product,
+                "attributes": attributes,
+                "cart": cart,
+                "errors": errors,
+            }
+        )
+
+    async def _get_part(
+        self,
+        name: str,
+        request: Awaitable[httpx.Response],
+        errors: dict[str, str],
+    ) -> Any | None:
+        """
+        Необязательная часть ответа с собственным таймаутом.
+
+        Returns:
+            Распарсенный JSON или None (причина записывается в errors).
+        """
+        try:
+            response = await asyncio.wait_for(
+                request, settings.AGGREGATION_PART_TIMEOUT
+            )
+        except (TimeoutError, GatewayTimeoutError):
+            errors[name] = "timeout"
+            return None
+        except (ServiceUnavailableError, httpx.HTTPError):
+            errors[name] = "unavailable"
+            return None
+
+        if response.status_code != 200:
+            errors[name] = f"status_{response.status_code}"
+            return None
+        return response.json()
+
+    async def _fetch_product(self, product_id: int) -> httpx.Response:
+        return await self.proxy.fetch(
+            method="GET",
+            target_base_url=settings.PRODUCT_SERVICE_URL,
+            path=f"api/v1/products/{product_id}",
+            service_name="product-service",
+            cacheable=True,
+            cache_tags=(product_tag(product_id),),
+        )
+
+    async def _fetch_attributes(self, category_id: int) -> httpx.Response:
+        return await self.proxy.fetch(
+            method="GET",
+            target_base_url=settings.PRODUCT_SERVICE_URL,
+            path=f"api/v1/categories/{category_id}/attributes",
+            service_name="product-service",
+            cacheable=True,
+            cache_tags=(category_attributes_tag(category_id), ATTRIBUTES_TAG),
+        )
+
+    async def _fetch_cart(self, user: UserIdentity) -> httpx.Response:
+        return await self.proxy.fetch(
+            method="GET",
+            target_base_url=settings.CART_SERVICE_URL,
+            path="api/v1/cart",
+            service_name="cart-service",
+            headers=user.to_headers(),
+        )
+
+
+@lru_cache
+def get_product_page_service() -> ProductPageService:
+    """
+    Провайдер зависимости для ProductPageService.
+
+    Returns:
+        ProductPageService: Кэшированный экземпляр ProductPageService.
+    """
+    return ProductPageService(proxy=proxy_client)
+
+
+ProductPageServiceDep = Annotated[ProductPageService, Depends(get_product_page_service)]
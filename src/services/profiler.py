@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from types import CodeType
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+
+
+class SamplingProfiler:
+    """
+    Сэмплирующий профилировщик потока event loop.
+
+    Отдельный поток раз в interval снимает стек потока event loop
+    (sys._current_frames) и считает одинаковые стеки. Код gateway при этом
+    не инструментируется, поэтому профилировать можно прямо в production.
+    """
+
+    def __init__(self):
+        self.running = False
+        # Подписи фреймов кэшируются по code-объекту
+        self._labels: dict[CodeType, str] = {}
+        # Пути модулей сокращаются до пути относительно sys.path
+        self._prefixes = sorted(
+            {str(ROOT_DIR), *(path for path in sys.path if path)},
+            key=len,
+            reverse=True,
+        )
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for prefix in self._prefixes:
+                if filename.startswith(prefix):
+                    filename = filename[len(prefix) :].lstrip("/")
+                    break
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(
+        self,
+        thread_id: int,
+        interval: float,
+        stop: threading.Event,
+        stacks: Counter[str],
+    ) -> None:
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                stacks[";".join(reversed(labels))] += 1
+
+    async def profile(self, seconds: float, interval_ms: float) -> str:
+        """
+        Профилирование потока event loop в течение seconds секунд.
+
+        Args:
+            seconds: Длительность профилирования
+            interval_ms: Интервал между снимками стека
+
+        Returns:
+            Стеки в формате collapsed ("frame;frame;frame count"),
+            который принимают flamegraph.pl, speedscope и inferno
+        """
+        self.running = True
+        stacks: Counter[str] = Counter()
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(), interval_ms / 1000, stop, stacks),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+            self.running = False
+
+        logger.info(
+            "profile_completed",
+            duration_seconds=round(time.perf_counter() - start, 2),
+            interval_ms=interval_ms,
+            samples=sum(stacks.values()),
+            unique_stacks=len(stacks),
+        )
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+@lru_cache
+def get_sampling_profiler() -> SamplingProfiler:
+    return SamplingProfiler()
+
+
+SamplingProfilerDep = Annotated[SamplingProfiler, Depends(get_sampling_profiler)]
@@ -0,0 +1,160 @@
+"""
+Разбивка времени обработки запроса по фазам (Server-Timing).
+
+Gateway-стадии (auth, queue — ожидание слота в очереди к сервисам) и фазы
+запросов к сервисам (ожидание соединения в пуле, connect, TLS, отправка,
+ожидание первого байта, чтение тела) накапливаются в объекте RequestTimings
+текущего запроса. Фазы сервисов
+снимаются через trace-хуки httpx/httpcore. Несколько запросов к сервисам
+(повторы, агрегация) суммируются по фазам.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config import settings
+
+SERVER_TIMING_OFF = "off"
+SERVER_TIMING_ADMIN = "admin"
+SERVER_TIMING_ALL = "all"
+
+# Порядок фаз в заголовке и логе
+PHASES = ("auth", "queue", "pool", "connect", "tls", "send", "wait", "receive")
+
+# trace-события httpcore (без префикса http11./http2.) -> фаза
+_TRACE_PHASES = {
+    "connect_tcp": "connect",
+    "connect_unix_socket": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "send",
+    "send_request_body": "send",
+    "send_connection_init": "send",
+    "receive_response_headers": "wait",
+}
+
+
+@dataclass
+class RequestTimings:
+    """Накопленные длительности фаз одного входящего запроса (мс)."""
+
+    start: float = field(default_factory=time.perf_counter)
+    phases: dict[str, float] = field(default_factory=dict)
+    admin: bool = False
+
+    def add(self, phase: str, duration_ms: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration_ms
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def as_dict(self) -> dict[str, float]:
+        """Фазы в фиксированном порядке, округлённые до сотых мс."""
+        result = {
+            phase: round(self.phases[phase], 2)
+            for phase in PHASES
+            if phase in self.phases
+        }
+        result["total"] = round(self.total_ms(), 2)
+        return result
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request_timings() -> RequestTimings | None:
+    """Начало замера входящего запроса (None, если замер отключён)."""
+    if settings.SERVER_TIMING == SERVER_TIMING_OFF:
+        return None
+    timings = RequestTimings()
+    request_timings.set(timings)
+    return timings
+
+
+def should_expose(timings: RequestTimings) -> bool:
+    """Отдавать ли Server-Timing клиенту."""
+    if settings.SERVER_TIMING == SERVER_TIMING_ALL:
+        return True
+    return settings.SERVER_TIMING == SERVER_TIMING_ADMIN and timings.admin
+
+
+def format_server_timing(phases: dict[str, float]) -> str:
+    """Значение заголовка Server-Timing: "auth;dur=0.41, wait;dur=12.3, ..."."""
+    return ", ".join(f"{phase};dur={duration}" for phase, duration in phases.items())
+
+
+def mark_user_role(role: str) -> None:
+    """Запоминание роли пользователя текущего запроса (для режима admin)."""
+    timings = request_timings.get()
+    if timings is not None:
+        timings.admin = role == "admin"
+
+
+@contextmanager
+def measure(phase: str) -> Iterator[None]:
+    """Замер gateway-стадии текущего запроса."""
+    timings = request_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, (time.perf_counter() - start) * 1000)
+
+
+class UpstreamTrace:
+    """
+    Сбор фаз одного запроса к сервису через trace-хук httpx/httpcore.
+
+    Ожидание в пуле — от начала отправки до первого события соединения
+    (или отправки заголовков, если соединение взято из пула). Чтение тела
+    завершается вызовом finish() после вычитывания ответа.
+    """
+
+    def __init__(self, timings: RequestTimings):
+        self.timings = timings
+        self.start = time.perf_counter()
+        self.pool_done = False
+        self.started: dict[str, float] = {}
+        self.headers_received: float | None = None
+
+    async def __call__(self, event_name: str, info: dict[str, Any]) -> None:
+        now = time.perf_counter()
+        # "connection.connect_tcp.started", "http11.send_request_headers.complete"
+        _, name, stage = event_name.rsplit(".", 2)
+        phase = _TRACE_PHASES.get(name)
+        if phase is None:
+            return
+
+        if not self.pool_done:
+            self.pool_done = True
+            self.timings.add("pool", (now - self.start) * 1000)
+
+        if stage == "started":
+            self.started[name] = now
+        elif name in self.started:
+            self.timings.add(phase, (now - self.started.pop(name)) * 1000)
+            if phase == "wait":
+                self.headers_received = now
+
+    def finish(self) -> None:
+        if self.headers_received is not None:
+            self.timings.add(
+                "receive", (time.perf_counter() - self.headers_received) * 1000
+            )
+            self.headers_received = None
+
+
+def upstream_trace() -> UpstreamTrace | None:
+    """trace-хук для запроса к сервису (None, если запрос не замеряется)."""
+    timings = request_timings.get()
+    if timings is None:
+        return None
+    return UpstreamTrace(timings)
@@ -0,0 +1,344 @@
+"""
+Распределённая трассировка (W3C Trace Context, экспорт в формате OTLP/JSON).
+
+Каждый входящий запрос получает span "server" (родитель — traceparent
+клиента, если он передан), проверка JWT — span "auth", каждая попытка
+запроса к сервису — span "client", чей traceparent уходит в сервис.
+
+Сэмплирование:
+- head — решение при старте запроса (флаг sampled входящего traceparent
+  или доля TRACING_SAMPLE_RATE), передаётся сервисам во флаге traceparent;
+- tail — медленные (>= TRACING_TAIL_LATENCY_MS) и завершившиеся 5xx
+  запросы сохраняются, даже если head-решение было "нет".
+
+Готовые span'ы копятся в буфере и пачками выгружаются фоновой задачей
+(в файл JSON Lines или в OTLP/HTTP коллектор), вне пути обработки запроса.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from src.config import settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+SERVICE_NAME = "api-gateway"
+
+EXPORTER_FILE = "file"
+EXPORTER_OTLP = "otlp"
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# version-trace_id-parent_id-flags
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """
+    Разбор заголовка traceparent.
+
+    Returns:
+        (trace_id, parent_span_id, sampled) или None, если заголовок
+        отсутствует или некорректен
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+@dataclass
+class RequestTrace:
+    """Трасса одного входящего запроса."""
+
+    trace_id: str
+    sampled: bool
+    # Собирать span'ы, даже если head-решение "нет" (для tail-сэмплирования)
+    recording: bool
+    spans: list["Span"] = field(default_factory=list)
+
+
+@dataclass
+class Span:
+    trace: RequestTrace
+    name: str
+    kind: int
+    span_id: str = field(default_factory=_new_span_id)
+    parent_id: str | None = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: bool = False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def traceparent(self) -> str:
+        flags = "01" if self.trace.sampled else "00"
+        return f"00-{self.trace.trace_id}-{self.span_id}-{flags}"
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        if self.trace.recording:
+            self.trace.spans.append(self)
+
+    def to_otlp(self) -> dict[str, Any]:
+        span: dict[str, Any] = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": STATUS_ERROR if self.error else STATUS_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def start_request_span(traceparent: str | None, method: str, path: str) -> Span | None:
+    """
+    Span входящего запроса (None, если трассировка выключена).
+
+    Становится текущим span'ом контекста запроса.
+    """
+    if not settings.TRACING_ENABLED:
+        return None
+
+    parent = parse_traceparent(traceparent)
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id = _new_trace_id(), None
+        sampled = random.random() < settings.TRACING_SAMPLE_RATE
+
+    trace = RequestTrace(
+        trace_id=trace_id,
+        sampled=sampled,
+        recording=sampled or settings.TRACING_TAIL_LATENCY_MS > 0,
+    )
+    span = Span(
+        trace=trace,
+        name=f"{method} {path}",
+        kind=SPAN_KIND_SERVER,
+        parent_id=parent_id,
+        attributes={"http.request.method": method, "url.path": path},
+    )
+    current_span.set(span)
+    return span
+
+
+def finish_request_span(span: Span, status_code: int) -> None:
+    """Завершение span'а запроса и решение tail-сэмплирования."""
+    span.attributes["http.response.status_code"] = status_code
+    span.error = status_code >= 500
+    span.end()
+
+    trace = span.trace
+    if not trace.recording:
+        return
+    tail_ms = settings.TRACING_TAIL_LATENCY_MS
+    slow = tail_ms > 0 and span.duration_ms >= tail_ms
+    if trace.sampled or slow or span.error:
+        span_exporter.export(trace.spans)
+
+
+@contextmanager
+def start_span(
+    name: str,
+    kind: int = SPAN_KIND_INTERNAL,
+    attributes: dict[str, Any] | None = None,
+) -> Iterator[Span | None]:
+    """
+    Дочерний span текущего запроса.
+
+    Вне трассируемого запроса ничего не создаёт и отдаёт None.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = Span(
+        trace=parent.trace,
+        name=name,
+        kind=kind,
+        parent_id=parent.span_id,
+        attributes=attributes or {},
+    )
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.error = True
+        span.attributes["error.type"] = type(exc).__name__
+        raise
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+class SpanExporter:
+    """
+    Пакетная выгрузка span'ов фоновой задачей.
+
+    export() только кладёт span'ы в буфер; при переполнении буфера новые
+    span'ы отбрасываются (трассировка не должна тормозить запросы).
+    """
+
+    def __init__(self):
+        self.buffer: deque[Span] = deque()
+        self.dropped = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        if not settings.TRACING_ENABLED:
+            return
+        if settings.TRACING_EXPORTER == EXPORTER_OTLP:
+            self._client = httpx.AsyncClient(timeout=5.0, trust_env=False)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "span_exporter_started",
+            exporter=settings.TRACING_EXPORTER,
+            sample_rate=settings.TRACING_SAMPLE_RATE,
+            tail_latency_ms=settings.TRACING_TAIL_LATENCY_MS,
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def export(self, spans: list[Span]) -> None:
+        free = settings.TRACING_MAX_QUEUE_SIZE - len(self.buffer)
+        if free < len(spans):
+            self.dropped += len(spans) - max(free, 0)
+            spans = spans[: max(free, 0)]
+        self.buffer.extend(spans)
+        if len(self.buffer) >= settings.TRACING_EXPORT_BATCH_SIZE:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.TRACING_EXPORT_INTERVAL
+                )
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        while self.buffer:
+            count = min(len(self.buffer), settings.TRACING_EXPORT_BATCH_SIZE)
+            batch = [self.buffer.popleft() for _ in range(count)]
+            try:
+                await self._write(self._to_otlp(batch))
+            except (OSError, httpx.HTTPError) as exc:
+                logger.warning(
+                    "span_export_failed",
+                    exporter=settings.TRACING_EXPORTER,
+                    spans=len(batch),
+                    error=str(exc),
+                )
+        if self.dropped:
+            logger.warning("spans_dropped", count=self.dropped)
+            self.dropped = 0
+
+    @staticmethod
+    def _to_otlp(spans: list[Span]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [_otlp_attribute("service.name", SERVICE_NAME)]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    async def _write(self, payload: dict[str, Any]) -> None:
+        if self._client is not None:
+            response = await self._client.post(
+                settings.TRACING_OTLP_ENDPOINT, json=payload
+            )
+            response.raise_for_status()
+            return
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        await asyncio.to_thread(_append_line, Path(settings.TRACING_FILE_PATH), line)
+
+
+def _append_line(path: Path, line: str) -> None:
+    with path.open("a") as f:
+        f.write(line)
+
+
+span_exporter = SpanExporter()
@@ -0,0 +1,121 @@
+"""
+Транспорт httpx для соединений с внутренними сервисами.
+
+Имя хоста разрешается через кэш DNS (src.dns), а адрес для нового
+соединения выбирает клиентский балансировщик: если за именем сервиса
+несколько реплик (Docker Compose --scale, headless-сервис Kubernetes),
+соединения распределяются по ним по кругу. Если подключиться к адресу
+не удалось, пробуется следующий.
+
+Заголовок Host и SNI/проверка сертификата по-прежнему используют имя
+хоста — подменяется только адрес, к которому открывается TCP-соединение.
+"""
+
+import itertools
+
+import httpcore
+import httpx
+
+from src.dns import DNSCache, DNSResolutionError
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RoundRobinBalancer:
+    """Круговой выбор адреса среди адресов хоста из кэша DNS."""
+
+    def __init__(self):
+        self._counters: dict[str, itertools.count] = {}
+
+    def order(self, host: str, addresses: tuple[str, ...]) -> list[str]:
+        """Адреса в порядке попыток подключения: со следующего по кругу."""
+        if len(addresses) < 2:
+            return list(addresses)
+        counter = self._counters.setdefault(host, itertools.count())
+        offset = next(counter) % len(addresses)
+        return [*addresses[offset:], *addresses[:offset]]
+
+
+class ResolvingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Сетевой backend httpcore, подключающийся к адресу из кэша DNS."""
+
+    def __init__(self, dns_cache: DNSCache, balancer: RoundRobinBalancer):
+        self._backend = httpcore.AnyIOBackend()
+        self._dns_cache = dns_cache
+        self._balancer = balancer
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self._dns_cache.resolve(host, port)
+        except DNSResolutionError as exc:
+            # httpx превращает это в httpx.ConnectError, как и ошибку резолвера
+            raise httpcore.ConnectError(str(exc)) from exc
+
+        error: httpcore.ConnectError | None = None
+        for address in self._balancer.order(host, addresses):
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except httpcore.ConnectError as exc:
+                logger.warning(
+                    "upstream_address_connect_failed",
+                    host=host,
+                    address=address,
+                    error=str(exc),
+                )
+                error = exc
+        raise error
+
+    async def connect_unix_socket(
+        self, path: str, timeout: float | None = None, socket_options=None
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class ResolvingTransport(httpx.AsyncHTTPTransport):
+    """
+    AsyncHTTPTransport с ResolvingNetworkBackend.
+
+    httpx не позволяет передать сетевой backend, поэтому пул соединений
+    httpcore создаётся здесь (вместо AsyncHTTPTransport.__init__) с теми же
+    параметрами, что у httpx, и нашим backend. Прокси не поддерживаются:
+    соединения с сервисами идут напрямую.
+    """
+
+    def __init__(
+        self,
+        dns_cache: DNSCache,
+        balancer: RoundRobinBalancer,
+        limits: httpx.Limits,
+        http1: bool = True,
+        http2: bool = False,
+        retries: int = 0,
+    ):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=http1,
+            http2=http2,
+            retries=retries,
+            network_backend=ResolvingNetworkBackend(dns_cache, balancer),
+        )
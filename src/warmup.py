@@ -0,0 +1,128 @@
+"""
+Прогрев gateway при запуске (до того, как uvicorn начнёт принимать запросы).
+
+Без прогрева пул соединений после деплоя пуст, и первая волна запросов
+платит за DNS и TCP connect к каждому сервису, а первый запрос с токеном —
+за импорт и инициализацию проверки JWT. Прогрев:
+- разрешает имена хостов сервисов (WARMUP_RESOLVE_DNS);
+- открывает WARMUP_CONNECTIONS_PER_UPSTREAM keep-alive соединений
+  к каждому сервису (параллельные GET /health остаются в пуле);
+- проверяет одноразовый токен, подписанный ключом gateway.
+
+Ошибки сети, DNS и проверки JWT не мешают запуску, ошибки в коде — мешают;
+весь прогрев ограничен WARMUP_TIMEOUT.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from src.config import settings
+from src.dependencies import warm_up_auth
+from src.dns import DNSResolutionError, dns_cache
+from src.exceptions import AuthenticationError
+from src.logger import get_logger
+from src.proxy import proxy_client
+
+logger = get_logger(__name__)
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _resolve(host: str, port: int) -> dict:
+    """Разрешение имени через кэш DNS — заодно заполняет кэш."""
+    start = time.perf_counter()
+    try:
+        addresses = await dns_cache.resolve(host, port)
+    except DNSResolutionError as exc:
+        return {"error": str(exc), "duration_ms": _elapsed_ms(start)}
+    return {"addresses": sorted(addresses), "duration_ms": _elapsed_ms(start)}
+
+
+async def _open_connections(base_url: str, connections: int) -> dict:
+    """
+    Параллельные запросы к /health открывают отдельные соединения,
+    которые после ответа остаются в пуле как keep-alive.
+    """
+
+    async def probe() -> float | None:
+        start = time.perf_counter()
+        try:
+            await proxy_client.client.get(
+                f"{base_url}/health", timeout=settings.WARMUP_TIMEOUT
+            )
+        except httpx.HTTPError:
+            return None
+        return _elapsed_ms(start)
+
+    durations = await asyncio.gather(*(probe() for _ in range(connections)))
+    opened = [d for d in durations if d is not None]
+    return {
+        "connections": len(opened),
+        # Время ответа на холодном соединении (DNS + connect + запрос)
+        "cold_request_ms": max(opened) if opened else None,
+    }
+
+
+async def _warm_up_auth() -> dict:
+    # PyJWT импортируется прогревом в любом случае; на уровне модуля
+    # он замедлил бы импорт src.main
+    import jwt
+
+    start = time.perf_counter()
+    try:
+        await run_in_threadpool(warm_up_auth)
+    except (jwt.PyJWTError, AuthenticationError, ValueError) as exc:
+        # Ошибка ключа или алгоритма JWT не мешает запуску (проявится
+        # на запросах с токеном); ошибки в коде прогрева — мешают
+        return {
+            "error": f"{type(exc).__name__}: {exc}",
+            "duration_ms": _elapsed_ms(start),
+        }
+    return {"duration_ms": _elapsed_ms(start)}
+
+
+async def warm_up() -> None:
+    """Прогрев соединений, DNS и проверки токенов (см. описание модуля)."""
+    if not settings.WARMUP_ENABLED:
+        return
+
+    start = time.perf_counter()
+    services = settings.upstream_services
+    report: dict = {}
+
+    async def run() -> None:
+        if settings.WARMUP_RESOLVE_DNS:
+            hosts = sorted(
+                {
+                    (url.hostname, url.port or 80)
+                    for url in map(urlsplit, services.values())
+                }
+            )
+            resolved = await asyncio.gather(*(_resolve(h, p) for h, p in hosts))
+            report["dns"] = {h: r for (h, _), r in zip(hosts, resolved)}
+
+        results = await asyncio.gather(
+            _warm_up_auth(),
+            *(
+                _open_connections(url, settings.WARMUP_CONNECTIONS_PER_UPSTREAM)
+                for url in services.values()
+            ),
+        )
+        report["auth"] = results[0]
+        report["services"] = dict(zip(services, results[1:]))
+
+    try:
+        await asyncio.wait_for(run(), timeout=settings.WARMUP_TIMEOUT)
+    except TimeoutError:
+        logger.warning(
+            "warmup_timeout", timeout=settings.WARMUP_TIMEOUT, completed=report
+        )
+        return
+
+    logger.info("warmup_completed", duration_ms=_elapsed_ms(start), **report)
@@ -0,0 +1,136 @@
+"""
+Общие фикстуры тестов.
+
+Gateway проверяется целиком через ASGI: входящие запросы идут в src.main.app,
+а запросы ProxyClient к внутренним сервисам — в заглушку Upstream вместо
+сети. Lifespan приложения не запускается (прогрев, фоновые задачи).
+"""
+
+import inspect
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+# Настройки читаются при импорте src.config — окружение задаётся до него
+os.environ.update(
+    {
+        "JWT_SECRET_KEY": "test-secret",
+        "JWT_ALGORITHM": "HS256",
+        "INTERNAL_API_TOKEN": "test-internal-token",
+        "LOG_LEVEL": "WARNING",
+        "WARMUP_ENABLED": "false",
+        "FAST_PATH_ENABLED": "false",
+    }
+)
+
+import httpx
+import jwt
+import pytest
+
+from src.cache import private_cache, response_cache
+from src.circuit_breaker import circuit_breakers
+from src.config import settings
+from src.idempotency import idempotency_store
+from src.identity import token_cache
+from src.main import app
+from src.proxy import proxy_client
+from src.revocation import revocation_list
+
+
+class Upstream:
+    """
+    ASGI-заглушка внутренних сервисов.
+
+    Отвечает handler(method, path) -> (status, body) с заголовками headers
+    и запоминает запросы (метод, путь, заголовки) в calls. handler может быть
+    корутиной — например, чтобы задержать ответ.
+    """
+
+    def __init__(self):
+        self.calls: list[tuple[str, str, dict[str, str]]] = []
+        self.headers: dict[str, str] = {"content-type": "application/json"}
+        self.handler: Callable[[str, str], Any] = lambda method, path: (
+            200,
+            b'{"ok": true}',
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        headers = {key.decode(): value.decode() for key, value in scope["headers"]}
+        self.calls.append((scope["method"], scope["path"], headers))
+        result = self.handler(scope["method"], scope["path"])
+        if inspect.isawaitable(result):
+            result = await result
+        status, body = result
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (key.encode(), value.encode())
+                    for key, value in self.headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def make_token(
+    sub: str | None = None,
+    iat: int | None = None,
+    role: str = "user",
+    jti: str | None = None,
+) -> str:
+    """Access-токен, подписанный ключом gateway."""
+    iat = int(time.time()) if iat is None else iat
+    payload = {
+        "sub": sub or str(uuid.uuid4()),
+        "email": "user@example.com",
+        "role": role,
+        "type": "access",
+        "iat": iat,
+        "exp": iat + 600,
+    }
+    if jti is not None:
+        payload["jti"] = jti
+    return jwt.encode(
+        payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
+    )
+
+
+def bearer(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def upstream() -> Upstream:
+    return Upstream()
+
+
+@pytest.fixture
+async def gateway(upstream: Upstream) -> AsyncIterator[httpx.AsyncClient]:
+    """Клиент gateway; состояние модулей-синглтонов сбрасывается после теста."""
+    proxy_client.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=upstream))
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://gateway"
+        ) as client:
+            yield client
+    finally:
+        await proxy_client.client.aclose()
+        proxy_client.client = None
+        for store in (
+            response_cache,
+            private_cache,
+            idempotency_store,
+            token_cache,
+            revocation_list,
+            circuit_breakers,
+        ):
+            store.clear()
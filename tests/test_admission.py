@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+
+from src.admission import (
+    ANONYMOUS,
+    AUTHENTICATED,
+    CRITICAL,
+    current_priority,
+    start_request_priority,
+)
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def priorities(upstream) -> list[str]:
+    """Классы запросов, с которыми они дошли до сервисов."""
+    seen: list[str] = []
+
+    def handler(method: str, path: str) -> tuple[int, bytes]:
+        seen.append(current_priority())
+        return 200, b'{"id": 1, "category_id": 2}'
+
+    upstream.handler = handler
+    return seen
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "expected"),
+    [
+        ("POST", "/api/v1/orders/checkout", CRITICAL),
+        ("POST", f"/api/v1/orders/{uuid.uuid4()}/pay", CRITICAL),
+        ("GET", "/api/v1/orders/checkout", ANONYMOUS),
+        ("GET", "/api/products", ANONYMOUS),
+        ("GET", "/api/cart", ANONYMOUS),
+    ],
+)
+def test_start_request_priority(method, path, expected):
+    assert start_request_priority(method, path).value == expected
+
+
+async def test_verified_token_is_authenticated(gateway, priorities):
+    response = await gateway.get("/api/users/me", headers=bearer(make_token()))
+
+    assert response.status_code == 200
+    assert priorities == [AUTHENTICATED]
+
+
+async def test_unverified_token_stays_anonymous(gateway, priorities):
+    # Каталог токен не проверяет — сам заголовок класс не повышает
+    response = await gateway.get("/api/products/1", headers=bearer("x"))
+
+    assert response.status_code == 200
+    assert priorities == [ANONYMOUS]
+
+
+async def test_optional_user_with_valid_token_is_authenticated(gateway, priorities):
+    response = await gateway.get("/api/pages/products/1", headers=bearer(make_token()))
+
+    assert response.status_code == 200
+    assert priorities == [AUTHENTICATED] * 3
+
+
+async def test_checkout_stays_critical(gateway, priorities):
+    response = await gateway.post(
+        "/api/v1/orders/checkout", headers=bearer(make_token()), json={}
+    )
+
+    assert response.status_code == 200
+    assert priorities == [CRITICAL]
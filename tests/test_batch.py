@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from src.admission import ANONYMOUS, AUTHENTICATED, CRITICAL, current_priority
+from src.deadline import DEADLINE_HEADER
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+BATCH = "/api/batch"
+
+
+@pytest.fixture
+def seen(upstream) -> dict[str, tuple[str, dict[str, str]]]:
+    """Путь в сервисе -> (класс запроса, заголовки), с которыми он дошёл."""
+    calls: dict[str, tuple[str, dict[str, str]]] = {}
+
+    def handler(method: str, path: str) -> tuple[int, bytes]:
+        calls[path] = (current_priority(), dict(upstream.calls[-1][2]))
+        return 200, b'{"ok": true}'
+
+    upstream.handler = handler
+    return calls
+
+
+async def test_nested_batch_is_rejected(gateway, upstream):
+    response = await gateway.post(
+        BATCH,
+        json={"requests": [{"id": "inner", "method": "POST", "path": BATCH}]},
+    )
+
+    assert response.status_code == 200
+    [result] = response.json()["responses"]
+    assert result["id"] == "inner"
+    assert result["status"] == 400
+    assert upstream.calls == []
+
+
+async def test_sub_requests_inherit_auth_and_deadline(gateway, seen):
+    user_id = "3f2b8c1e-6a4d-4e0f-9c7b-2d5e8a1f4b60"
+
+    response = await gateway.post(
+        BATCH,
+        headers=bearer(make_token(sub=user_id)),
+        json={
+            "requests": [
+                {"method": "GET", "path": "/api/users/me"},
+                {"method": "GET", "path": "/api/v1/orders"},
+            ]
+        },
+    )
+
+    assert [r["status"] for r in response.json()["responses"]] == [200, 200]
+    for priority, headers in seen.values():
+        assert priority == AUTHENTICATED
+        assert headers["x-user-id"] == user_id
+        # Бюджет batch (15 с), а не собственный бюджет заказов (30 с)
+        assert 0 < int(headers[DEADLINE_HEADER]) <= 15000
+
+
+async def test_sub_request_priority_follows_its_own_path(gateway, seen):
+    response = await gateway.post(
+        BATCH,
+        headers=bearer(make_token()),
+        json={
+            "requests": [
+                {"method": "POST", "path": "/api/v1/orders/checkout", "body": {}},
+                {"method": "GET", "path": "/api/products/1"},
+            ]
+        },
+    )
+
+    assert [r["status"] for r in response.json()["responses"]] == [200, 200]
+    assert seen["/api/v1/orders/checkout"][0] == CRITICAL
+    assert seen["/api/v1/products/1"][0] == AUTHENTICATED
+
+
+async def test_anonymous_batch_stays_anonymous(gateway, seen):
+    response = await gateway.post(
+        BATCH, json={"requests": [{"method": "GET", "path": "/api/products/1"}]}
+    )
+
+    assert response.json()["responses"][0]["status"] == 200
+    assert seen["/api/v1/products/1"][0] == ANONYMOUS
+
+
+async def test_stream_mode_returns_ndjson(gateway, upstream):
+    response = await gateway.post(
+        f"{BATCH}?stream=true",
+        json={
+            "requests": [
+                {"id": "a", "method": "GET", "path": "/api/products/1"},
+                {"id": "b", "method": "GET", "path": "/api/products/2"},
+            ]
+        },
+    )
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["id"] for line in lines) == ["a", "b"]
+    assert {line["status"] for line in lines} == {200}
+    assert {line["body"]["ok"] for line in lines} == {True}
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from src.config import settings
+from src.middleware.body_limit import BODY_TIMEOUT_DETAIL, BODY_TOO_LARGE_DETAIL
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+CART_ITEMS = "/api/cart/items"
+CART_LIMIT = settings.REQUEST_BODY_LIMITS["/api/cart"]
+
+
+def user_headers() -> dict[str, str]:
+    return {**bearer(make_token()), "Content-Type": "application/json"}
+
+
+async def chunks(*parts: bytes, delay: float = 0.0):
+    """Тело без Content-Length: клиент отправляет его частями."""
+    for part in parts:
+        if delay:
+            await asyncio.sleep(delay)
+        yield part
+
+
+async def test_declared_oversized_body_is_rejected_before_auth(gateway, upstream):
+    response = await gateway.post(CART_ITEMS, content=b"x" * (CART_LIMIT + 1))
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": BODY_TOO_LARGE_DETAIL}
+    assert response.headers["connection"] == "close"
+    assert upstream.calls == []
+
+
+async def test_chunked_body_over_limit_is_rejected(gateway, upstream):
+    part = b"x" * (CART_LIMIT // 2)
+
+    response = await gateway.post(
+        CART_ITEMS,
+        headers=user_headers(),
+        content=chunks(part, part, b"tail"),
+    )
+
+    assert response.status_code == 413
+    assert response.json()["detail"] == BODY_TOO_LARGE_DETAIL
+    assert upstream.calls == []
+
+
+async def test_chunked_body_within_limit_is_accepted(gateway, upstream):
+    response = await gateway.post(
+        CART_ITEMS,
+        headers=user_headers(),
+        content=chunks(b'{"product_id": 1,', b' "quantity": 1}'),
+    )
+
+    assert response.status_code == 200
+    assert len(upstream.calls) == 1
+
+
+async def test_stalled_chunk_times_out(gateway, upstream, monkeypatch):
+    monkeypatch.setattr(settings, "REQUEST_BODY_CHUNK_TIMEOUT", 0.05)
+
+    response = await gateway.post(
+        CART_ITEMS,
+        headers=user_headers(),
+        content=chunks(b'{"product_id": 1,', b' "quantity": 1}', delay=0.2),
+    )
+
+    assert response.status_code == 408
+    assert response.json()["detail"] == BODY_TIMEOUT_DETAIL
+    assert upstream.calls == []
+
+
+async def test_slow_body_hits_total_timeout(gateway, upstream, monkeypatch):
+    # Каждый чанк укладывается в паузу, но всё тело — нет
+    monkeypatch.setattr(settings, "REQUEST_BODY_CHUNK_TIMEOUT", 1.0)
+    monkeypatch.setattr(settings, "REQUEST_BODY_TIMEOUT", 0.1)
+
+    response = await gateway.post(
+        CART_ITEMS,
+        headers=user_headers(),
+        content=chunks(*[b" "] * 20, b"{}", delay=0.02),
+    )
+
+    assert response.status_code == 408
+    assert upstream.calls == []
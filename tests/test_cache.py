@@ -0,0 +1,204 @@
+import time
+
+import pytest
+
+from src.cache import (
+    CachedResponse,
+    ResponseCache,
+    etag_matches,
+    response_cache,
+    strip_etag_variants,
+    variant_etag,
+)
+from src.config import settings
+from src.proxy import build_target_url
+
+pytestmark = pytest.mark.anyio
+
+BODY = b'{"id": 1, "title": "' + b"x" * 2048 + b'"}'
+PRODUCT = "/api/products/1"
+
+
+@pytest.fixture
+def product(upstream):
+    upstream.handler = lambda method, path: (200, BODY)
+
+
+def test_variant_etag():
+    assert variant_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert variant_etag('"abc"', None) == '"abc"'
+    # Weak ETag и так не обещает побайтного совпадения
+    assert variant_etag('W/"abc"', "gzip") == 'W/"abc"'
+
+
+def test_strip_etag_variants():
+    assert strip_etag_variants('"abc-gzip", W/"def-gzip", "ghi"') == (
+        '"abc", W/"def", "ghi"'
+    )
+    assert strip_etag_variants(" * ") == "*"
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        ('"abc"', True),
+        ('"abc-gzip"', True),
+        ('W/"abc"', True),
+        ('W/"abc-gzip"', True),
+        ('"other", "abc"', True),
+        ("*", True),
+        ('"abd"', False),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, '"abc"') is expected
+
+
+async def test_gzip_variant_etag_is_revalidated(gateway, upstream, product):
+    first = await gateway.get(PRODUCT, headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+    assert first.headers["content-encoding"] == "gzip"
+    assert etag.endswith('-gzip"')
+
+    response = await gateway.get(
+        PRODUCT, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    assert len(upstream.calls) == 1
+
+
+async def test_weak_etag_is_revalidated(gateway, upstream, product):
+    first = await gateway.get(PRODUCT, headers={"Accept-Encoding": "identity"})
+
+    response = await gateway.get(
+        PRODUCT, headers={"If-None-Match": f"W/{first.headers['etag']}"}
+    )
+
+    assert response.status_code == 304
+    assert len(upstream.calls) == 1
+
+
+async def test_changed_etag_gets_full_response(gateway, upstream, product):
+    await gateway.get(PRODUCT)
+
+    response = await gateway.get(PRODUCT, headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.content == BODY
+
+
+INVALIDATE = "/api/internal/cache/invalidate"
+INTERNAL_HEADERS = {"X-Internal-Token": "test-internal-token"}
+
+
+async def fetch_all(gateway, paths: list[str]) -> None:
+    for path in paths:
+        assert (await gateway.get(path)).status_code == 200
+
+
+async def test_product_event_purges_every_tagged_entry(gateway, upstream, product):
+    paths = [PRODUCT, "/api/products/2", "/api/products", "/api/products?page=2"]
+    await fetch_all(gateway, paths)
+    assert len(response_cache) == 4
+
+    response = await gateway.post(
+        INVALIDATE,
+        headers=INTERNAL_HEADERS,
+        json={"events": [{"resource": "product", "id": 1, "action": "updated"}]},
+    )
+
+    assert response.json() == {"tags": ["product:1", "products"], "evicted": 3}
+    upstream.calls.clear()
+    await fetch_all(gateway, paths)
+    # Из кэша — только товар, которого событие не касается
+    assert sorted(call[1] for call in upstream.calls) == [
+        "/api/v1/products",
+        "/api/v1/products",
+        "/api/v1/products/1",
+    ]
+
+
+async def test_purge_removes_stale_entries(gateway, upstream, product):
+    await gateway.get(PRODUCT)
+    key = build_target_url(settings.PRODUCT_SERVICE_URL, "api/v1/products/1")
+    response_cache.get_stale(key).expires_at = time.monotonic() - 1
+
+    assert response_cache.purge_tags(["product:1"]) == 1
+    assert response_cache.get_stale(key) is None
+    assert response_cache.stats()["tags"] == 0
+
+
+async def test_invalidation_requires_internal_token(gateway, product):
+    await gateway.get(PRODUCT)
+
+    response = await gateway.post(
+        INVALIDATE, json={"events": [{"resource": "product", "id": 1}]}
+    )
+
+    assert response.status_code == 401
+    assert len(response_cache) == 1
+
+
+def make_entry(size: int, tags: frozenset[str] = frozenset()) -> CachedResponse:
+    return CachedResponse(
+        status_code=200,
+        headers=[],
+        content=b"x" * size,
+        etag='"e"',
+        expires_at=time.monotonic() + 60,
+        tags=tags,
+    )
+
+
+def test_byte_limit_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=100, max_bytes=300, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, make_entry(100, frozenset({f"tag:{key}"})))
+    cache.get("a")
+
+    cache.set("d", make_entry(150))
+
+    # "a" недавно прочитана — вытеснены "b" и "c"
+    assert list(cache._entries) == ["a", "d"]
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 250
+    assert stats["evictions"] == 2
+    assert stats["tags"] == 1
+
+
+def test_replacing_entry_keeps_byte_count():
+    cache = ResponseCache(max_entries=100, max_bytes=1000, ttl=60)
+    cache.set("a", make_entry(100))
+    cache.set("a", make_entry(300))
+
+    assert cache.stats()["bytes"] == 300
+    assert cache.stats()["evictions"] == 0
+
+
+def test_entry_larger_than_cache_is_not_stored():
+    cache = ResponseCache(max_entries=100, max_bytes=300, ttl=60)
+    cache.set("a", make_entry(100))
+
+    cache.set("big", make_entry(301))
+
+    assert list(cache._entries) == ["a"]
+    assert cache.stats()["bytes"] == 100
+
+
+async def test_compressed_variant_counts_towards_limit():
+    cache = ResponseCache(max_entries=100, max_bytes=300, ttl=60)
+    entry = make_entry(200)
+    cache.set("a", entry)
+    cache.set("b", make_entry(50))
+
+    body = await entry.encoded("gzip")
+
+    assert cache.stats()["bytes"] == 250 + len(body)
+    cache.set("c", make_entry(60))
+    # Запись "a" выросла и вытесняется первой
+    assert list(cache._entries) == ["b", "c"]
+    assert cache.stats()["bytes"] == 110
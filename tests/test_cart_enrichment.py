@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+from src.config import settings
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+CART = {
+    "items": [
+        {"product_id": 1, "out_of_stock": False, "product_deleted": False},
+        {"product_id": 2, "out_of_stock": False, "product_deleted": False},
+        {"product_id": 3, "out_of_stock": False, "product_deleted": False},
+    ]
+}
+
+
+async def catalog(method: str, path: str) -> tuple[int, bytes]:
+    if path == "/api/v1/cart":
+        return 200, json.dumps(CART).encode()
+    product_id = int(path.rsplit("/", 1)[1])
+    if product_id == 2:
+        # Товар, который не успевает к таймауту
+        await asyncio.sleep(60)
+    if product_id == 3:
+        return 404, b'{"detail": "Not found"}'
+    product = {"title": "Product", "price": "10.00", "stock": 0, "status": "active"}
+    return 200, json.dumps(product).encode()
+
+
+async def test_late_product_does_not_drop_others(gateway, upstream, monkeypatch):
+    monkeypatch.setattr(settings, "AGGREGATION_PART_TIMEOUT", 0.2)
+    upstream.handler = catalog
+
+    response = await gateway.get(
+        "/api/cart", params={"enrich": "true"}, headers=bearer(make_token())
+    )
+
+    assert response.status_code == 200
+    fresh, late, deleted = response.json()["items"]
+    assert fresh["live_product"]["title"] == "Product"
+    assert fresh["out_of_stock"] is True
+    assert late["live_product"] is None
+    assert late["out_of_stock"] is False
+    assert deleted["product_deleted"] is True
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from src.cache import response_cache
+from src.circuit_breaker import CLOSED, OPEN, circuit_breakers
+from src.config import settings
+from src.proxy import build_target_url
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+PRODUCT = "/api/products/1"
+
+
+def expire_cached_product() -> None:
+    key = build_target_url(settings.PRODUCT_SERVICE_URL, "api/v1/products/1")
+    response_cache.get_stale(key).expires_at = time.monotonic() - 1
+
+
+@pytest.fixture
+async def stale_product(gateway, upstream):
+    """Товар в кэше с истёкшим TTL; сервис каталога отвечает 503."""
+    upstream.handler = lambda method, path: (200, b'{"id": 1}')
+    await gateway.get(PRODUCT)
+    expire_cached_product()
+    upstream.handler = lambda method, path: (503, b'{"detail": "down"}')
+    upstream.calls.clear()
+
+
+async def test_stale_copy_is_served_on_upstream_error(gateway, stale_product):
+    response = await gateway.get(PRODUCT)
+
+    assert response.status_code == 200
+    assert response.json() == {"id": 1}
+    assert response.headers["warning"] == '110 - "Response is Stale"'
+    assert int(response.headers["age"]) >= 0
+
+
+async def test_breaker_opens_and_closes(gateway, upstream, stale_product, monkeypatch):
+    for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD):
+        await gateway.get(PRODUCT)
+    assert circuit_breakers.states()["product-service"] == OPEN
+
+    # Разомкнутая цепь: сервис не вызывается, клиент получает копию из кэша
+    response = await gateway.get(PRODUCT)
+    assert response.status_code == 200
+    assert "warning" in response.headers
+    assert len(upstream.calls) == settings.CIRCUIT_FAILURE_THRESHOLD
+
+    # Пробный запрос после паузы замыкает цепь
+    monkeypatch.setattr(settings, "CIRCUIT_RECOVERY_TIMEOUT", 0)
+    upstream.handler = lambda method, path: (200, b'{"id": 1, "fresh": true}')
+    response = await gateway.get(PRODUCT)
+    assert response.json() == {"id": 1, "fresh": True}
+    assert "warning" not in response.headers
+    assert circuit_breakers.states()["product-service"] == CLOSED
+
+
+async def test_application_errors_do_not_open_breaker(gateway, upstream):
+    upstream.handler = lambda method, path: (500, b'{"detail": "boom"}')
+    headers = bearer(make_token())
+
+    for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD + 1):
+        response = await gateway.post(
+            "/api/v1/orders/checkout", headers=headers, json={}
+        )
+        assert response.status_code == 500
+    for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD + 1):
+        assert (await gateway.get(PRODUCT)).status_code == 500
+
+    response = await gateway.get("/api/v1/orders", headers=headers)
+    assert response.status_code == 500
+    assert circuit_breakers.states().get("product-service", CLOSED) == CLOSED
+    assert "order-service" not in circuit_breakers.states()
+
+
+async def test_writes_bypass_open_breaker(gateway, upstream, stale_product):
+    for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD):
+        await gateway.get(PRODUCT)
+    upstream.handler = lambda method, path: (204, b"")
+
+    response = await gateway.delete(PRODUCT, headers=bearer(make_token(role="admin")))
+
+    assert response.status_code == 204
@@ -0,0 +1,59 @@
+import gzip
+
+import pytest
+
+from src import compression
+
+pytestmark = pytest.mark.anyio
+
+BODY = b'{"id": 1, "title": "' + b"x" * 2048 + b'"}'
+
+
+@pytest.mark.parametrize(
+    ("encoding", "expected"),
+    [
+        ("gzip", True),
+        ("x-gzip", True),
+        ("deflate", True),
+        ("gzip, br", False),
+        ("compress", False),
+    ],
+)
+def test_is_decodable(encoding, expected):
+    assert compression.is_decodable(encoding) is expected
+
+
+async def test_decompress_passes_unknown_encoding_through():
+    assert await compression.decompress(b"opaque", "gzip, br") == b"opaque"
+
+
+@pytest.mark.parametrize("encoding", ["gzip, br", "compress"])
+async def test_undecodable_upstream_body_is_passed_through(gateway, upstream, encoding):
+    upstream.headers["content-encoding"] = encoding
+    upstream.handler = lambda method, path: (200, b"opaque-body")
+
+    for _ in range(2):
+        async with gateway.stream(
+            "GET", "/api/products/1", headers={"Accept-Encoding": "gzip"}
+        ) as response:
+            # Сырое тело: тестовый клиент сам декодировал бы "gzip, br"
+            content = b"".join([chunk async for chunk in response.aiter_raw()])
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == encoding
+        assert content == b"opaque-body"
+
+    # Такой ответ не кэшируется: оба запроса дошли до сервиса
+    assert len(upstream.calls) == 2
+
+
+async def test_gzip_upstream_body_is_decoded_for_identity_client(gateway, upstream):
+    upstream.headers["content-encoding"] = "gzip"
+    upstream.handler = lambda method, path: (200, gzip.compress(BODY))
+
+    response = await gateway.get(
+        "/api/products/1", headers={"Accept-Encoding": "identity"}
+    )
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from src.config import settings
+from src.deadline import DEADLINE_HEADER, start_request_deadline
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+
+def sent_deadline(upstream) -> int:
+    """Остаток бюджета (мс), с которым запрос дошёл до сервиса."""
+    return int(upstream.calls[-1][2][DEADLINE_HEADER])
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "expected"),
+    [
+        ("GET", "/api/products/1", 5.0),
+        ("GET", "/api/categories", 5.0),
+        ("PATCH", "/api/products/1", settings.PROXY_REQUEST_DEADLINE),
+        ("DELETE", "/api/categories/1", settings.PROXY_REQUEST_DEADLINE),
+        ("POST", "/api/cart/items", 10.0),
+        ("GET", "/api/unknown", settings.PROXY_REQUEST_DEADLINE),
+    ],
+)
+async def test_route_budget_depends_on_method(method, path, expected):
+    loop = asyncio.get_running_loop()
+    deadline = start_request_deadline(method, path)
+
+    assert deadline - loop.time() == pytest.approx(expected, abs=0.1)
+
+
+async def test_remaining_budget_reaches_upstream(gateway, upstream):
+    await gateway.get("/api/products/1")
+    assert 0 < sent_deadline(upstream) <= 5000
+
+    # Запись в каталог не ограничена бюджетом чтения
+    await gateway.delete("/api/products/1", headers=bearer(make_token(role="admin")))
+    assert 5000 < sent_deadline(upstream) <= settings.PROXY_REQUEST_DEADLINE * 1000
+
+
+async def test_client_header_only_shortens_budget(gateway, upstream):
+    await gateway.get("/api/products/1", headers={"X-Request-Deadline": "2000"})
+    assert 0 < sent_deadline(upstream) <= 2000
+
+    await gateway.get("/api/products/2", headers={"X-Request-Deadline": "60000"})
+    assert sent_deadline(upstream) <= 5000
+
+
+async def test_request_past_deadline_returns_504(gateway, upstream):
+    async def slow(method: str, path: str) -> tuple[int, bytes]:
+        await asyncio.sleep(1)
+        return 200, b'{"id": 1}'
+
+    upstream.handler = slow
+
+    response = await gateway.get(
+        "/api/products/1", headers={"X-Request-Deadline": "50"}
+    )
+
+    assert response.status_code == 504
+    assert response.json()["detail"] == (
+        "Deadline exceeded while requesting product-service"
+    )
@@ -0,0 +1,133 @@
+import uuid
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.main import app
+from src.middleware.fast_path import FastPathMiddleware
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+ITEM_ID = uuid.UUID("3f2b8c1e-6a4d-4e0f-9c7b-2d5e8a1f4b60")
+
+
+@pytest.fixture
+async def clients(gateway):
+    """Клиенты обычного маршрута и fast path; ошибки приложения — ответом 500."""
+    fast_app = FastPathMiddleware(app)
+    async with (
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://gateway",
+        ) as routed,
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=fast_app, raise_app_exceptions=False),
+            base_url="http://gateway",
+        ) as fast,
+    ):
+        yield routed, fast
+
+
+def raise_error(error: Exception):
+    def handler(method: str, path: str):
+        raise error
+
+    return handler
+
+
+async def send_both(clients, upstream, method: str, path: str, **kwargs):
+    """Ответы обоих путей и пути, с которыми запросы дошли до сервиса."""
+    results = []
+    for client in clients:
+        upstream.calls.clear()
+        response = await client.request(method, path, **kwargs)
+        body = response.json() if response.content else None
+        if isinstance(body, dict):
+            body.pop("request_id", None)
+        results.append(
+            (response.status_code, body, [call[1] for call in upstream.calls])
+        )
+    return results
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        httpx.RemoteProtocolError("malformed response"),
+        httpx.ConnectError("connection refused"),
+        httpx.ReadTimeout("timed out"),
+    ],
+)
+async def test_upstream_errors_match_normal_route(
+    clients, upstream, monkeypatch, error
+):
+    monkeypatch.setattr(settings, "PROXY_MAX_RETRIES", 1)
+    upstream.handler = raise_error(error)
+
+    routed, fast = await send_both(
+        clients,
+        upstream,
+        "DELETE",
+        f"/api/cart/items/{ITEM_ID}",
+        headers=bearer(make_token()),
+    )
+
+    assert routed == fast
+    assert routed[0] in (500, 503, 504)
+
+
+@pytest.mark.parametrize(
+    "item_id",
+    [
+        str(ITEM_ID),
+        str(ITEM_ID).upper(),
+        ITEM_ID.hex,
+        "-" * 36,
+        "0" * 35,
+    ],
+)
+async def test_item_id_validation_matches_normal_route(clients, upstream, item_id):
+    upstream.handler = lambda method, path: (204, b"")
+
+    routed, fast = await send_both(
+        clients,
+        upstream,
+        "DELETE",
+        f"/api/cart/items/{item_id}",
+        headers=bearer(make_token()),
+    )
+
+    assert routed == fast
+
+
+@pytest.mark.parametrize("product_id", ["7", "007", "x"])
+async def test_product_id_validation_matches_normal_route(
+    clients, upstream, product_id
+):
+    upstream.handler = lambda method, path: (204, b"")
+
+    routed, fast = await send_both(
+        clients,
+        upstream,
+        "DELETE",
+        f"/api/products/{product_id}",
+        headers=bearer(make_token(role="admin")),
+    )
+
+    assert routed == fast
+
+
+@pytest.mark.parametrize(
+    ("token", "expected"), [(None, 401), ("x", 401), (make_token(), 403)]
+)
+async def test_auth_errors_match_normal_route(clients, upstream, token, expected):
+    headers = bearer(token) if token else {}
+
+    routed, fast = await send_both(
+        clients, upstream, "DELETE", "/api/products/1", headers=headers
+    )
+
+    assert routed == fast
+    assert routed[0] == expected
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from src.exceptions import IdempotencyConflictError
+from src.idempotency import IdempotencyStore
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+CHECKOUT = "/api/v1/orders/checkout"
+
+
+@pytest.fixture(autouse=True)
+def order_created(upstream):
+    upstream.handler = lambda method, path: (201, b'{"order_id": "1"}')
+
+
+def checkout_headers(token: str, key: str = "key-1") -> dict[str, str]:
+    return {**bearer(token), "Idempotency-Key": key}
+
+
+async def test_duplicates_reach_service_once(gateway, upstream):
+    headers = checkout_headers(make_token())
+
+    responses = await asyncio.gather(
+        *(gateway.post(CHECKOUT, headers=headers, json={"a": 1}) for _ in range(5))
+    )
+
+    assert [response.status_code for response in responses] == [201] * 5
+    assert {response.text for response in responses} == {'{"order_id": "1"}'}
+    assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 4
+    assert len(upstream.calls) == 1
+
+
+async def test_replay_has_no_etag_and_ignores_if_none_match(gateway, upstream):
+    headers = checkout_headers(make_token())
+    first = await gateway.post(CHECKOUT, headers=headers, json={"a": 1})
+
+    replay = await gateway.post(
+        CHECKOUT, headers={**headers, "If-None-Match": "*"}, json={"a": 1}
+    )
+
+    assert first.status_code == replay.status_code == 201
+    assert "etag" not in first.headers
+    assert "etag" not in replay.headers
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.text == first.text
+    assert len(upstream.calls) == 1
+
+
+async def test_key_is_scoped_per_user(gateway, upstream):
+    for token in (make_token(), make_token()):
+        response = await gateway.post(
+            CHECKOUT, headers=checkout_headers(token), json={"a": 1}
+        )
+        assert response.status_code == 201
+        assert "idempotent-replayed" not in response.headers
+
+    assert len(upstream.calls) == 2
+
+
+async def test_key_reused_with_other_body_is_rejected(gateway, upstream):
+    headers = checkout_headers(make_token())
+    await gateway.post(CHECKOUT, headers=headers, json={"a": 1})
+
+    response = await gateway.post(CHECKOUT, headers=headers, json={"a": 2})
+
+    assert response.status_code == 422
+    assert len(upstream.calls) == 1
+
+
+async def test_not_replayable_response_goes_to_service_again(gateway, upstream):
+    upstream.handler = lambda method, path: (409, b'{"detail": "in progress"}')
+    headers = checkout_headers(make_token())
+
+    for _ in range(2):
+        response = await gateway.post(CHECKOUT, headers=headers, json={"a": 1})
+        assert response.status_code == 409
+
+    assert len(upstream.calls) == 2
+
+
+async def test_interrupted_first_request_fails_waiters():
+    store = IdempotencyStore(max_entries=10, ttl=60)
+    record, first = store.begin("user:key", "fingerprint")
+    waiter, waiter_first = store.begin("user:key", "fingerprint")
+
+    store.fail("user:key", record, IdempotencyConflictError())
+
+    assert first and not waiter_first
+    with pytest.raises(IdempotencyConflictError):
+        await waiter.future
+    # Ключ освобождён: следующий повтор уходит в сервис
+    assert store.begin("user:key", "fingerprint")[1]
@@ -0,0 +1,60 @@
+import json
+import time
+import uuid
+
+import pytest
+
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def profile_of_caller(upstream):
+    """Профиль того пользователя, от имени которого gateway вызвал сервис."""
+
+    def handler(method: str, path: str) -> tuple[int, bytes]:
+        user_id = upstream.calls[-1][2]["x-user-id"]
+        return 200, json.dumps({"id": user_id, "calls": len(upstream.calls)}).encode()
+
+    upstream.handler = handler
+
+
+async def test_entries_are_not_shared_between_users(gateway, upstream):
+    alice, bob = str(uuid.uuid4()), str(uuid.uuid4())
+
+    for user_id in (alice, bob, alice, bob):
+        response = await gateway.get(
+            "/api/users/me", headers=bearer(make_token(user_id))
+        )
+        assert response.status_code == 200
+        assert response.json()["id"] == user_id
+
+    # Повторные чтения каждого пользователя — из его собственной записи
+    assert len(upstream.calls) == 2
+
+
+async def test_same_user_with_new_token_hits_cache(gateway, upstream):
+    user_id = str(uuid.uuid4())
+
+    # Ключ записи — пользователь, а не токен: новый вход попадает в кэш
+    now = int(time.time())
+    for iat in (now - 60, now):
+        await gateway.get("/api/users/me", headers=bearer(make_token(user_id, iat)))
+
+    assert len(upstream.calls) == 1
+
+
+async def test_write_invalidates_only_own_entries(gateway, upstream):
+    alice, bob = make_token(), make_token()
+    for token in (alice, bob):
+        await gateway.get("/api/users/me", headers=bearer(token))
+
+    await gateway.patch("/api/users/me", headers=bearer(alice), json={})
+    alice_profile = await gateway.get("/api/users/me", headers=bearer(alice))
+    bob_profile = await gateway.get("/api/users/me", headers=bearer(bob))
+
+    # GET, GET, PATCH и повторный GET Алисы; Боб получил ответ из кэша
+    assert len(upstream.calls) == 4
+    assert alice_profile.json()["calls"] == 4
+    assert bob_profile.json()["calls"] == 2
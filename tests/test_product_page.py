@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+
+class SlowCart:
+    """Обработчик заглушки: товар отвечает сразу, корзина — не раньше отмены."""
+
+    def __init__(self):
+        self.product: tuple[int, bytes] = (200, b'{"id": 1, "category_id": 2}')
+        self.cancelled = asyncio.Event()
+
+    async def __call__(self, method: str, path: str) -> tuple[int, bytes]:
+        if path == "/api/v1/cart":
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                self.cancelled.set()
+                raise
+        return self.product
+
+
+@pytest.fixture
+def slow_cart(upstream) -> SlowCart:
+    upstream.handler = SlowCart()
+    return upstream.handler
+
+
+async def test_cart_request_is_cancelled_when_product_is_missing(gateway, slow_cart):
+    slow_cart.product = (404, b'{"detail": "Not found"}')
+
+    response = await gateway.get("/api/pages/products/1", headers=bearer(make_token()))
+
+    assert response.status_code == 404
+    assert slow_cart.cancelled.is_set()
+
+
+async def test_cart_request_is_cancelled_on_unexpected_error(gateway, slow_cart):
+    slow_cart.product = (200, b"not json")
+
+    with pytest.raises(ValueError):
+        await gateway.get("/api/pages/products/1", headers=bearer(make_token()))
+
+    assert slow_cart.cancelled.is_set()
+
+
+async def test_product_without_category_has_no_attributes(gateway, upstream):
+    upstream.handler = lambda method, path: (200, b'{"id": 1}')
+
+    response = await gateway.get("/api/pages/products/1", headers=bearer(make_token()))
+
+    assert response.status_code == 200
+    assert response.json()["attributes"] is None
+    assert response.json()["errors"] == {"attributes": "no_category"}
+    assert sorted(call[1] for call in upstream.calls) == [
+        "/api/v1/cart",
+        "/api/v1/products/1",
+    ]
+
+
+@pytest.mark.parametrize("token", ["x", make_token(iat=0)])
+async def test_invalid_token_is_rejected(gateway, upstream, token):
+    response = await gateway.get("/api/pages/products/1", headers=bearer(token))
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+    assert upstream.calls == []
@@ -0,0 +1,115 @@
+import time
+import uuid
+
+import pytest
+
+from src.config import settings
+from tests.conftest import bearer, make_token
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def logout_all_responds_204(upstream):
+    upstream.handler = lambda method, path: (
+        (204, b"") if path.endswith("/logout-all") else (200, b'{"ok": true}')
+    )
+
+
+async def test_logout_all_revokes_earlier_tokens(gateway):
+    user_id = str(uuid.uuid4())
+    now = int(time.time())
+    token = make_token(user_id, iat=now - 10)
+    other_device = make_token(user_id, iat=now - 20)
+
+    response = await gateway.post("/api/auth/logout-all", headers=bearer(token))
+    assert response.status_code == 204
+
+    for revoked in (token, other_device):
+        response = await gateway.get("/api/users/me", headers=bearer(revoked))
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token revoked"
+
+
+async def test_login_right_after_logout_all_is_accepted(gateway):
+    user_id = str(uuid.uuid4())
+    now = int(time.time())
+    token = make_token(user_id, iat=now - 10)
+
+    await gateway.post("/api/auth/logout-all", headers=bearer(token))
+    # Новый вход в ту же секунду, что и logout-all
+    fresh = make_token(user_id, iat=now)
+
+    response = await gateway.get("/api/users/me", headers=bearer(fresh))
+    assert response.status_code == 200
+
+
+async def test_logout_all_with_clock_skew_keeps_new_login(gateway):
+    user_id = str(uuid.uuid4())
+    # Часы Auth Service отстают от gateway на 5 секунд
+    behind = int(time.time()) - 5
+    token = make_token(user_id, iat=behind - 10)
+
+    await gateway.post("/api/auth/logout-all", headers=bearer(token))
+    fresh = make_token(user_id, iat=behind)
+
+    response = await gateway.get("/api/users/me", headers=bearer(token))
+    assert response.status_code == 401
+    response = await gateway.get("/api/users/me", headers=bearer(fresh))
+    assert response.status_code == 200
+
+
+async def test_logout_all_uses_auth_service_cutoff(gateway, upstream):
+    user_id = str(uuid.uuid4())
+    now = int(time.time())
+    upstream.headers["x-revoked-before"] = str(now)
+    token = make_token(user_id, iat=now - 10)
+    later_login = make_token(user_id, iat=now - 1)
+
+    await gateway.post("/api/auth/logout-all", headers=bearer(token))
+
+    response = await gateway.get("/api/users/me", headers=bearer(later_login))
+    assert response.status_code == 401
+    response = await gateway.get(
+        "/api/users/me", headers=bearer(make_token(user_id, iat=now))
+    )
+    assert response.status_code == 200
+
+
+async def test_webhook_revokes_tokens_issued_before(gateway):
+    user_id = str(uuid.uuid4())
+    now = int(time.time())
+
+    response = await gateway.post(
+        "/api/internal/auth/revoke",
+        headers={"X-Internal-Token": settings.INTERNAL_API_TOKEN},
+        json={"users": [{"user_id": user_id, "issued_before": now}]},
+    )
+    assert response.status_code == 200
+
+    response = await gateway.get(
+        "/api/users/me", headers=bearer(make_token(user_id, iat=now - 1))
+    )
+    assert response.status_code == 401
+    response = await gateway.get(
+        "/api/users/me", headers=bearer(make_token(user_id, iat=now))
+    )
+    assert response.status_code == 200
+
+
+async def test_revoked_jti_is_rejected(gateway):
+    user_id = str(uuid.uuid4())
+    revoked = make_token(user_id, jti="revoked")
+
+    await gateway.post(
+        "/api/internal/auth/revoke",
+        headers={"X-Internal-Token": settings.INTERNAL_API_TOKEN},
+        json={"tokens": [{"jti": "revoked", "expires_at": int(time.time()) + 600}]},
+    )
+
+    response = await gateway.get("/api/users/me", headers=bearer(revoked))
+    assert response.status_code == 401
+    response = await gateway.get(
+        "/api/users/me", headers=bearer(make_token(user_id, jti="active"))
+    )
+    assert response.status_code == 200
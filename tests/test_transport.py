@@ -0,0 +1,32 @@
+import httpx
+
+from src.dns import DNSCache
+from src.transport import (
+    ResolvingNetworkBackend,
+    ResolvingTransport,
+    RoundRobinBalancer,
+)
+
+
+def test_pool_is_built_with_transport_settings():
+    limits = httpx.Limits(max_connections=7, max_keepalive_connections=3)
+
+    transport = ResolvingTransport(
+        DNSCache(), RoundRobinBalancer(), limits, http2=True, retries=2
+    )
+
+    pool = transport._pool
+    assert pool._max_connections == 7
+    assert pool._max_keepalive_connections == 3
+    assert pool._http2 is True
+    assert pool._retries == 2
+    assert isinstance(pool._network_backend, ResolvingNetworkBackend)
+
+
+def test_round_robin_rotates_addresses():
+    balancer = RoundRobinBalancer()
+    addresses = ("10.0.0.1", "10.0.0.2", "10.0.0.3")
+
+    orders = [balancer.order("svc", addresses)[0] for _ in range(4)]
+
+    assert orders == ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.1"]
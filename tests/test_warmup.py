@@ -0,0 +1,31 @@
+import jwt
+import pytest
+
+from src import warmup
+
+pytestmark = pytest.mark.anyio
+
+
+def raising(exc: Exception):
+    def warm_up_auth() -> None:
+        raise exc
+
+    return warm_up_auth
+
+
+@pytest.mark.parametrize(
+    "exc", [jwt.InvalidKeyError("bad key"), ValueError("Could not parse key")]
+)
+async def test_jwt_key_error_is_reported(monkeypatch, exc):
+    monkeypatch.setattr(warmup, "warm_up_auth", raising(exc))
+
+    report = await warmup._warm_up_auth()
+
+    assert report["error"].endswith(str(exc))
+
+
+async def test_programming_error_fails_startup(monkeypatch):
+    monkeypatch.setattr(warmup, "warm_up_auth", raising(TypeError("broken")))
+
+    with pytest.raises(TypeError):
+        await warmup._warm_up_auth()